@@ -115,8 +115,8 @@ class ConfigEditor:
             self.result_text.insert(tk.END, 'No se ingresó ninguna ruta\n')
             return
         try:
-            with open(ruta, 'r', encoding='utf-8') as f:
-                logs = ''.join(f.readlines()[-50:])
+            from utils.ultimas_lineas import leer_ultimas_lineas
+            logs = ''.join(leer_ultimas_lineas(ruta, 50))
             self.result_text.delete(1.0, tk.END)
             self.result_text.insert(tk.END, f'===== LOGS ARCHIVO =====\n{logs}\n')
         except Exception as e:
@@ -172,8 +172,8 @@ class ConfigEditor:
 
     def leer_logs_archivo_custom(self, ruta):
         try:
-            with open(ruta, 'r', encoding='utf-8') as f:
-                logs = ''.join(f.readlines()[-50:])
+            from utils.ultimas_lineas import leer_ultimas_lineas
+            logs = ''.join(leer_ultimas_lineas(ruta, 50))
             self.result_text.delete(1.0, tk.END)
             self.result_text.insert(tk.END, f'===== LOGS ARCHIVO EXTERNO =====\n{logs}\n')
         except Exception as e:
@@ -241,8 +241,8 @@ class ConfigEditor:
             else:
                 self.result_text.insert(tk.END, 'Opción de plugin no válida\n')
                 return
-            with open(archivo, 'r', encoding='utf-8') as f:
-                lineas = f.readlines()[-50:]
+            from utils.ultimas_lineas import leer_ultimas_lineas
+            lineas = leer_ultimas_lineas(archivo, 50)
             errores_criticos = 0
             warnings = 0
             errores = 0
@@ -1,14 +1,37 @@
 import os
-import importlib
 import yaml
 import time
 import json
 import argparse
-from utils.docker_utils import get_docker_logs, stream_docker_logs, restart_docker_container
+from collections import deque
+from utils.docker_utils import LectorIncrementalDocker, stream_docker_logs, restart_docker_container
 from utils.k8s_utils import get_k8s_pod_logs, stream_k8s_pod_logs, restart_k8s_pod
+from utils.k8s_selector import (get_k8s_logs_por_selector, stream_k8s_logs_por_selector,
+                                restart_k8s_pods_por_selector)
+from utils.ultimas_lineas import leer_ultimas_lineas
+from utils.escaneo_mmap import escanear_archivo
+from utils.multiplexor_logs import MultiplexorLogs
+from plugins.registro import RegistroPlugins
 
 STATE_FILE = "state/restart_state.json"
 HEALTH_FILE = "state/health_status.json"
+# Segundos entre actualizaciones del estado de los servicios seguidos en streaming
+EVALUATION_INTERVAL = 5
+# Segundos entre pasadas del modo polling
+POLL_INTERVAL = 10
+# Líneas recientes que se guardan por servicio para el estado
+RECENT_LINES = 20
+# Veredictos del evaluador de salud con los que un servicio se considera caído
+UNHEALTHY_STATES = ("ERROR", "CRITICAL")
+# Segundos mínimos entre dos reinicios del mismo servicio (restart_cooldown_seconds
+# en config.yaml): una ráfaga de errores no gasta todos los reinicios permitidos
+RESTART_COOLDOWN = 60
+
+# Un monitor por (plugin, plugin_config), reutilizado entre servicios y pasadas
+registro_plugins = RegistroPlugins()
+# Lectores de logs de Docker por cantidad de líneas: entre pasadas solo se
+# piden al daemon las líneas nuevas de cada contenedor
+docker_readers = {}
 
 def get_class_name(plugin_name: str) -> str:
     mapping = {
@@ -40,61 +63,89 @@ def save_health(health):
         json.dump(health, f, indent=2)
 
 def restart_service(service):
+    """Reinicia el servicio; devuelve False si no había nada que reiniciar"""
     source = service.get("source")
     if source == "docker":
         container_id = service.get("container_id")
         if container_id:
             restart_docker_container(container_id)
+            return True
     elif source == "kubernetes":
         pod_name = service.get("pod_name")
+        label_selector = service.get("label_selector")
         namespace = service.get("namespace", "default")
+        if label_selector:
+            # Todas las réplicas, igual que al leer sus logs
+            return restart_k8s_pods_por_selector(namespace, label_selector) > 0
         if pod_name:
             restart_k8s_pod(pod_name, namespace)
+            return True
+    return False
 
-def get_logs(service, tail=100):
+def get_logs(service, tail=100, monitor=None):
+    """
+    Últimas `tail` líneas del servicio. Para ficheros con `scan_mode: mmap` y
+    un monitor, en cambio, se escanea el archivo completo y se devuelven solo
+    las líneas que coinciden con sus patrones críticos o de warning.
+    """
     if service["source"] == "docker":
         container_id = service.get("container_id")
         if container_id:
-            return get_docker_logs(container_id, tail=tail)
+            if tail not in docker_readers:
+                docker_readers[tail] = LectorIncrementalDocker(tail=tail)
+            return docker_readers[tail].ultimas_lineas(container_id)
     elif service["source"] == "kubernetes":
         pod_name = service.get("pod_name")
+        label_selector = service.get("label_selector")
         namespace = service.get("namespace", "default")
+        if label_selector:
+            # Todas las réplicas: las últimas `tail` líneas de cada contenedor
+            return get_k8s_logs_por_selector(namespace, label_selector, tail=tail)
         if pod_name:
             return get_k8s_pod_logs(pod_name, namespace, tail=tail)
     elif service["source"] == "file":
         file_path = service.get("file_path")
         if file_path and os.path.exists(file_path):
-            with open(file_path, "r", encoding="utf-8") as f:
-                return "".join(f.readlines()[-tail:])
+            if monitor is not None and service.get("scan_mode") == "mmap":
+                return "".join(linea + "\n" for _, linea, _ in escanear_archivo(file_path, monitor))
+            return "".join(leer_ultimas_lineas(file_path, tail))
     return ""
 
-def instantiate_plugin(plugin_name: str):
-    try:
-        module = importlib.import_module(f"plugins.{plugin_name}")
-        class_name = get_class_name(plugin_name)
-        cls = getattr(module, class_name)
-        return cls()
-    except Exception as e:
-        print(f"[ERROR] No se pudo instanciar plugin {plugin_name}: {e}")
-        return None
-
-def run_healthcheck():
-    """Healthcheck normal: solo ficheros"""
+def instantiate_plugin(plugin_name: str, plugin_config=None):
+    """
+    Devuelve el monitor del plugin desde el registro: solo se importa y se
+    construye la primera vez (o cuando cambia config.yaml).
+    """
+    return registro_plugins.obtener(plugin_name, plugin_config)
+
+def run_healthcheck(sources=("file",)):
+    """
+    Healthcheck de una pasada sobre los servicios cuyo origen está en
+    `sources` ("file" y/o "docker"). De Docker solo se piden las líneas
+    escritas desde la pasada anterior (ver get_logs).
+    """
     config = load_config()
     health_status = {}
+    # Varios servicios pueden compartir un log combinado: cada archivo se lee una vez
+    logs_por_archivo = {}
 
     for service in config.get("services", []):
-        if service["source"] != "file":
-            continue  # Saltar docker/k8s
+        if service["source"] not in sources:
+            continue  # Saltar los demás orígenes
 
         name = service["name"]
         plugin_name = service["plugin"]
         print(f"\nRevisando {name}")
 
-        logs = get_logs(service, tail=100)
-        monitor = instantiate_plugin(plugin_name)
+        monitor = instantiate_plugin(plugin_name, service.get("plugin_config"))
         if not monitor:
             continue
+        # El escaneo mmap depende de los patrones del monitor; la cola del archivo no
+        escaneo = monitor if service.get("scan_mode") == "mmap" else None
+        clave = (service["source"], service.get("file_path") or service.get("container_id"), escaneo)
+        if clave not in logs_por_archivo:
+            logs_por_archivo[clave] = get_logs(service, tail=100, monitor=escaneo)
+        logs = logs_por_archivo[clave]
 
         healthy = monitor.check_logs(logs)
         error_message = None
@@ -115,88 +166,239 @@ def run_healthcheck():
 
     save_health(health_status)
 
+def run_healthcheck_polling(duration_seconds=120, interval=POLL_INTERVAL):
+    """
+    Healthcheck por consultas: ficheros y contenedores Docker cada `interval`
+    segundos, sin una conexión abierta por contenedor como en streaming. Los
+    lectores incrementales de get_logs se conservan entre pasadas, así que
+    cada consulta a Docker cuesta lo que el contenedor escribió desde la anterior.
+    """
+    start_time = time.time()
+    while True:
+        registro_plugins.recargar_si_cambio()
+        run_healthcheck(sources=("file", "docker"))
+        remaining = duration_seconds - (time.time() - start_time)
+        if remaining <= 0:
+            break
+        time.sleep(min(interval, remaining))
+
+def open_stream(service, since=None):
+    """
+    Devuelve una función que abre el stream de logs del servicio,
+    o None si el servicio no es Docker/Kubernetes o le falta el contenedor/pod
+    (o el label_selector). Con `since` (segundos epoch) el stream de Docker o
+    del label_selector empieza en ese momento, p. ej. en el reinicio.
+    """
+    if service["source"] == "docker":
+        container_id = service.get("container_id")
+        if container_id:
+            # Al reconectar pedimos solo lo escrito desde que se cortó el stream anterior
+            stream_end = [since]
+
+            def open_docker():
+                try:
+                    yield from stream_docker_logs(container_id, since=stream_end[0])
+                finally:
+                    stream_end[0] = time.time()
+            return open_docker
+    elif service["source"] == "kubernetes":
+        pod_name = service.get("pod_name")
+        label_selector = service.get("label_selector")
+        namespace = service.get("namespace", "default")
+        if label_selector:
+            # Un solo stream con las líneas de todas las réplicas, incluidas las que
+            # aparezcan después. Al reconectar, igual que con Docker, solo lo nuevo
+            selector_end = [since]
+
+            def open_selector():
+                try:
+                    yield from stream_k8s_logs_por_selector(namespace, label_selector, desde=selector_end[0])
+                finally:
+                    selector_end[0] = time.time()
+            return open_selector
+        if pod_name:
+            return lambda: stream_k8s_pod_logs(pod_name, namespace)
+    return None
+
+def create_evaluator(monitor):
+    """
+    Evaluador de salud incremental para un servicio seguido en streaming: por
+    ventanas de tiempo si su plugin_config define ventanas_salud y, si no,
+    sobre las últimas VENTANA_SALUD líneas.
+    """
+    if monitor.ventanas_salud:
+        return monitor.crear_evaluador_temporal()
+    return monitor.crear_evaluador_salud()
+
+def evaluate_service(service, healthy, recent_lines, state):
+    """Reinicia el servicio si no está sano (respetando el límite de reinicios) y devuelve su estado"""
+    name = service["name"]
+    restarted = False
+    error_message = None
+
+    if not healthy:
+        print(f"{name} tiene errores críticos.")
+        error_message = "Error detectado en logs"
+        now = time.time()
+        max_restarts = service.get("max_restarts", 3)
+        window = service.get("time_window_minutes", 60) * 60
+        history = state.get(name, [])
+        history = [t for t in history if now - t < window]
+        cooldown = service.get("restart_cooldown_seconds", RESTART_COOLDOWN)
+
+        if history and now - history[-1] < cooldown:
+            print(f"{name} se reinició hace {now - history[-1]:.0f} s: se espera {cooldown} s entre reinicios.")
+        elif len(history) < max_restarts:
+            print(f"Reiniciando {name}...")
+            # Sin nada que reiniciar no se gasta un reinicio ni empieza el cooldown
+            if restart_service(service):
+                history.append(now)
+                state[name] = history
+                restarted = True
+            else:
+                print(f"No se pudo reiniciar {name}.")
+        else:
+            print(f"Se alcanzó el límite de reinicios para {name} en {window/60} minutos.")
+
+    return {
+        "status": "healthy" if healthy else "error",
+        "last_checked": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "error": error_message,
+        "restarted": restarted,
+        "logs": "\n".join(recent_lines)
+    }
+
 def run_healthcheck_streaming(duration_seconds=120):
-    """Healthcheck streaming: solo Docker/Kubernetes"""
+    """
+    Healthcheck streaming: solo Docker/Kubernetes.
+    Todos los servicios se siguen a la vez (un lector por contenedor/pod) y
+    una sola etapa consume sus líneas. Las líneas de cada servicio se analizan
+    por lotes al llegar y alimentan su evaluador de salud incremental (ver
+    utils/ventana_salud.py). Si el veredicto pasa a ERROR o CRITICAL, el
+    servicio se evalúa (y se reinicia) en el momento, pero cada servicio se
+    evalúa como mucho una vez por EVALUATION_INTERVAL y entre dos reinicios
+    pasan al menos RESTART_COOLDOWN segundos; el resto actualiza su estado cada
+    EVALUATION_INTERVAL segundos. Tras un reinicio se descarta lo que el stream
+    anterior todavía tenía en cola. De cada servicio solo se guardan las
+    últimas RECENT_LINES líneas, así que la memoria no crece por más largo que
+    sea el streaming.
+    """
     config = load_config()
     state = load_state()
     health_status = {}
+    multiplexor = MultiplexorLogs()
+    # nombre -> {"service", "monitor", "evaluator": evaluador de salud incremental,
+    #           "recent": últimas líneas, "pending": hay que evaluarlo,
+    #           "unhealthy": estuvo caído desde la última evaluación,
+    #           "last_evaluation": cuándo se evaluó por última vez}
+    followed = {}
 
-    start_time = time.time()
-    while time.time() - start_time < duration_seconds:
+    def update_followed(config):
+        services = {}
         for service in config.get("services", []):
             if service["source"] not in ["docker", "kubernetes"]:
                 continue  # Saltar ficheros
+            monitor = instantiate_plugin(service["plugin"], service.get("plugin_config"))
+            stream = open_stream(service)
+            if monitor and stream:
+                services[service["name"]] = (service, monitor, stream)
 
-            name = service["name"]
-            plugin_name = service["plugin"]
-            monitor = instantiate_plugin(plugin_name)
-            if not monitor:
-                continue
-
-            logs = ""
-            try:
-                if service["source"] == "docker":
-                    container_id = service.get("container_id")
-                    if container_id:
-                        for line in stream_docker_logs(container_id):
-                            logs += line
-                            if time.time() - start_time >= duration_seconds:
-                                break
-                elif service["source"] == "kubernetes":
-                    pod_name = service.get("pod_name")
-                    if pod_name:
-                        for line in stream_k8s_pod_logs(pod_name, service.get("namespace", "default")):
-                            logs += line
-                            if time.time() - start_time >= duration_seconds:
-                                break
-            except Exception as e:
-                print(f"[WARNING] Error obteniendo logs de {name}: {e}")
-                continue
-
-            healthy = monitor.check_logs(logs)
-            restarted = False
-            error_message = None
-
-            if not healthy:
-                print(f"{name} tiene errores críticos. Se reiniciará el servicio.")
-                error_message = "Error detectado en logs"
-                now = time.time()
-                max_restarts = service.get("max_restarts", 3)
-                window = service.get("time_window_minutes", 60) * 60
-                history = state.get(name, [])
-                history = [t for t in history if now - t < window]
-
-                if len(history) < max_restarts:
-                    print(f"Reiniciando {name}...")
-                    restart_service(service)
-                    history.append(now)
-                    state[name] = history
-                    restarted = True
-                else:
-                    print(f"Se alcanzó el límite de reinicios para {name} en {window/60} minutos.")
-
-            health_status[name] = {
-                "status": "healthy" if healthy else "error",
-                "last_checked": time.strftime("%Y-%m-%d %H:%M:%S"),
-                "error": error_message,
-                "restarted": restarted,
-                "logs": "\n".join(logs.splitlines()[-20:])
-            }
+        for name in list(followed):
+            # Servicios que ya no están o que ahora apuntan a otro contenedor/pod
+            if name not in services or services[name][0] != followed[name]["service"]:
+                multiplexor.dejar_de_seguir(name)
+                del followed[name]
+        for name, (service, monitor, stream) in services.items():
+            if name in followed:
+                if followed[name]["monitor"] is not monitor:
+                    # Plugin recargado: sus umbrales pueden haber cambiado
+                    followed[name]["monitor"] = monitor
+                    followed[name]["evaluator"] = create_evaluator(monitor)
+            else:
+                followed[name] = {"service": service, "monitor": monitor, "evaluator": create_evaluator(monitor),
+                                  "recent": deque(maxlen=RECENT_LINES), "pending": False, "unhealthy": False,
+                                  "last_evaluation": 0}
+                multiplexor.seguir(name, stream)
 
+    def evaluate(name, item):
+        healthy = not item["unhealthy"] and item["evaluator"].estado() not in UNHEALTHY_STATES
+        health_status[name] = evaluate_service(item["service"], healthy, item["recent"], state)
+        item["last_evaluation"] = time.time()
+        item["unhealthy"] = False
+        # Un servicio caído que no se reinició (p. ej. por el cooldown) se
+        # vuelve a evaluar en la próxima pasada aunque no escriba nada
+        item["pending"] = not healthy
+        if health_status[name]["restarted"]:
+            # Lo anterior al reinicio ya no describe al servicio: se vacía la
+            # ventana y se sigue con un lector nuevo, así las líneas que el
+            # anterior dejó en la cola se descartan
+            item["evaluator"].reiniciar()
+            item["recent"].clear()
+            item["pending"] = False
+            multiplexor.dejar_de_seguir(name)
+            multiplexor.seguir(name, open_stream(item["service"], since=item["last_evaluation"]))
+
+    def evaluate_pending():
+        for name, item in followed.items():
+            if item["pending"]:
+                evaluate(name, item)
         save_state(state)
         save_health(health_status)
 
-    save_health(health_status)
+    registro_plugins.recargar_si_cambio()
+    update_followed(config)
+    start_time = time.time()
+    last_evaluation = start_time
+    try:
+        while time.time() - start_time < duration_seconds:
+            # Solo si config.yaml cambió: nueva lista de servicios y monitores nuevos
+            if registro_plugins.recargar_si_cambio():
+                config = registro_plugins.config
+                update_followed(config)
+
+            batches = {}
+            for name, line in multiplexor.siguiente_lote():
+                if name in followed:
+                    batches.setdefault(name, []).append(line)
+            evaluated = False
+            for name, lines in batches.items():
+                item = followed[name]
+                item["recent"].extend(lines)
+                item["pending"] = True
+                health = item["evaluator"].agregar_lote(lines, item["monitor"].analizar_lote(lines))
+                if health in UNHEALTHY_STATES:
+                    # Servicio caído: queda marcado hasta la próxima evaluación, que
+                    # se adelanta si la última fue hace más de EVALUATION_INTERVAL
+                    item["unhealthy"] = True
+                    if time.time() - item["last_evaluation"] >= EVALUATION_INTERVAL:
+                        evaluate(name, item)
+                        evaluated = True
+            if evaluated:
+                save_state(state)
+                save_health(health_status)
+
+            if time.time() - last_evaluation >= EVALUATION_INTERVAL:
+                evaluate_pending()
+                last_evaluation = time.time()
+    finally:
+        multiplexor.detener()
+
+    evaluate_pending()
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Health Monitor")
-    parser.add_argument("--mode", choices=["file", "streaming"], required=True,
-                        help="Modo de ejecución: file (solo ficheros) o streaming (docker/k8s)")
+    parser.add_argument("--mode", choices=["file", "streaming", "polling"], required=True,
+                        help="Modo de ejecución: file (solo ficheros), streaming (docker/k8s) "
+                             "o polling (ficheros y docker, por consultas)")
     parser.add_argument("--duration", type=int, default=120,
-                        help="Duración del streaming en segundos (solo para modo streaming)")
+                        help="Duración en segundos (modos streaming y polling)")
+    parser.add_argument("--interval", type=int, default=POLL_INTERVAL,
+                        help="Segundos entre pasadas (solo para modo polling)")
     args = parser.parse_args()
 
     if args.mode == "file":
         run_healthcheck()
     elif args.mode == "streaming":
         run_healthcheck_streaming(duration_seconds=args.duration)
+    elif args.mode == "polling":
+        run_healthcheck_polling(duration_seconds=args.duration, interval=args.interval)
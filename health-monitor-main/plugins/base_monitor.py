@@ -1,6 +1,11 @@
-import re
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from utils.reinicio_global import reinicio_simple
+from utils.motor_patrones import MotorPatrones
+from utils.analisis_columnar import (CODIGO_NIVEL, NIVEL_CRITICAL, NIVEL_WARNING, a_entero, analisis_de_ventana,
+                                     columna_enteros, columna_niveles, filas, lineas_en_mayusculas)
+from utils.cache_analisis import CacheLRU
+from utils.timestamps import extraer_timestamp, extraer_timestamp_texto
+from utils.ventana_salud import VENTANAS_SALUD_POR_DEFECTO, EvaluadorSalud, EvaluadorSaludTemporal, sumar_aportes
 
 class BaseMonitor:
     """
@@ -8,13 +13,45 @@ class BaseMonitor:
     Define métodos comunes: check_logs, analizar_patron_log, detectar_error_critico,
     evaluar_salud_servicio, ejecutar_accion_emergencia.
     """
+    # Evaluación de salud: últimas 30 líneas (ver utils/ventana_salud.py)
+    VENTANA_SALUD = 30
+    CAMPOS_SALUD = ("nivel",)
+    CONTADORES_SALUD = ("errores_criticos", "warnings")
+
     def __init__(self):
         self.errores_criticos: List[str] = []
         self.errores_warning: List[str] = []
+        # Se compila en el primer uso: las subclases definen los patrones
+        # después de llamar a super().__init__()
+        self._motor: Optional[MotorPatrones] = None
+        # Análisis ya hechos, por contenido de línea (acotado, LRU)
+        self.cache_analisis = CacheLRU()
+        # Umbrales de _veredicto_salud y, para la evaluación por ventanas de
+        # tiempo, sus duraciones y los umbrales de cada una. Se cambian desde
+        # el plugin_config del servicio en config.yaml
+        self.umbrales_salud = {"errores_criticos": 3, "warnings": 3}
+        self.ventanas_salud: Optional[List[str]] = None
+        self.umbrales_ventanas: Dict[str, Dict] = {}
+
+    @property
+    def motor(self) -> MotorPatrones:
+        """
+        Motor con los patrones críticos y de warning ya compilados.
+        """
+        if self._motor is None:
+            self._motor = MotorPatrones(self.errores_criticos, self.errores_warning)
+        return self._motor
+
+    def recompilar_patrones(self) -> None:
+        """
+        Descarta el motor compilado. Hay que llamarlo si se modifican
+        errores_criticos / errores_warning después de haber analizado logs.
+        """
+        self._motor = None
+        self.cache_analisis.limpiar()
 
     def _extraer_timestamp(self, linea_log: str) -> Optional[str]:
-        timestamp_match = re.search(r"\[([\d-]+\s[\d:]+)\]", linea_log)
-        return timestamp_match.group(1) if timestamp_match else None
+        return extraer_timestamp_texto(linea_log)
 
     def detectar_error_critico(self, linea_log: str) -> bool:
         """
@@ -25,10 +62,7 @@ class BaseMonitor:
         Es decir si la lista de errores se encuentra con un string que coincide devuelve true, 
         si esta bien y no encuentra coincidencias devuelve false
         """
-        for patron in self.errores_criticos:
-            if re.search(patron, linea_log, re.IGNORECASE):
-                return True
-        return False
+        return self.motor.es_critico(linea_log)
 
     def check_logs(self, logs: str) -> bool:
         """
@@ -45,35 +79,107 @@ class BaseMonitor:
 
     def analizar_patron_log(self, linea_log: str) -> Dict:
         """
-        Devuelve un dict con información relevante de la línea de log.
+        Devuelve un dict con información relevante de la línea de log,
+        incluido el patrón que determinó el nivel (o None).
+        El dict puede venir de la cache, así que no hay que modificarlo.
         """
+        analisis = self.cache_analisis.obtener(linea_log)
+        if analisis is None:
+            analisis = self._analizar_linea(linea_log)
+            self.cache_analisis.guardar(linea_log, analisis)
+        return analisis
+
+    def _analizar_linea(self, linea_log: str) -> Dict:
+        timestamp, timestamp_ms = extraer_timestamp(linea_log)
         resultado = {
-            "timestamp": self._extraer_timestamp(linea_log),
+            "timestamp": timestamp,
+            "timestamp_ms": timestamp_ms,
             "nivel": "INFO",
+            "patron": None,
             "mensaje": linea_log.strip()
         }
-        if self.detectar_error_critico(linea_log):
-            resultado["nivel"] = "CRITICAL"
-        elif any(re.search(w, linea_log, re.IGNORECASE) for w in self.errores_warning):
-            resultado["nivel"] = "WARNING"
-        elif "ERROR" in linea_log.upper():
-            resultado["nivel"] = "ERROR"
+        # Una sola copia en mayúsculas para el prefiltro y los chequeos de texto
+        resultado["nivel"], resultado["patron"] = self._clasificar_nivel(linea_log, linea_log.upper())
         return resultado
 
-    def evaluar_salud_servicio(self, logs_recientes: List[str]) -> str:
-        errores_criticos = 0
-        warnings = 0
-        for log in logs_recientes[-30:]:
-            analisis = self.analizar_patron_log(log)
-            if analisis["nivel"] == "CRITICAL":
-                errores_criticos += 1
-            elif analisis["nivel"] == "WARNING":
-                warnings += 1
-        if errores_criticos >= 3:
+    def analizar_lote(self, lineas: List[str], lineas_mayus: Optional[List[str]] = None) -> Dict:
+        """
+        Args:
+            lineas (List[str]): Lote de líneas de log.
+            lineas_mayus (List[str], opcional): Las mismas líneas en mayúsculas,
+                si ya se calcularon (p. ej. para analizarlas con varios plugins).
+        Returns:
+            Dict: Columnas paralelas a lineas en vez de un dict por línea:
+            "nivel" (array con los códigos de utils.analisis_columnar), "timestamp"
+            y "timestamp_ms" (epoch en ms, SIN_VALOR si la línea no trae fecha).
+        Las subclases con métricas propias agregan sus columnas.
+        """
+        niveles = columna_niveles()
+        timestamps = []
+        timestamps_ms = columna_enteros()
+        for linea, linea_mayus in zip(lineas, lineas_en_mayusculas(lineas, lineas_mayus)):
+            nivel, _ = self._clasificar_nivel(linea, linea_mayus)
+            timestamp, timestamp_ms = extraer_timestamp(linea)
+            niveles.append(CODIGO_NIVEL[nivel])
+            timestamps.append(timestamp)
+            timestamps_ms.append(a_entero(timestamp_ms))
+        return {"nivel": niveles, "timestamp": timestamps, "timestamp_ms": timestamps_ms}
+
+    def _clasificar_nivel(self, linea_log: str, linea_mayus: str) -> Tuple[str, Optional[str]]:
+        """
+        Devuelve (nivel, patrón que lo determinó o None) para una línea.
+        """
+        nivel, patron = self.motor.clasificar(linea_log, linea_mayus)
+        if nivel:
+            return nivel, patron
+        return ("ERROR" if "ERROR" in linea_mayus else "INFO"), None
+
+    def evaluar_salud_servicio(self, logs_recientes: List[str], analisis=None) -> str:
+        """
+        Args:
+            logs_recientes (List[str]): Líneas de log recientes.
+            analisis: Opcional. Análisis ya calculados de logs_recientes (lista de
+                analizar_patron_log o lote de analizar_lote), para no re-parsearlas.
+        """
+        ventana = analisis_de_ventana(self.analizar_patron_log, logs_recientes, analisis, self.VENTANA_SALUD)
+        contadores = sumar_aportes(self._aporte_salud, len(self.CONTADORES_SALUD),
+                                   logs_recientes[-self.VENTANA_SALUD:], filas(ventana, *self.CAMPOS_SALUD))
+        return self._veredicto_salud(contadores)
+
+    def crear_evaluador_salud(self) -> EvaluadorSalud:
+        """
+        Devuelve un evaluador incremental: da el mismo veredicto que
+        evaluar_salud_servicio pero se actualiza en O(1) con cada línea nueva.
+        """
+        return EvaluadorSalud(self)
+
+    def crear_evaluador_temporal(self, ventanas=None, umbrales=None) -> EvaluadorSaludTemporal:
+        """
+        Devuelve un evaluador por ventanas de tiempo (1m, 5m, 15m...). Si no se
+        indican, se usan ventanas_salud y umbrales_ventanas.
+        """
+        return EvaluadorSaludTemporal(self, ventanas or self.ventanas_salud or VENTANAS_SALUD_POR_DEFECTO,
+                                      umbrales if umbrales is not None else self.umbrales_ventanas)
+
+    def _aporte_salud(self, linea_log: str, nivel: int) -> Tuple[int, int]:
+        """
+        Cuánto suma una línea a cada contador de CONTADORES_SALUD.
+        Las subclases que cambien la evaluación redefinen este método,
+        _veredicto_salud y las constantes *_SALUD.
+        """
+        return (
+            1 if nivel == NIVEL_CRITICAL else 0,
+            1 if nivel == NIVEL_WARNING else 0
+        )
+
+    def _veredicto_salud(self, contadores: List[int], umbrales: Optional[Dict] = None) -> str:
+        umbrales = umbrales or self.umbrales_salud
+        errores_criticos, warnings = contadores
+        if errores_criticos >= umbrales["errores_criticos"]:
             return "CRITICAL"
         elif errores_criticos >= 1:
             return "ERROR"
-        elif warnings >= 3:
+        elif warnings >= umbrales["warnings"]:
             return "WARNING"
         return "OK"
 
@@ -0,0 +1,128 @@
+"""
+Utilidades para el análisis por lotes en formato columnar.
+
+En lugar de un dict por línea, analizar_lote devuelve un dict de columnas
+paralelas: los niveles como array de enteros pequeños y las métricas como
+arrays numéricos con un valor centinela cuando la línea no trae el dato.
+"""
+from array import array
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Códigos compactos para la columna "nivel"
+NIVEL_INFO = 0
+NIVEL_WARNING = 1
+NIVEL_ERROR = 2
+NIVEL_CRITICAL = 3
+
+NIVELES = ("INFO", "WARNING", "ERROR", "CRITICAL")
+CODIGO_NIVEL = {nombre: codigo for codigo, nombre in enumerate(NIVELES)}
+
+# Centinelas para las columnas numéricas cuando la línea no trae el dato
+SIN_VALOR = -1
+SIN_VALOR_FLOAT = float("nan")
+
+_MAX_INT64 = 2 ** 63 - 1
+
+
+def columna_niveles() -> array:
+    return array("b")
+
+
+def columna_enteros() -> array:
+    return array("q")
+
+
+def columna_decimales() -> array:
+    return array("d")
+
+
+def a_entero(valor: Optional[int]) -> int:
+    """
+    Convierte un valor opcional al formato de las columnas enteras.
+    Los valores absurdamente grandes se saturan en lugar de desbordar el array.
+    """
+    if valor is None:
+        return SIN_VALOR
+    return valor if valor <= _MAX_INT64 else _MAX_INT64
+
+
+def a_decimal(valor: Optional[float]) -> float:
+    return SIN_VALOR_FLOAT if valor is None else valor
+
+
+def lineas_en_mayusculas(lineas: List[str], lineas_mayus: Optional[List[str]] = None) -> Iterable[str]:
+    """
+    Las líneas en mayúsculas para el prefiltro de patrones. Si el llamador ya
+    las calculó (por ejemplo para pasarlas a varios plugins) se reutilizan.
+    """
+    if lineas_mayus is None:
+        return map(str.upper, lineas)
+    if len(lineas_mayus) != len(lineas):
+        raise ValueError(f"Se recibieron {len(lineas_mayus)} líneas en mayúsculas para {len(lineas)} líneas de log")
+    return lineas_mayus
+
+
+def contar_niveles(lote: Dict) -> Dict[str, int]:
+    """
+    Cuenta cuántas líneas hay de cada nivel en un lote columnar.
+
+    :param lote: Resultado de analizar_lote
+    :return: {"INFO": n, "WARNING": n, "ERROR": n, "CRITICAL": n}
+    """
+    conteo = [0] * len(NIVELES)
+    for codigo in lote["nivel"]:
+        conteo[codigo] += 1
+    return dict(zip(NIVELES, conteo))
+
+
+def ultimos(analisis, cantidad: int):
+    """
+    Devuelve los últimos `cantidad` análisis, tanto si vienen como lista de
+    dicts (analizar_patron_log) como si vienen como lote columnar.
+    """
+    if isinstance(analisis, dict):
+        return {columna: valores[-cantidad:] for columna, valores in analisis.items()}
+    return analisis[-cantidad:]
+
+
+def filas(analisis, *campos: str) -> Iterator[Tuple]:
+    """
+    Recorre análisis ya calculados como tuplas con los campos pedidos, sin
+    importar su formato. El nivel se entrega siempre como código y las
+    métricas ausentes como None.
+
+    :param analisis: Lista de dicts de analizar_patron_log o lote de analizar_lote
+    :param campos: Nombres de los campos a extraer, p. ej. "nivel", "status_code"
+    """
+    if isinstance(analisis, dict):
+        return zip(*(_columna_normalizada(campo, analisis[campo]) for campo in campos))
+    return (tuple(_valor_normalizado(campo, a[campo]) for campo in campos) for a in analisis)
+
+
+def _columna_normalizada(campo: str, valores):
+    if campo == "nivel" or campo == "timestamp":
+        return valores
+    # SIN_VALOR en columnas enteras, NaN (distinto de sí mismo) en decimales
+    return (None if v == SIN_VALOR or v != v else v for v in valores)
+
+
+def _valor_normalizado(campo: str, valor):
+    return CODIGO_NIVEL[valor] if campo == "nivel" else valor
+
+
+def analisis_de_ventana(analizar: Callable[[str], Dict], logs_recientes: List[str], analisis, cantidad: int):
+    """
+    Devuelve el análisis de las últimas `cantidad` líneas. Si el llamador ya
+    los calculó se reutilizan; si no, se analizan con `analizar`.
+
+    :param analizar: Normalmente monitor.analizar_patron_log
+    :param logs_recientes: Líneas de log
+    :param analisis: None, lista de dicts o lote columnar paralelo a logs_recientes
+    :param cantidad: Tamaño de la ventana
+    """
+    if analisis is None:
+        return [analizar(log) for log in logs_recientes[-cantidad:]]
+    total = len(analisis["nivel"]) if isinstance(analisis, dict) else len(analisis)
+    if total != len(logs_recientes):
+        raise ValueError(f"Se recibieron {total} análisis para {len(logs_recientes)} líneas de log")
+    return ultimos(analisis, cantidad)
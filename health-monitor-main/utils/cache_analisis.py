@@ -0,0 +1,47 @@
+"""
+Cache LRU acotada para los análisis por línea de los plugins.
+
+El mismo texto de log produce siempre el mismo análisis, así que guardamos el
+resultado usando la línea como clave. Cuando se llena, se descarta la entrada
+usada hace más tiempo.
+"""
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+TAMANO_CACHE_ANALISIS = 4096
+
+
+class CacheLRU:
+    def __init__(self, capacidad: int = TAMANO_CACHE_ANALISIS):
+        if capacidad <= 0:
+            raise ValueError("La capacidad de la cache tiene que ser mayor que cero")
+        self.capacidad = capacidad
+        self._entradas: "OrderedDict[Hashable, Dict]" = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, clave: Hashable) -> Optional[Dict]:
+        """
+        :param clave: Normalmente la línea de log
+        :return: El análisis guardado, o None si no está en la cache
+        """
+        try:
+            valor = self._entradas[clave]
+        except KeyError:
+            self.fallos += 1
+            return None
+        self._entradas.move_to_end(clave)
+        self.aciertos += 1
+        return valor
+
+    def guardar(self, clave: Hashable, valor: Dict) -> None:
+        self._entradas[clave] = valor
+        self._entradas.move_to_end(clave)
+        if len(self._entradas) > self.capacidad:
+            self._entradas.popitem(last=False)
+
+    def limpiar(self) -> None:
+        self._entradas.clear()
+
+    def __len__(self) -> int:
+        return len(self._entradas)
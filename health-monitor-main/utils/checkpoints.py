@@ -0,0 +1,161 @@
+"""
+Checkpoints de lectura de los logs que se siguen en tiempo real.
+
+Por cada archivo se guarda hasta qué byte se leyó (y de qué archivo: su
+dispositivo e inodo), más una huella de los últimos bytes leídos. Al volver a
+arrancar, el monitor retoma desde ahí en lugar de saltar al final, así que las
+líneas escritas mientras estaba detenido también se analizan.
+
+Los checkpoints se actualizan en memoria en cada lectura y se escriben a disco
+como mucho una vez por intervalo, nunca por línea. Con el guardado periódico
+activo también se escriben aunque no lleguen más líneas, al salir del proceso
+y al recibir SIGTERM (que se trata como Ctrl+C).
+"""
+import atexit
+import hashlib
+import json
+import os
+import signal
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHECKPOINTS_PATH = os.path.join(BASE_DIR, "config", "checkpoints.json")
+
+# Segundos entre escrituras del archivo de checkpoints
+INTERVALO_GUARDADO = 5.0
+# Bytes antes del checkpoint con los que se calcula la huella
+LONGITUD_HUELLA = 256
+
+
+def huella(datos: bytes) -> str:
+    return hashlib.blake2b(datos, digest_size=8).hexdigest()
+
+
+class AlmacenCheckpoints:
+    def __init__(self, ruta: str = None, intervalo: float = INTERVALO_GUARDADO):
+        self.ruta = ruta or CHECKPOINTS_PATH
+        self.intervalo = intervalo
+        self._ultimo_guardado = time.monotonic()
+        self._cambios = False
+        # registrar() llega desde los hilos lectores y guardar() desde el periódico
+        self._lock = threading.Lock()
+        self._detener = threading.Event()
+        self._hilo_guardado = None
+        # ruta absoluta del log -> {"dispositivo", "inodo", "offset", "huella"}
+        self.checkpoints: Dict[str, Dict] = self._cargar()
+
+    def _cargar(self) -> Dict[str, Dict]:
+        try:
+            with open(self.ruta, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"Error leyendo checkpoints {self.ruta}: {e}")
+            return {}
+
+    def obtener(self, ruta_log: str) -> Optional[Dict]:
+        return self.checkpoints.get(os.path.abspath(ruta_log))
+
+    def registrar(self, ruta_log: str, identidad: Tuple[int, int], offset: int, ultimos_bytes: bytes) -> None:
+        """
+        Anota hasta dónde se leyó un archivo. Se escribe a disco cuando pasó
+        el intervalo desde la última escritura.
+
+        :param identidad: (dispositivo, inodo) del archivo leído
+        :param offset: Byte siguiente a la última línea completa leída
+        :param ultimos_bytes: Los LONGITUD_HUELLA bytes anteriores a offset (o menos al principio del archivo)
+        """
+        with self._lock:
+            self.checkpoints[os.path.abspath(ruta_log)] = {
+                "dispositivo": identidad[0],
+                "inodo": identidad[1],
+                "offset": offset,
+                "huella": huella(ultimos_bytes)
+            }
+            self._cambios = True
+        if time.monotonic() - self._ultimo_guardado >= self.intervalo:
+            self.guardar()
+
+    def coincide(self, checkpoint: Dict, identidad: Tuple[int, int], ultimos_bytes: bytes) -> bool:
+        """True si el checkpoint corresponde a ese archivo y su contenido no cambió"""
+        return ((checkpoint["dispositivo"], checkpoint["inodo"]) == tuple(identidad)
+                and checkpoint["huella"] == huella(ultimos_bytes))
+
+    def guardar(self) -> None:
+        """Escribe los checkpoints si hubo cambios (de forma atómica y en disco)"""
+        with self._lock:
+            self._ultimo_guardado = time.monotonic()
+            if not self._cambios:
+                return
+            directorio = os.path.dirname(self.ruta) or "."
+            temporal = self.ruta + ".tmp"
+            try:
+                os.makedirs(directorio, exist_ok=True)
+                with open(temporal, "w", encoding="utf-8") as f:
+                    json.dump(self.checkpoints, f, indent=2)
+                    # Sin fsync, tras un corte de luz el rename puede llegar
+                    # a disco antes que los datos y dejar el archivo vacío
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temporal, self.ruta)
+                self._cambios = False
+            except OSError as e:
+                print(f"Error guardando checkpoints {self.ruta}: {e}")
+                return
+            _sincronizar_directorio(directorio)
+
+    def iniciar_guardado_periodico(self) -> None:
+        """
+        Guarda cada `intervalo` segundos desde un hilo propio, al terminar el
+        proceso y al recibir SIGTERM. detener() lo termina con un último guardado.
+        """
+        if self._hilo_guardado is not None:
+            return
+        self._detener.clear()
+        self._hilo_guardado = threading.Thread(target=self._bucle_guardado, daemon=True)
+        self._hilo_guardado.start()
+        atexit.register(self.detener)
+        _sigterm_como_ctrl_c()
+
+    def detener(self) -> None:
+        if self._hilo_guardado is not None:
+            self._detener.set()
+            self._hilo_guardado.join()
+            self._hilo_guardado = None
+            atexit.unregister(self.detener)
+        self.guardar()
+
+    def _bucle_guardado(self):
+        while not self._detener.wait(self.intervalo):
+            self.guardar()
+
+
+def _sincronizar_directorio(directorio: str) -> None:
+    # El rename queda en disco cuando se sincroniza el directorio (solo POSIX)
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    try:
+        descriptor = os.open(directorio, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(descriptor)
+
+
+def _sigterm_como_ctrl_c() -> None:
+    """
+    Por defecto SIGTERM mata el proceso sin pasar por atexit ni por el
+    `except KeyboardInterrupt` de los monitores, que es donde se guarda.
+    Solo si nadie instaló ya un manejador y desde el hilo principal.
+    """
+    if not hasattr(signal, "SIGTERM") or threading.current_thread() is not threading.main_thread():
+        return
+    if signal.getsignal(signal.SIGTERM) == signal.SIG_DFL:
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
@@ -1,5 +1,41 @@
+import threading
+from collections import deque
+from typing import Dict, Tuple
+
 import docker
 
+from utils.timestamps import lineas_desde_cursor
+
+# Conexiones HTTP al daemon que el cliente compartido mantiene abiertas
+# (una por hilo que lo use a la vez, p. ej. un stream por servicio)
+POOL_CONEXIONES = 32
+
+_cliente = None
+_lock_cliente = threading.Lock()
+
+def obtener_cliente():
+    """
+    Cliente de Docker compartido por todo el proceso. Se crea la primera vez
+    y reutiliza sus conexiones, en lugar de abrir una nueva en cada llamada.
+    """
+    global _cliente
+    if _cliente is None:
+        with _lock_cliente:
+            if _cliente is None:
+                _cliente = docker.from_env(max_pool_size=POOL_CONEXIONES)
+    return _cliente
+
+def descartar_cliente():
+    """Olvida el cliente compartido (p. ej. si el daemon se reinició); el próximo uso crea otro"""
+    global _cliente
+    with _lock_cliente:
+        if _cliente is not None:
+            try:
+                _cliente.close()
+            except Exception:
+                pass
+            _cliente = None
+
 def get_docker_logs(container_name: str, tail: int = 100) -> str:
     """
     Lee los últimos logs de un contenedor Docker.
@@ -9,9 +45,9 @@ def get_docker_logs(container_name: str, tail: int = 100) -> str:
     :return: Logs como string
     """
     try:
-        client = docker.from_env()
-        container = client.containers.get(container_name)
-        logs = container.logs(
+        # La API de bajo nivel acepta el nombre directamente: nos ahorramos el inspect
+        logs = obtener_cliente().api.logs(
+            container_name,
             tail=tail,
             stderr=True,
             stdout=True
@@ -21,28 +57,30 @@ def get_docker_logs(container_name: str, tail: int = 100) -> str:
             return f"[ERROR] Contenedor '{container_name}' no encontrado. Verifica que el nombre sea correcto."
     except docker.errors.APIError as e:
             return f"[ERROR] Error de API Docker: {e}"
-    except ConnectionError:
+    except (ConnectionError, docker.errors.DockerException):
+            descartar_cliente()
             return "[ERROR] No se puede conectar al daemon de Docker. ¿Está Docker ejecutándose?"
     except Exception as e:
             return f"[ERROR] Error inesperado obteniendo logs de {container_name}: {e}"
 
-def stream_docker_logs(container_name: str):
+def stream_docker_logs(container_name: str, since=None):
     """
     Genera logs en streaming desde un contenedor Docker.
 
     :param container_name: Nombre o ID del contenedor
+    :param since: Solo logs a partir de este momento (segundos epoch); al
+        reconectar evita volver a recibir todo el historial del contenedor
     :yield: Líneas de log en tiempo real
     """
     try:
-        client = docker.from_env()
-        container = client.containers.get(container_name)
-        for log in container.logs(stream=True, follow=True):
+        for log in obtener_cliente().api.logs(container_name, stream=True, follow=True, since=since):
             yield log.decode("utf-8", errors="replace")
     except docker.errors.NotFound:
         yield f"[ERROR] Contenedor '{container_name}' no encontrado"
     except docker.errors.APIError as e:
         yield f"[ERROR] Error de API Docker: {e}"
-    except ConnectionError:
+    except (ConnectionError, docker.errors.DockerException):
+        descartar_cliente()
         yield "[ERROR] No se puede conectar al daemon de Docker"
     except Exception as e:
         yield f"[ERROR] Error inesperado en streaming de {container_name}: {e}"
@@ -51,10 +89,72 @@ def restart_docker_container(container_name: str):
     """
     Reinicia un contenedor Docker usando su nombre o ID.
     """
-    client = docker.from_env()
     try:
-        container = client.containers.get(container_name)
+        container = obtener_cliente().containers.get(container_name)
         container.restart()
         print(f"Contenedor Docker {container_name} reiniciado correctamente.")
     except Exception as e:
         print(f"Error al reiniciar contenedor Docker {container_name}: {e}")
+
+class LectorIncrementalDocker:
+    """
+    Lee solo los logs nuevos de cada contenedor desde la última consulta.
+
+    La primera vez pide las últimas `tail` líneas; después pide a Docker los
+    logs desde el timestamp de la última línea vista (con timestamps
+    activados) y descarta las repetidas. Consultar muchos contenedores cada
+    pocos segundos cuesta lo que escribieron, no tail × contenedores.
+    """
+
+    def __init__(self, tail: int = 100):
+        self.tail = tail
+        # contenedor -> (ns de la última línea vista, cuántas líneas con ese mismo ns ya se vieron)
+        self.cursores: Dict[str, Tuple[int, int]] = {}
+        # contenedor -> últimas `tail` líneas vistas
+        self.recientes: Dict[str, deque] = {}
+
+    def leer_nuevos(self, container_name: str) -> str:
+        """
+        :return: Las líneas nuevas (sin el timestamp que agrega Docker), o un
+            texto que empieza con [ERROR]
+        """
+        cursor = self.cursores.get(container_name)
+        try:
+            if cursor is None or cursor[0] < 0:
+                # Todavía no vimos ninguna línea: no hay desde dónde pedir
+                datos = obtener_cliente().api.logs(container_name, stdout=True, stderr=True,
+                                                   timestamps=True, tail=self.tail)
+            else:
+                # since es en segundos: se piden desde el segundo del cursor y
+                # se descartan las líneas de ese segundo que ya habíamos visto
+                datos = obtener_cliente().api.logs(container_name, stdout=True, stderr=True,
+                                                   timestamps=True, since=cursor[0] // 1_000_000_000)
+        except docker.errors.NotFound:
+            return f"[ERROR] Contenedor '{container_name}' no encontrado. Verifica que el nombre sea correcto."
+        except docker.errors.APIError as e:
+            return f"[ERROR] Error de API Docker: {e}"
+        except (ConnectionError, docker.errors.DockerException):
+            descartar_cliente()
+            return "[ERROR] No se puede conectar al daemon de Docker. ¿Está Docker ejecutándose?"
+        except Exception as e:
+            return f"[ERROR] Error inesperado obteniendo logs de {container_name}: {e}"
+
+        nuevas, self.cursores[container_name] = lineas_desde_cursor(
+            datos.decode("utf-8", errors="replace").splitlines(), cursor)
+        return "\n".join(nuevas) + "\n" if nuevas else ""
+
+    def ultimas_lineas(self, container_name: str) -> str:
+        """
+        Las últimas `tail` líneas del contenedor, igual que get_docker_logs,
+        pero a Docker solo se le piden las escritas desde la consulta anterior.
+        """
+        nuevas = self.leer_nuevos(container_name)
+        if nuevas.startswith("[ERROR]"):
+            return nuevas
+        recientes = self.recientes.setdefault(container_name, deque(maxlen=self.tail))
+        recientes.extend(nuevas.splitlines())
+        return "".join(linea + "\n" for linea in recientes)
+
+    def olvidar(self, container_name: str) -> None:
+        self.cursores.pop(container_name, None)
+        self.recientes.pop(container_name, None)
@@ -1,5 +1,60 @@
+import os
+import threading
+
 from kubernetes import client, config
 
+# Conexiones HTTP al API server que el cliente compartido mantiene abiertas
+# (una por hilo que lo use a la vez, p. ej. un stream por pod)
+POOL_CONEXIONES = 32
+# Si está definida, se usa este API server sin credenciales en lugar de la
+# configuración del cluster o de kubectl (p. ej. un "kubectl proxy" o un API server falso en pruebas)
+VARIABLE_HOST = "K8S_API_HOST"
+
+_api = None
+_lock_api = threading.Lock()
+
+def _cargar_configuracion(host: str = None):
+    """
+    Lee la configuración una sola vez. El hook que trae la configuración
+    renueva el token solo cuando venció, mientras se reutilice el mismo objeto.
+    """
+    configuracion = client.Configuration()
+    host = host or os.environ.get(VARIABLE_HOST)
+    if host:
+        configuracion.host = host
+    else:
+        try:
+            config.load_incluster_config(client_configuration=configuracion)  # Dentro del cluster
+        except config.ConfigException:
+            config.load_kube_config(client_configuration=configuracion)  # Localmente con kubectl configurado
+    configuracion.connection_pool_maxsize = POOL_CONEXIONES
+    return configuracion
+
+def obtener_api(host: str = None):
+    """CoreV1Api compartida por todo el proceso; se crea (y abre sus conexiones) la primera vez"""
+    global _api
+    if _api is None:
+        with _lock_api:
+            if _api is None:
+                _api = client.CoreV1Api(client.ApiClient(_cargar_configuracion(host)))
+    return _api
+
+def descartar_api():
+    """Olvida el cliente compartido (credenciales rechazadas, cambio de contexto); el próximo uso crea otro"""
+    global _api
+    with _lock_api:
+        if _api is not None:
+            try:
+                _api.api_client.close()
+            except Exception:
+                pass
+            _api = None
+
+def _descartar_si_no_autorizado(error):
+    # Un 401 con credenciales que el hook no sabía vencidas (revocadas, rotadas)
+    if error.status == 401:
+        descartar_api()
+
 def get_k8s_pod_logs(pod_name: str, namespace: str = "default", tail: int = 100) -> str:
     """
     Lee los últimos logs de un pod en Kubernetes.
@@ -10,14 +65,7 @@ def get_k8s_pod_logs(pod_name: str, namespace: str = "default", tail: int = 100)
     :return: Logs como string
     """
     try:
-        # Cargar configuración según contexto
-        try:
-            config.load_incluster_config()  # Dentro del cluster
-        except:
-            config.load_kube_config()  # Localmente con kubectl configurado
-
-        v1 = client.CoreV1Api()
-        logs = v1.read_namespaced_pod_log(
+        logs = obtener_api().read_namespaced_pod_log(
             name=pod_name,
             namespace=namespace,
             tail_lines=tail,
@@ -27,6 +75,7 @@ def get_k8s_pod_logs(pod_name: str, namespace: str = "default", tail: int = 100)
     except config.ConfigException:
             return "[ERROR] No se pudo cargar configuración de Kubernetes. ¿Tienes kubectl configurado?"
     except client.ApiException as e:
+            _descartar_si_no_autorizado(e)
             if e.status == 404:
                 return f"[ERROR] Pod '{pod_name}' no encontrado en namespace '{namespace}'"
             else:
@@ -46,13 +95,7 @@ def stream_k8s_pod_logs(pod_name: str, namespace: str = "default"):
     :yield: Líneas de log en tiempo real
     """
     try:
-        try:
-            config.load_incluster_config()
-        except:
-            config.load_kube_config()
-
-        v1 = client.CoreV1Api()
-        resp = v1.read_namespaced_pod_log(
+        resp = obtener_api().read_namespaced_pod_log(
             name=pod_name,
             namespace=namespace,
             follow=True,
@@ -63,6 +106,7 @@ def stream_k8s_pod_logs(pod_name: str, namespace: str = "default"):
     except config.ConfigException:
         yield "[ERROR] No se pudo cargar configuración de Kubernetes"
     except client.ApiException as e:
+        _descartar_si_no_autorizado(e)
         if e.status == 404:
             yield f"[ERROR] Pod '{pod_name}' no encontrado en namespace '{namespace}'"
         else:
@@ -75,13 +119,7 @@ def restart_k8s_pod(pod_name: str, namespace: str = "default"):
     Reinicia un pod de Kubernetes eliminándolo; el controlador lo recreará.
     """
     try:
-        try:
-            config.load_incluster_config()
-        except:
-            config.load_kube_config()
-
-        v1 = client.CoreV1Api()
-        v1.delete_namespaced_pod(name=pod_name, namespace=namespace)
+        obtener_api().delete_namespaced_pod(name=pod_name, namespace=namespace)
         print(f"Pod Kubernetes {pod_name} eliminado. El controlador lo recreará automáticamente.")
     except Exception as e:
         print(f"Error al reiniciar pod {pod_name}: {e}")
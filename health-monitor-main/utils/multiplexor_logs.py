@@ -0,0 +1,116 @@
+"""
+Seguimiento simultáneo de los logs de muchos contenedores y pods.
+
+Cada stream (docker logs -f, kubectl logs -f) se queda bloqueado esperando
+líneas, así que cada uno tiene su propio hilo lector. Los lectores parten lo
+que reciben en líneas y las dejan, con el nombre del servicio, en una única
+cola acotada que consume una sola etapa de análisis. Si el análisis se
+atrasa, la cola llena frena a los lectores en lugar de acumular memoria.
+"""
+import itertools
+import queue
+import threading
+from typing import Callable, Dict, Iterable, List, Tuple
+
+TAMANO_COLA = 10000
+# Segundos antes de volver a abrir un stream que terminó (reinicio, corte de conexión)
+ESPERA_RECONEXION = 5.0
+# Líneas que la etapa de análisis saca de la cola de una vez como máximo
+TAMANO_LOTE = 1000
+
+
+class MultiplexorLogs:
+    def __init__(self, tamano_cola: int = TAMANO_COLA, espera_reconexion: float = ESPERA_RECONEXION):
+        self.cola: queue.Queue = queue.Queue(maxsize=tamano_cola)
+        self.espera_reconexion = espera_reconexion
+        # nombre -> (id del lector, hilo lector, evento para detenerlo)
+        self._lectores: Dict[str, Tuple[int, threading.Thread, threading.Event]] = {}
+        # Cada lector tiene un id propio: si se deja de seguir un nombre y se
+        # vuelve a seguir (otro contenedor), las líneas que el lector viejo
+        # todavía deje en la cola no se atribuyen al nuevo
+        self._ids = itertools.count()
+
+    def seguir(self, nombre: str, abrir_stream: Callable[[], Iterable[str]]) -> None:
+        """
+        Empieza a seguir un stream en su propio hilo.
+
+        :param nombre: Nombre del servicio; acompaña a cada línea en la cola
+        :param abrir_stream: Función que abre el stream (p. ej. stream_docker_logs
+            con sus argumentos). Se vuelve a llamar cada vez que el stream termina
+        """
+        if nombre in self._lectores:
+            return
+        detener = threading.Event()
+        lector = next(self._ids)
+        hilo = threading.Thread(target=self._leer, args=(nombre, lector, abrir_stream, detener),
+                                name=f"lector-{nombre}", daemon=True)
+        self._lectores[nombre] = (lector, hilo, detener)
+        hilo.start()
+
+    def dejar_de_seguir(self, nombre: str) -> None:
+        """
+        El lector se detiene en cuanto reciba la próxima línea (un stream
+        bloqueado no se puede interrumpir desde fuera); sus hilos son daemon.
+        """
+        lector = self._lectores.pop(nombre, None)
+        if lector is not None:
+            lector[2].set()
+
+    def siguiendo(self) -> List[str]:
+        return list(self._lectores)
+
+    def detener(self) -> None:
+        for nombre in list(self._lectores):
+            self.dejar_de_seguir(nombre)
+
+    def siguiente_lote(self, maximo: int = TAMANO_LOTE, timeout: float = 0.5) -> List[Tuple[str, str]]:
+        """
+        Espera hasta `timeout` segundos a que haya líneas y devuelve las que
+        haya en la cola (como mucho `maximo`) como (nombre, línea). Las líneas
+        de lectores que ya se dejaron de seguir se descartan.
+        """
+        try:
+            elementos = [self.cola.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while len(elementos) < maximo:
+            try:
+                elementos.append(self.cola.get_nowait())
+            except queue.Empty:
+                break
+        vigentes = {nombre: lector[0] for nombre, lector in self._lectores.items()}
+        return [(nombre, linea) for nombre, lector, linea in elementos if vigentes.get(nombre) == lector]
+
+    def _entregar(self, elemento: Tuple[str, int, str], detener: threading.Event) -> bool:
+        # Con la cola llena esperamos, pero sin quedarnos colgados si nos detienen
+        while not detener.is_set():
+            try:
+                self.cola.put(elemento, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _leer(self, nombre: str, lector: int, abrir_stream: Callable[[], Iterable[str]],
+              detener: threading.Event) -> None:
+        while not detener.is_set():
+            # Los streams entregan fragmentos, no líneas: partimos por saltos de línea
+            pendiente = ""
+            try:
+                for fragmento in abrir_stream():
+                    if detener.is_set():
+                        return
+                    pendiente += fragmento
+                    if "\n" not in fragmento:
+                        continue
+                    *lineas, pendiente = pendiente.split("\n")
+                    for linea in lineas:
+                        if not self._entregar((nombre, lector, linea.rstrip("\r")), detener):
+                            return
+                if pendiente and not self._entregar((nombre, lector, pendiente), detener):
+                    return
+            except Exception as e:
+                print(f"[WARNING] Error en el stream de {nombre}: {e}")
+            # El stream terminó: lo volvemos a abrir después de una espera
+            if detener.wait(self.espera_reconexion):
+                return
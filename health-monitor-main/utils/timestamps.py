@@ -0,0 +1,187 @@
+"""
+Parseo rápido de timestamps de logs a milisegundos epoch (enteros).
+
+Reconoce por posición, sin regex, los formatos que vemos casi siempre al
+principio de la línea:
+  - [YYYY-MM-DD HH:MM:SS]           (el formato de nuestras aplicaciones)
+  - YYYY-MM-DDTHH:MM:SS[.fff][Z|±HH:MM]   (ISO-8601)
+  - 2024-01-01T12:00:00.123456789Z  (prefijo RFC3339Nano de `docker logs --timestamps`;
+    epoch_ns_prefijo lo lee con precisión de nanosegundos)
+Solo si la línea no empieza así se recurre a una regex. La parte de fecha
+se cachea (cambia una vez al día) y solo la hora se calcula en cada línea.
+Las horas sin zona se interpretan como UTC.
+"""
+import calendar
+import re
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# El formato que extraían los plugins con _extraer_timestamp
+_REGEX_CORCHETES = re.compile(r"\[([\d-]+\s[\d:]+)\]")
+# Último recurso: una fecha-hora ISO en cualquier parte de la línea
+_REGEX_ISO = re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}")
+
+_MAX_DIAS_CACHEADOS = 4096
+# "YYYY-MM-DD" -> ms epoch de la medianoche UTC (None si la fecha no es válida)
+_cache_dias: Dict[str, Optional[int]] = {}
+
+
+def _epoch_dia_ms(fecha: str) -> Optional[int]:
+    try:
+        return _cache_dias[fecha]
+    except KeyError:
+        pass
+    try:
+        if not (fecha[:4].isdigit() and fecha[5:7].isdigit() and fecha[8:10].isdigit()):
+            raise ValueError(fecha)
+        dia = datetime(int(fecha[:4]), int(fecha[5:7]), int(fecha[8:10]))
+        valor = calendar.timegm(dia.timetuple()) * 1000
+    except ValueError:
+        valor = None
+    if len(_cache_dias) >= _MAX_DIAS_CACHEADOS:
+        _cache_dias.clear()
+    _cache_dias[fecha] = valor
+    return valor
+
+
+def _dos_digitos(texto: str, i: int) -> int:
+    """Entero de dos dígitos en texto[i:i+2], o -1 si no son dígitos."""
+    a = texto[i:i + 2]
+    # Solo dígitos ASCII: "²".isdigit() es True pero int("²") falla
+    return int(a) if len(a) == 2 and "0" <= a[0] <= "9" and "0" <= a[1] <= "9" else -1
+
+
+def parsear_en(texto: str, i: int = 0) -> Optional[int]:
+    """
+    Parsea una fecha-hora que empieza exactamente en texto[i] con el formato
+    YYYY-MM-DD[T ]HH:MM:SS, con fracción y zona opcionales.
+
+    :return: Milisegundos epoch, o None si en esa posición no hay una fecha válida
+    """
+    if len(texto) < i + 19 or texto[i + 4] != "-" or texto[i + 7] != "-" \
+            or texto[i + 13] != ":" or texto[i + 16] != ":" or texto[i + 10] not in "T ":
+        return None
+    base = _epoch_dia_ms(texto[i:i + 10])
+    if base is None:
+        return None
+    horas = _dos_digitos(texto, i + 11)
+    minutos = _dos_digitos(texto, i + 14)
+    segundos = _dos_digitos(texto, i + 17)
+    # 60 se admite por los segundos intercalares
+    if not (0 <= horas < 24 and 0 <= minutos < 60 and 0 <= segundos <= 60):
+        return None
+    ms = base + horas * 3_600_000 + minutos * 60_000 + segundos * 1000
+
+    j = i + 19
+    fin = len(texto)
+    if j < fin and texto[j] in ".,":
+        # Fracción de cualquier precisión (hasta nanosegundos): nos quedamos con los ms
+        k = j + 1
+        while k < fin and "0" <= texto[k] <= "9":
+            k += 1
+        fraccion = texto[j + 1:k]
+        if fraccion:
+            ms += int(fraccion[:3].ljust(3, "0"))
+        j = k
+    if j < fin:
+        zona = texto[j]
+        if zona == "Z":
+            pass
+        elif zona in "+-":
+            horas_zona = _dos_digitos(texto, j + 1)
+            minutos_zona = _dos_digitos(texto, j + 4 if texto[j + 3:j + 4] == ":" else j + 3)
+            if horas_zona >= 0:
+                desfase = horas_zona * 3_600_000 + max(minutos_zona, 0) * 60_000
+                # 12:00+02:00 son las 10:00 UTC
+                ms += -desfase if zona == "+" else desfase
+    return ms
+
+
+def epoch_ms(linea: str) -> Optional[int]:
+    """
+    Timestamp de una línea de log en milisegundos epoch.
+
+    :param linea: Línea de log completa (o solo el timestamp)
+    :return: Entero de ms, o None si la línea no trae una fecha reconocible
+    """
+    ms = parsear_en(linea, 1 if linea[:1] == "[" else 0)
+    if ms is not None:
+        return ms
+    match = _REGEX_ISO.search(linea)
+    return parsear_en(linea, match.start()) if match else None
+
+
+def extraer_timestamp_texto(linea: str) -> Optional[str]:
+    """
+    Mismo resultado que la regex histórica de _extraer_timestamp, pero
+    resolviendo por posición el caso habitual "[YYYY-MM-DD HH:MM:SS] ...".
+    """
+    if linea[:1] == "[" and linea[20:21] == "]" and linea[11:12] == " " and parsear_en(linea, 1) is not None:
+        return linea[1:20]
+    match = _REGEX_CORCHETES.search(linea)
+    return match.group(1) if match else None
+
+
+def extraer_timestamp(linea: str) -> Tuple[Optional[str], Optional[int]]:
+    """
+    :return: (timestamp como texto, igual que _extraer_timestamp; ms epoch)
+    """
+    if linea[:1] == "[":
+        ms = parsear_en(linea, 1)
+        if ms is not None and linea[20:21] == "]" and linea[11:12] == " ":
+            return linea[1:20], ms
+    return extraer_timestamp_texto(linea), epoch_ms(linea)
+
+
+def epoch_ns_prefijo(timestamp: str) -> Optional[int]:
+    """
+    "2024-07-14T14:00:00.123456789Z" (el prefijo de `docker logs --timestamps`
+    y de `kubectl logs --timestamps`) -> nanosegundos epoch. Se recortan los
+    ceros finales de la fracción, así que no se pueden comparar como texto.
+    Un desfase ±HH:MM se aplica igual que en parsear_en.
+    """
+    # Con zona y fracción truncada a ms; los ms se cambian por la fracción completa
+    ms = parsear_en(timestamp)
+    if ms is None:
+        return None
+    fraccion = ""
+    if timestamp[19:20] in (".", ","):
+        k = 20
+        while k < len(timestamp) and "0" <= timestamp[k] <= "9":
+            k += 1
+        fraccion = timestamp[20:k]
+    segundos_ms = ms - (int(fraccion[:3].ljust(3, "0")) if fraccion else 0)
+    return segundos_ms * 1_000_000 + int(fraccion.ljust(9, "0")[:9] or 0)
+
+
+def lineas_desde_cursor(lineas: Iterable[str],
+                        cursor: Optional[Tuple[int, int]]) -> Tuple[List[str], Tuple[int, int]]:
+    """
+    De líneas con el prefijo de timestamp de docker/kubectl, las que son
+    posteriores al cursor, sin el prefijo. Los logs se piden "desde" un
+    segundo, así que la respuesta repite las líneas ya vistas de ese segundo.
+
+    :param cursor: (ns de la última línea vista, cuántas líneas con ese mismo
+        ns ya se vieron); None si todavía no se vio ninguna
+    :return: (líneas nuevas, cursor actualizado)
+    """
+    ultimo_ns, repetidas = cursor or (-1, 0)
+    vistas_en_cursor = 0
+    nuevas = []
+    for linea in lineas:
+        timestamp, _, texto = linea.partition(" ")
+        ns = epoch_ns_prefijo(timestamp)
+        if ns is None:
+            nuevas.append(linea)
+            continue
+        if ns < ultimo_ns:
+            continue
+        if ns == ultimo_ns:
+            vistas_en_cursor += 1
+            if vistas_en_cursor <= repetidas:
+                continue
+            repetidas += 1
+        else:
+            ultimo_ns, repetidas, vistas_en_cursor = ns, 1, 1
+        nuevas.append(texto)
+    return nuevas, (ultimo_ns, repetidas)
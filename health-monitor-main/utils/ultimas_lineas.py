@@ -0,0 +1,43 @@
+"""
+Lectura de las últimas N líneas de un archivo sin leerlo entero.
+
+Equivale a f.readlines()[-n:], pero recorre el archivo desde el final en
+bloques de tamaño fijo contando saltos de línea hasta tener N líneas, y solo
+decodifica esos bytes. Mostrar 50 líneas de un log de 20 GB cuesta lo mismo
+que de uno de 20 KB.
+"""
+import io
+import os
+from typing import List
+
+TAMANO_BLOQUE_COLA = 64 * 1024
+
+
+def leer_ultimas_lineas(ruta: str, cantidad: int, encoding: str = "utf-8",
+                        errors: str = "strict", tamano_bloque: int = TAMANO_BLOQUE_COLA) -> List[str]:
+    """
+    :param ruta: Archivo de log
+    :param cantidad: Número de líneas a devolver
+    :return: Las últimas `cantidad` líneas, con su salto de línea, igual que readlines()
+    """
+    if cantidad <= 0:
+        return []
+    with open(ruta, "rb") as f:
+        posicion = f.seek(0, os.SEEK_END)
+        bloques = []
+        saltos = 0
+        # Con cantidad + 1 saltos sabemos dónde empieza la primera línea que
+        # necesitamos (el último salto puede ser el final de la última línea)
+        while posicion > 0 and saltos <= cantidad:
+            tamano = min(tamano_bloque, posicion)
+            posicion -= tamano
+            f.seek(posicion)
+            bloque = f.read(tamano)
+            saltos += bloque.count(b"\n")
+            bloques.append(bloque)
+    datos = b"".join(reversed(bloques))
+    if posicion > 0:
+        # Descartamos la línea incompleta del principio: decodificamos desde un límite de línea
+        datos = datos[datos.index(b"\n") + 1:]
+    texto = io.TextIOWrapper(io.BytesIO(datos), encoding=encoding, errors=errors)
+    return texto.readlines()[-cantidad:]
@@ -3,16 +3,35 @@ import os
 import subprocess
 import sys
 import json
-from datetime import datetime
-from utils.docker_utils import get_docker_logs
+import time
+from datetime import datetime, timezone
+from utils.docker_utils import LectorIncrementalDocker
 from utils.k8s_utils import get_k8s_pod_logs
-from utils.file_utils import monitorear_log
+from utils.file_utils import monitorear_log, monitorear_logs
+from utils.checkpoints import AlmacenCheckpoints
 from utils.config_loader import listar_repositorios_disponibles, generar_configuracion_automatica
+from utils.analisis_columnar import NIVEL_CRITICAL, NIVEL_ERROR, NIVEL_WARNING, contar_niveles
+from utils.analisis_compartido import AnalizadorCompartido
+from utils.analisis_paralelo import analizar_archivo_paralelo
+from utils.historial_logs import analizar_historial, segmentos_historial
+from utils.indice_tiempos import analizar_intervalo, parsear_fecha
+from utils.ultimas_lineas import leer_ultimas_lineas
+from plugins.registro import RegistroPlugins
 
 # Definir rutas de manera más robusta
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 CONFIG_PATH = os.path.join(BASE_DIR, "config", "monitor_config.json")
 ESTADO_PATH = os.path.join(BASE_DIR, "frontend", "estado_actual.json")
+# Segundos entre consultas al seguir los logs de un contenedor Docker
+INTERVALO_DOCKER = 2
+
+# Monitores especializados: se descubren una vez y se reutilizan entre análisis
+registro_plugins = RegistroPlugins()
+PLUGINS_MENU = {
+    "1": ("avionics", "Avionics"),
+    "2": ("asset_api", "Asset API"),
+    "3": ("runtime", "Runtime"),
+}
 
 def actualizar_estado_sistema(servicios_estado):
     """
@@ -35,8 +54,8 @@ def read_from_docker():
 import subprocess
 import sys
 import os
-from utils.docker_utils import get_docker_logs
 from utils.k8s_utils import get_k8s_pod_logs
+from utils.k8s_selector import get_k8s_logs_por_selector
 def launch_config_editor():
     editor_path = os.path.join(os.path.dirname(__file__), 'utils', 'config_editor.py')
     subprocess.Popen([sys.executable, editor_path])
@@ -45,18 +64,45 @@ def launch_config_editor():
 def read_from_docker():
     container_name = input("Nombre o ID del contenedor Docker: ")
 
-    logs = get_docker_logs(container_name, tail=50)
+    # El mismo lector sirve para seguir después solo con las líneas nuevas
+    lector = LectorIncrementalDocker(tail=50)
+    logs = lector.ultimas_lineas(container_name)
     print("\n===== LOGS DOCKER =====")
     print(logs)
+    if logs.startswith("[ERROR]") or input("¿Seguir los logs nuevos? (s/N): ").lower() != 's':
+        return
+    seguir_docker(lector, container_name)
+
+def seguir_docker(lector, container_name, intervalo=INTERVALO_DOCKER):
+    """
+    Consulta el contenedor cada `intervalo` segundos y muestra lo nuevo: a
+    Docker solo se le pide lo escrito desde la consulta anterior.
+    """
+    print("Presiona Ctrl+C para volver al menú")
+    try:
+        while True:
+            time.sleep(intervalo)
+            nuevos = lector.leer_nuevos(container_name)
+            if nuevos.startswith("[ERROR]"):
+                print(nuevos)
+                return
+            print(nuevos, end="")
+    except KeyboardInterrupt:
+        print("\nVolviendo al menú principal...")
 
 def read_from_k8s():
-    pod_name = input("Nombre del pod en Kubernetes: ")
+    pod_name = input("Nombre del pod en Kubernetes (vacío para elegir por label selector): ")
+    label_selector = "" if pod_name else input("Label selector (p. ej. app=asset-api): ")
 
     namespace = input("Namespace (default si vacío): ") or "default"
 
     namespace = input("Namespace (si no ponés nada, es 'default'): ") or "default"
 
-    logs = get_k8s_pod_logs(pod_name, namespace=namespace, tail=50)
+    if label_selector:
+        # Todas las réplicas a la vez, cada línea con su [pod/contenedor]
+        logs = get_k8s_logs_por_selector(namespace, label_selector, tail=50)
+    else:
+        logs = get_k8s_pod_logs(pod_name, namespace=namespace, tail=50)
     print("\n===== LOGS KUBERNETES =====")
     print(logs)
 
@@ -99,24 +145,43 @@ def monitor_configured_repos():
         print(f"   Ruta: {repo['ruta']}")
         print(f"   {repo['descripcion']}")
         print()
-    print(f"{len(repositorios) + 1}. Ruta personalizada")
-    opcion = input(f"Elige una opción (1-{len(repositorios) + 1}): ")
+    print(f"{len(repositorios) + 1}. Todos los repositorios a la vez")
+    print(f"{len(repositorios) + 2}. Ruta personalizada")
+    opcion = input(f"Elige una opción (1-{len(repositorios) + 2}): ")
     if opcion.isdigit() and 1 <= int(opcion) <= len(repositorios):
         repo_seleccionado = repositorios[int(opcion) - 1]
         ruta_archivo = repo_seleccionado['ruta']
         print(f"Monitoreando: {repo_seleccionado['nombre']}")
         print(f"Archivo: {ruta_archivo}")
+    elif opcion == str(len(repositorios) + 1):
+        monitorear_repositorios(repositorios)
+        return
     else:
         ruta_archivo = input("Escribe la ruta completa: ")
     monitorear_archivo(ruta_archivo)
 
+def monitorear_repositorios(repositorios):
+    """
+    Monitorea en tiempo real todos los repositorios configurados en una sola salida
+    """
+    rutas = {repo['id']: repo['ruta'] for repo in repositorios if repo['ruta'].strip()}
+    if not rutas:
+        print("Error: Ningún repositorio tiene ruta de logs")
+        return
+    print("Presiona Ctrl+C para volver al menú")
+    try:
+        monitorear_logs(rutas, checkpoints=AlmacenCheckpoints())
+    except KeyboardInterrupt:
+        print("\nVolviendo al menú principal...")
+    except Exception as e:
+        print(f"Error monitoreando repositorios: {e}")
+
 def mostrar_logs_archivo(file_path):
     """
     Muestra las últimas 50 líneas de un archivo de log
     """
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            logs = "".join(f.readlines()[-50:])
+        logs = "".join(leer_ultimas_lineas(file_path, 50))
         print("\n===== LOGS FICHERO =====")
         print(logs)
     except Exception as e:
@@ -132,7 +197,7 @@ def monitorear_archivo(file_path):
     print(f"Monitoreando: {file_path}")
     print("Presiona Ctrl+C para volver al menú")
     try:
-        monitorear_log(file_path)
+        monitorear_log(file_path, checkpoints=AlmacenCheckpoints())
     except KeyboardInterrupt:
         print("\nVolviendo al menú principal...")
     except Exception as e:
@@ -204,27 +269,24 @@ def monitorear_con_plugin_especializado():
     print("1. Avionics - Sistemas de navegación y vuelo")
     print("2. Asset API - APIs REST y servicios web") 
     print("3. Runtime - Memoria, CPU y rendimiento")
+    print("4. Todos - Log combinado, leído una sola vez")
     
-    opcion = input("Seleccione plugin (1-3): ")
+    opcion = input("Seleccione plugin (1-4): ")
     archivo = input("Ruta del archivo de logs: ")
     
     try:
-        # CORRECCIÓN: Usar nombres consistentes en minúsculas para todos los imports
-        if opcion == "1":
-            from plugins.avionics import AvionicsMonitor
-            monitor = AvionicsMonitor()
-            plugin_name = "Avionics"
-        elif opcion == "2":
-            from plugins.assetapi import AssetAPIMonitor  # Corregido: siempre minúsculas
-            monitor = AssetAPIMonitor()
-            plugin_name = "Asset API"
-        elif opcion == "3":
-            from plugins.runtime import RuntimeMonitor
-            monitor = RuntimeMonitor()
-            plugin_name = "Runtime"
-        else:
+        if opcion == "4":
+            monitorear_con_todos_los_plugins(archivo)
+            return
+        if opcion not in PLUGINS_MENU:
             print("Error: Opción no válida")
             return
+        # El registro reutiliza el monitor entre llamadas (y lo reconstruye si cambia config.yaml)
+        plugin_id, plugin_name = PLUGINS_MENU[opcion]
+        monitor = registro_plugins.obtener(plugin_id)
+        if monitor is None:
+            print(f"Error: No se pudo cargar el plugin {plugin_name}")
+            return
         
         print(f"\nAnalizando con plugin {plugin_name}")
         print(f"Archivo: {archivo}")
@@ -233,36 +295,31 @@ def monitorear_con_plugin_especializado():
             print(f"Error: Archivo no encontrado - {archivo}")
             return
         
-        # Leer y analizar logs
-        with open(archivo, 'r', encoding='utf-8') as f:
-            lineas = f.readlines()[-50:]
-        
-        errores_criticos = 0
-        warnings = 0
-        errores = 0
+        # Leer y analizar logs (solo se lee el final del archivo)
+        lineas = leer_ultimas_lineas(archivo, 50)
         
         print(f"\nAnalizando {len(lineas)} líneas de log...")
         print("-" * 60)
         
-        for linea in lineas:
+        # Analizamos todo el bloque de una vez: columnas en vez de un dict por
+        # línea. El mismo lote se reutiliza después para evaluar la salud
+        lote = monitor.analizar_lote(lineas)
+        
+        etiquetas = {NIVEL_CRITICAL: "CRITICO", NIVEL_ERROR: "ERROR", NIVEL_WARNING: "WARNING"}
+        for linea, nivel in zip(lineas, lote["nivel"]):
             linea = linea.strip()
-            if linea:
-                analisis = monitor.analizar_patron_log(linea)
-                
-                if analisis["nivel"] == "CRITICAL":
-                    errores_criticos += 1
-                    print(f"CRITICO: {linea[:70]}...")
-                elif analisis["nivel"] == "ERROR":
-                    errores += 1
-                    print(f"ERROR: {linea[:70]}...")
-                elif analisis["nivel"] == "WARNING":
-                    warnings += 1
-                    print(f"WARNING: {linea[:70]}...")
+            if linea and nivel in etiquetas:
+                print(f"{etiquetas[nivel]}: {linea[:70]}...")
+        
+        conteo = contar_niveles(lote)
+        errores_criticos = conteo["CRITICAL"]
+        errores = conteo["ERROR"]
+        warnings = conteo["WARNING"]
         
         print("-" * 60)
         
         # Evaluación final
-        estado_salud = monitor.evaluar_salud_servicio(lineas)
+        estado_salud = monitor.evaluar_salud_servicio(lineas, analisis=lote)
         
         print(f"\n=== RESUMEN DEL ANÁLISIS ===")
         print(f"Estado del servicio: {estado_salud}")
@@ -300,7 +357,7 @@ def monitorear_con_plugin_especializado():
             respuesta = input(f"\n¿Iniciar monitoreo continuo? (s/N): ")
             if respuesta.lower() == 's':
                 print("Iniciando monitoreo continuo... (Ctrl+C para detener)")
-                monitorear_log(archivo)
+                monitorear_log(archivo, checkpoints=AlmacenCheckpoints(), analizador=monitor)
         
     except ImportError as e:
         print(f"Error importando plugin: {e}")
@@ -308,6 +365,125 @@ def monitorear_con_plugin_especializado():
     except Exception as e:
         print(f"Error durante análisis: {e}")
 
+def monitorear_con_todos_los_plugins(archivo):
+    """
+    Analiza un log combinado con todos los plugins especializados.
+    El archivo se lee una sola vez y todos los monitores comparten las líneas.
+    """
+    if not os.path.exists(archivo):
+        print(f"Error: Archivo no encontrado - {archivo}")
+        return
+    
+    monitores = {}
+    for plugin_id, plugin_name in PLUGINS_MENU.values():
+        monitor = registro_plugins.obtener(plugin_id)
+        if monitor is not None:
+            monitores[plugin_name] = monitor
+    
+    resultados = AnalizadorCompartido(monitores).analizar_archivo(archivo, ultimas=50)
+    
+    print("\n=== RESUMEN POR PLUGIN ===")
+    print(f"Archivo: {archivo}")
+    estado_para_frontend = []
+    for plugin_name, resultado in resultados.items():
+        conteo = resultado["conteo"]
+        print(f"{plugin_name}: {resultado['estado']} "
+              f"({conteo['CRITICAL']} críticos, {conteo['ERROR']} errores, {conteo['WARNING']} warnings)")
+        estado_para_frontend.append({
+            "name": plugin_name,
+            "status": resultado["estado"],
+            "last_error": f"{conteo['CRITICAL']} críticos, {conteo['ERROR']} errores" if conteo["CRITICAL"] + conteo["ERROR"] > 0 else None,
+            "restarts_last_hour": 0,
+            "last_checked": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        })
+    actualizar_estado_sistema(estado_para_frontend)
+
+def analizar_archivo_completo():
+    """
+    Analiza un archivo de log entero (no solo las últimas líneas) repartiendo
+    el trabajo entre todos los núcleos. Pensado para análisis post-incidente.
+    """
+    print("\n=== ANÁLISIS COMPLETO DE LOG ===")
+    for opcion, (_, plugin_name) in PLUGINS_MENU.items():
+        print(f"{opcion}. {plugin_name}")
+    opcion = input("Seleccione plugin (1-3): ")
+    archivo = input("Ruta del archivo de logs: ")
+    
+    if opcion not in PLUGINS_MENU:
+        print("Error: Opción no válida")
+        return
+    segmentos = segmentos_historial(archivo)
+    if not segmentos:
+        print(f"Error: Archivo no encontrado - {archivo}")
+        return
+    
+    # Los segmentos rotados (app.log.1, app.log.2.gz...) se pueden incluir para ver toda la historia
+    incluir_rotados = False
+    if len(segmentos) > 1 or not os.path.exists(archivo):
+        print(f"Se encontraron {len(segmentos)} segmentos (incluidos los rotados/comprimidos)")
+        incluir_rotados = not os.path.exists(archivo) or input("¿Analizar el historial completo? (s/N): ").lower() == 's'
+    
+    try:
+        if incluir_rotados:
+            reporte = analizar_historial(archivo, PLUGINS_MENU[opcion][0])
+        else:
+            reporte = analizar_archivo_paralelo(archivo, PLUGINS_MENU[opcion][0])
+    except Exception as e:
+        print(f"Error durante análisis: {e}")
+        return
+    mostrar_reporte(reporte)
+
+def analizar_intervalo_tiempo():
+    """
+    Analiza solo un intervalo de tiempo de un log (p. ej. los 10 minutos de
+    un incidente). Un índice junto al log permite saltar directo a ese tramo.
+    """
+    print("\n=== ANÁLISIS DE UN INTERVALO DE TIEMPO ===")
+    for opcion, (_, plugin_name) in PLUGINS_MENU.items():
+        print(f"{opcion}. {plugin_name}")
+    opcion = input("Seleccione plugin (1-3): ")
+    archivo = input("Ruta del archivo de logs: ")
+    desde = parsear_fecha(input("Desde (YYYY-MM-DD HH:MM, UTC): "))
+    hasta = parsear_fecha(input("Hasta (YYYY-MM-DD HH:MM, UTC): "))
+    
+    if opcion not in PLUGINS_MENU:
+        print("Error: Opción no válida")
+        return
+    if not os.path.exists(archivo):
+        print(f"Error: Archivo no encontrado - {archivo}")
+        return
+    if desde is None or hasta is None or desde >= hasta:
+        print("Error: Intervalo no válido")
+        return
+    
+    try:
+        reporte = analizar_intervalo(archivo, PLUGINS_MENU[opcion][0], desde, hasta)
+    except Exception as e:
+        print(f"Error durante análisis: {e}")
+        return
+    mostrar_reporte(reporte)
+
+def mostrar_reporte(reporte):
+    """Muestra el resumen de un reporte de análisis completo, de historial o de intervalo"""
+    conteo = reporte["conteo"]
+    print("\n=== RESUMEN DEL ANÁLISIS ===")
+    print(f"Estado del servicio: {reporte['estado']}")
+    print(f"Líneas analizadas: {reporte['lineas']} ({reporte['bytes'] / 1024 / 1024:.1f} MB)")
+    print(f"Errores críticos: {conteo['CRITICAL']}")
+    print(f"Errores: {conteo['ERROR']}")
+    print(f"Warnings: {conteo['WARNING']}")
+    if reporte["primera_critica"]:
+        print(f"Primer crítico (línea {reporte['primera_critica'][0]}): {reporte['primera_critica'][1][:70]}")
+        print(f"Último crítico (línea {reporte['ultima_critica'][0]}): {reporte['ultima_critica'][1][:70]}")
+    if reporte["histograma"]:
+        # Los minutos con más errores suelen marcar el inicio del incidente
+        peores = sorted(reporte["histograma"].items(),
+                        key=lambda item: item[1]["CRITICAL"] + item[1]["ERROR"], reverse=True)[:5]
+        print("Minutos con más errores:")
+        for minuto_ms, niveles in peores:
+            minuto = datetime.fromtimestamp(minuto_ms / 1000, tz=timezone.utc).strftime("%Y-%m-%d %H:%M")
+            print(f"  {minuto}  {niveles['CRITICAL']} críticos, {niveles['ERROR']} errores")
+
 def main():
     while True:
         print("\nMenú HealthMonitor")
@@ -320,14 +496,15 @@ def main():
         print("7. Ejecutar y monitorear programa")
         print("8. Generar configuración automática")
         print("9. Monitoreo con plugin especializado")
-        print("10. Salir")
+        print("10. Análisis completo de un log grande (en paralelo)")
+        print("11. Análisis de un intervalo de tiempo de un log")
+        print("12. Salir")
 
-        choice = input("Elige una opción (1-10): ")
+        choice = input("Elige una opción (1-12): ")
 
     file_path = input("Ruta del archivo de logs: ")
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            logs = "".join(f.readlines()[-50:])
+        logs = "".join(leer_ultimas_lineas(file_path, 50))
         print("\n===== LOGS DEL ARCHIVO =====")
         print(logs)
     except Exception as e:
@@ -341,9 +518,17 @@ def main():
         print("1. Mirá los logs de Docker")
         print("2. Leer logs de Kubernetes")
         print("3. Leer logs de un fichero")
-        print("4. Salir")
+        print("4. Monitorear archivo en tiempo real")
+        print("5. Monitorear repositorios configurados")
+        print("6. Monitorear aplicación externa")
+        print("7. Ejecutar y monitorear programa")
+        print("8. Generar configuración automática")
+        print("9. Monitoreo con plugin especializado")
+        print("10. Análisis completo de un log grande (en paralelo)")
+        print("11. Análisis de un intervalo de tiempo de un log")
+        print("12. Salir")
 
-        choice = input("Elige una opción (1-4): ")
+        choice = input("Elige una opción (1-12): ")
 
 
         if choice == "1":
@@ -366,6 +551,10 @@ def main():
         elif choice == "9":
             monitorear_con_plugin_especializado()
         elif choice == "10":
+            analizar_archivo_completo()
+        elif choice == "11":
+            analizar_intervalo_tiempo()
+        elif choice == "12":
             print("Cerrando Health Monitor...")
             break
         else:
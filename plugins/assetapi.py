@@ -2,10 +2,21 @@
 import re
 import json
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from utils.reinicio_global import reinicio_simple
+from utils.motor_patrones import MotorPatrones
+from utils.analisis_columnar import (CODIGO_NIVEL, NIVEL_CRITICAL, SIN_VALOR, a_entero, analisis_de_ventana,
+                                     columna_enteros, columna_niveles, filas, lineas_en_mayusculas)
+from utils.cache_analisis import CacheLRU
+from utils.timestamps import extraer_timestamp, extraer_timestamp_texto
+from utils.ventana_salud import VENTANAS_SALUD_POR_DEFECTO, EvaluadorSalud, EvaluadorSaludTemporal, sumar_aportes
 
 class AssetAPIMonitor:
+    # Evaluación de salud: últimas 30 líneas (ver utils/ventana_salud.py)
+    VENTANA_SALUD = 30
+    CAMPOS_SALUD = ("nivel", "status_code")
+    CONTADORES_SALUD = ("errores_criticos", "requests_total", "errores_5xx")
+    
     def __init__(self):
         self.errores_criticos = [
             r"DATABASE.*CONNECTION.*FAILED",
@@ -21,69 +32,158 @@ class AssetAPIMonitor:
             r"RATE.*LIMIT.*EXCEEDED",
             r"MEMORY.*USAGE.*HIGH"
         ]
+        
+        # Umbrales desde la sección `servicios` de config.yaml
+        try:
+            from utils.yaml_config import get_config_for_plugin
+            self.config = get_config_for_plugin('asset_api')
+        except ImportError:
+            self.config = {}
+        self.umbral_criticos = self.config.get('umbral_errores_criticos', 3)
+        self.tasa_error_maxima = self.config.get('tasa_error_maxima_porcentaje', 15)
+        # Umbrales de _veredicto_salud; `umbrales_salud` en config.yaml los
+        # cambia y `umbrales_ventanas` los ajusta para cada ventana de tiempo
+        self.umbrales_salud = {
+            "errores_criticos": self.umbral_criticos,
+            "tasa_error_critica": self.tasa_error_maxima,
+            "tasa_error_error": 5,
+            "tasa_error_warning": 2,
+            **self.config.get('umbrales_salud', {})
+        }
+        
+        # Patrones compilados una sola vez (una búsqueda por severidad y línea)
+        self.motor = MotorPatrones(self.errores_criticos, self.errores_warning)
+        # Análisis ya hechos, por contenido de línea (acotado, LRU)
+        self.cache_analisis = CacheLRU()
     
     def detectar_error_critico(self, linea_log: str) -> bool:
         """Detecta errores críticos en logs de API"""
-        for patron in self.errores_criticos:
-            if re.search(patron, linea_log, re.IGNORECASE):
-                return True
-        return False
+        return self.motor.es_critico(linea_log)
     
     def analizar_patron_log(self, linea_log: str) -> Dict:
-        """Extrae información estructurada del log"""
+        """Extrae información estructurada del log (el dict puede venir de la cache: no modificarlo)"""
+        analisis = self.cache_analisis.obtener(linea_log)
+        if analisis is None:
+            analisis = self._analizar_linea(linea_log)
+            self.cache_analisis.guardar(linea_log, analisis)
+        return analisis
+    
+    def _analizar_linea(self, linea_log: str) -> Dict:
+        timestamp, timestamp_ms = extraer_timestamp(linea_log)
         resultado = {
-            "timestamp": self._extraer_timestamp(linea_log),
+            "timestamp": timestamp,
+            "timestamp_ms": timestamp_ms,
             "nivel": "INFO",
             "endpoint": None,
             "status_code": None,
             "tiempo_respuesta": None,
+            "patron": None,
             "mensaje": linea_log.strip()
         }
         
-        if self.detectar_error_critico(linea_log):
-            resultado["nivel"] = "CRITICAL"
-        elif any(re.search(w, linea_log, re.IGNORECASE) for w in self.errores_warning):
-            resultado["nivel"] = "WARNING"
-        elif "ERROR" in linea_log.upper():
-            resultado["nivel"] = "ERROR"
+        # Una sola copia en mayúsculas para el prefiltro y los chequeos de texto
+        resultado["nivel"], resultado["patron"] = self._clasificar_nivel(linea_log, linea_log.upper())
         
         # Extraer datos HTTP
-        http_match = re.search(r"(GET|POST|PUT|DELETE)\s+(/[^\s]*)\s+.*?(\d{3})", linea_log)
+        http_match = self._buscar_http(linea_log)
         if http_match:
             resultado["metodo"] = http_match.group(1)
             resultado["endpoint"] = http_match.group(2)
             resultado["status_code"] = int(http_match.group(3))
         
-        tiempo_match = re.search(r"(\d+)ms", linea_log)
-        if tiempo_match:
-            resultado["tiempo_respuesta"] = int(tiempo_match.group(1))
+        resultado["tiempo_respuesta"] = self._extraer_tiempo_respuesta(linea_log)
         
         return resultado
     
-    def evaluar_salud_servicio(self, logs_recientes: List[str]) -> str:
-        """Evalúa el estado de salud general del servicio API"""
-        errores_criticos = 0
-        errores_5xx = 0
-        requests_total = 0
-        
-        for log in logs_recientes[-30:]:
-            analisis = self.analizar_patron_log(log)
-            
-            if analisis["nivel"] == "CRITICAL":
-                errores_criticos += 1
-            
-            if analisis["status_code"]:
-                requests_total += 1
-                if 500 <= analisis["status_code"] < 600:
-                    errores_5xx += 1
-        
+    def analizar_lote(self, lineas: List[str], lineas_mayus: Optional[List[str]] = None) -> Dict:
+        """
+        Analiza un lote de líneas sin crear un dict por línea.
+        Devuelve columnas paralelas a lineas: "nivel" (códigos de
+        utils.analisis_columnar), "timestamp", "timestamp_ms" (epoch en ms),
+        "status_code" y "tiempo_respuesta" (SIN_VALOR cuando la línea no trae el dato).
+        lineas_mayus: las mismas líneas en mayúsculas, si ya se calcularon.
+        """
+        niveles = columna_niveles()
+        timestamps = []
+        timestamps_ms = columna_enteros()
+        status_codes = columna_enteros()
+        tiempos = columna_enteros()
+        for linea, linea_mayus in zip(lineas, lineas_en_mayusculas(lineas, lineas_mayus)):
+            nivel, _ = self._clasificar_nivel(linea, linea_mayus)
+            http_match = self._buscar_http(linea)
+            timestamp, timestamp_ms = extraer_timestamp(linea)
+            niveles.append(CODIGO_NIVEL[nivel])
+            timestamps.append(timestamp)
+            timestamps_ms.append(a_entero(timestamp_ms))
+            status_codes.append(int(http_match.group(3)) if http_match else SIN_VALOR)
+            tiempos.append(a_entero(self._extraer_tiempo_respuesta(linea)))
+        return {
+            "nivel": niveles,
+            "timestamp": timestamps,
+            "timestamp_ms": timestamps_ms,
+            "status_code": status_codes,
+            "tiempo_respuesta": tiempos
+        }
+    
+    def _clasificar_nivel(self, linea_log: str, linea_mayus: str) -> Tuple[str, Optional[str]]:
+        """Devuelve (nivel, patrón que lo determinó o None) para una línea."""
+        nivel, patron = self.motor.clasificar(linea_log, linea_mayus)
+        if nivel:
+            return nivel, patron
+        return ("ERROR" if "ERROR" in linea_mayus else "INFO"), None
+    
+    def _buscar_http(self, linea_log: str):
+        return re.search(r"(GET|POST|PUT|DELETE)\s+(/[^\s]*)\s+.*?(\d{3})", linea_log)
+    
+    def _extraer_tiempo_respuesta(self, linea_log: str) -> Optional[int]:
+        # Solo corremos la regex si aparece el sufijo que exige
+        if "ms" not in linea_log:
+            return None
+        tiempo_match = re.search(r"(\d+)ms", linea_log)
+        return int(tiempo_match.group(1)) if tiempo_match else None
+    
+    def evaluar_salud_servicio(self, logs_recientes: List[str], analisis=None) -> str:
+        """
+        Evalúa el estado de salud general del servicio API.
+        Acepta los análisis ya calculados de logs_recientes (lista de
+        analizar_patron_log o lote de analizar_lote) para no re-parsear.
+        """
+        ventana = analisis_de_ventana(self.analizar_patron_log, logs_recientes, analisis, self.VENTANA_SALUD)
+        contadores = sumar_aportes(self._aporte_salud, len(self.CONTADORES_SALUD),
+                                   logs_recientes[-self.VENTANA_SALUD:], filas(ventana, *self.CAMPOS_SALUD))
+        return self._veredicto_salud(contadores)
+    
+    def crear_evaluador_salud(self) -> EvaluadorSalud:
+        """Evaluador incremental con el mismo veredicto que evaluar_salud_servicio"""
+        return EvaluadorSalud(self)
+    
+    def crear_evaluador_temporal(self, ventanas=None, umbrales=None) -> EvaluadorSaludTemporal:
+        """
+        Evaluador por ventanas de tiempo (1m, 5m, 15m...). Si no se indican, las
+        ventanas salen de `ventanas_salud` y los umbrales de cada una de
+        `umbrales_ventanas` en config.yaml (por defecto, los de umbrales_salud).
+        """
+        return EvaluadorSaludTemporal(self, ventanas or self.config.get('ventanas_salud', VENTANAS_SALUD_POR_DEFECTO),
+                                      umbrales if umbrales is not None else self.config.get('umbrales_ventanas'))
+    
+    def _aporte_salud(self, linea_log: str, nivel: int, status_code: Optional[int]) -> Tuple[int, int, int]:
+        es_request = bool(status_code)
+        return (
+            1 if nivel == NIVEL_CRITICAL else 0,
+            1 if es_request else 0,
+            1 if es_request and 500 <= status_code < 600 else 0
+        )
+    
+    def _veredicto_salud(self, contadores: List[int], umbrales: Optional[Dict] = None) -> str:
+        umbrales = umbrales or self.umbrales_salud
+        errores_criticos, requests_total, errores_5xx = contadores
         tasa_error = (errores_5xx / requests_total * 100) if requests_total > 0 else 0
         
-        if errores_criticos >= 3 or tasa_error > 15:
+        if errores_criticos >= umbrales["errores_criticos"] or tasa_error > umbrales["tasa_error_critica"]:
             return "CRITICAL"
-        elif errores_criticos >= 1 or tasa_error > 5:
+        elif errores_criticos >= 1 or tasa_error > umbrales["tasa_error_error"]:
             return "ERROR"
-        elif tasa_error > 2:
+        elif tasa_error > umbrales["tasa_error_warning"]:
             return "WARNING"
         else:
             return "OK"
@@ -100,5 +200,4 @@ class AssetAPIMonitor:
             return False
     
     def _extraer_timestamp(self, linea_log: str) -> Optional[str]:
-        timestamp_match = re.search(r"\[([\d-]+\s[\d:]+)\]", linea_log)
-        return timestamp_match.group(1) if timestamp_match else None
+        return extraer_timestamp_texto(linea_log)
@@ -12,10 +12,22 @@ Así puedes modificar la configuración sin cambiar el código fuente.
 """
 import re
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from utils.reinicio_global import reinicio_simple
+from utils.motor_patrones import MotorPatrones
+from utils.analisis_columnar import (CODIGO_NIVEL, NIVEL_CRITICAL, NIVEL_WARNING, a_decimal, a_entero,
+                                     analisis_de_ventana, columna_decimales, columna_enteros,
+                                     columna_niveles, filas, lineas_en_mayusculas)
+from utils.cache_analisis import CacheLRU
+from utils.timestamps import extraer_timestamp, extraer_timestamp_texto
+from utils.ventana_salud import VENTANAS_SALUD_POR_DEFECTO, EvaluadorSalud, EvaluadorSaludTemporal, sumar_aportes
 
 class AvionicsMonitor:
+    # Evaluación de salud: últimas 20 líneas (ver utils/ventana_salud.py)
+    VENTANA_SALUD = 20
+    CAMPOS_SALUD = ("nivel",)
+    CONTADORES_SALUD = ("errores_criticos", "warnings", "gps_ok")
+    
     def __init__(self):
         # MODIFICA AQUÍ: Puedes cargar patrones y parámetros desde YAML
         try:
@@ -39,6 +51,7 @@ class AvionicsMonitor:
             self.umbral_criticos = self.config.get('umbral_errores_criticos', 2)
         except ImportError:
             # Si no existe utils.yaml_config, usa valores por defecto
+            self.config = {}
             self.errores_criticos = [
                 r"GPS.*SIGNAL.*LOST",
                 r"ALTITUDE.*SENSOR.*FAULT",
@@ -55,61 +68,139 @@ class AvionicsMonitor:
             self.max_reinicios = 3
             self.timeout = 30
             self.umbral_criticos = 2
+        # Umbrales de _veredicto_salud; `umbrales_salud` en config.yaml los
+        # cambia y `umbrales_ventanas` los ajusta para cada ventana de tiempo
+        self.umbrales_salud = {
+            "errores_criticos": self.umbral_criticos,
+            "warnings": 3,
+            **self.config.get('umbrales_salud', {})
+        }
+        # Los patrones (configurables o por defecto) se compilan una sola vez
+        self.motor = MotorPatrones(self.errores_criticos, self.errores_warning)
+        # Análisis ya hechos, por contenido de línea (acotado, LRU)
+        self.cache_analisis = CacheLRU()
     
     def detectar_error_critico(self, linea_log: str) -> bool:
         # Usa patrones configurables para detectar errores críticos
-        for patron in self.errores_criticos:
-            if re.search(patron, linea_log, re.IGNORECASE):
-                return True
-        return False
+        return self.motor.es_critico(linea_log)
     
     def analizar_patron_log(self, linea_log: str) -> Dict:
-        # Procesa una línea de log y extrae información relevante
+        # Procesa una línea de log y extrae información relevante. El dict
+        # puede venir de la cache, así que no hay que modificarlo
+        analisis = self.cache_analisis.obtener(linea_log)
+        if analisis is None:
+            analisis = self._analizar_linea(linea_log)
+            self.cache_analisis.guardar(linea_log, analisis)
+        return analisis
+    
+    def _analizar_linea(self, linea_log: str) -> Dict:
+        timestamp, timestamp_ms = extraer_timestamp(linea_log)
         resultado = {
-            "timestamp": self._extraer_timestamp(linea_log),
+            "timestamp": timestamp,
+            "timestamp_ms": timestamp_ms,
             "nivel": "INFO",
             "componente": "UNKNOWN",
             "gps_lat": None,
             "gps_lon": None,
             "altitud": None,
+            "patron": None,
             "mensaje": linea_log.strip()
         }
-        if self.detectar_error_critico(linea_log):
-            resultado["nivel"] = "CRITICAL"
-        elif any(re.search(w, linea_log, re.IGNORECASE) for w in self.errores_warning):
-            resultado["nivel"] = "WARNING"
-        elif "ERROR" in linea_log.upper():
-            resultado["nivel"] = "ERROR"
+        # Una sola copia en mayúsculas para el prefiltro y los chequeos de texto
+        linea_mayus = linea_log.upper()
+        resultado["nivel"], resultado["patron"] = self._clasificar_nivel(linea_log, linea_mayus)
         # Identificar componente
         componentes = ["GPS", "ALTITUDE", "ENGINE", "NAVIGATION"]
         for comp in componentes:
-            if comp in linea_log.upper():
+            if comp in linea_mayus:
                 resultado["componente"] = comp
                 break
         # Extraer coordenadas GPS
-        gps_match = re.search(r"LAT:([+-]?\d*\.?\d+).*LON:([+-]?\d*\.?\d+)", linea_log)
-        if gps_match:
-            resultado["gps_lat"] = float(gps_match.group(1))
-            resultado["gps_lon"] = float(gps_match.group(2))
+        coordenadas = self._extraer_coordenadas(linea_log)
+        if coordenadas:
+            resultado["gps_lat"], resultado["gps_lon"] = coordenadas
         return resultado
     
-    def evaluar_salud_servicio(self, logs_recientes: List[str]) -> str:
-        # Determina el estado general del sistema usando parámetros configurables
-        errores_criticos = 0
-        warnings = 0
-        gps_disponible = False
-        for log in logs_recientes[-20:]:
-            if self.detectar_error_critico(log):
-                errores_criticos += 1
-            elif any(re.search(w, log, re.IGNORECASE) for w in self.errores_warning):
-                warnings += 1
-            if "GPS" in log and "OK" in log:
-                gps_disponible = True
-        if errores_criticos >= self.umbral_criticos:
+    def analizar_lote(self, lineas: List[str], lineas_mayus: Optional[List[str]] = None) -> Dict:
+        # Analiza un lote de líneas sin crear un dict por línea. Devuelve
+        # columnas paralelas a lineas: "nivel" (códigos de utils.analisis_columnar),
+        # "timestamp", "timestamp_ms" (epoch en ms, SIN_VALOR si no hay fecha),
+        # "gps_lat" y "gps_lon" (NaN si la línea no trae coordenadas).
+        # lineas_mayus: las mismas líneas en mayúsculas, si ya se calcularon
+        niveles = columna_niveles()
+        timestamps = []
+        timestamps_ms = columna_enteros()
+        latitudes = columna_decimales()
+        longitudes = columna_decimales()
+        for linea, linea_mayus in zip(lineas, lineas_en_mayusculas(lineas, lineas_mayus)):
+            nivel, _ = self._clasificar_nivel(linea, linea_mayus)
+            coordenadas = self._extraer_coordenadas(linea)
+            timestamp, timestamp_ms = extraer_timestamp(linea)
+            niveles.append(CODIGO_NIVEL[nivel])
+            timestamps.append(timestamp)
+            timestamps_ms.append(a_entero(timestamp_ms))
+            latitudes.append(a_decimal(coordenadas[0] if coordenadas else None))
+            longitudes.append(a_decimal(coordenadas[1] if coordenadas else None))
+        return {
+            "nivel": niveles,
+            "timestamp": timestamps,
+            "timestamp_ms": timestamps_ms,
+            "gps_lat": latitudes,
+            "gps_lon": longitudes
+        }
+    
+    def _clasificar_nivel(self, linea_log: str, linea_mayus: str) -> Tuple[str, Optional[str]]:
+        # Devuelve (nivel, patrón que lo determinó o None) para una línea
+        nivel, patron = self.motor.clasificar(linea_log, linea_mayus)
+        if nivel:
+            return nivel, patron
+        return ("ERROR" if "ERROR" in linea_mayus else "INFO"), None
+    
+    def _extraer_coordenadas(self, linea_log: str) -> Optional[Tuple[float, float]]:
+        # Solo corremos la regex si aparece la etiqueta que exige
+        if "LAT:" not in linea_log:
+            return None
+        gps_match = re.search(r"LAT:([+-]?\d*\.?\d+).*LON:([+-]?\d*\.?\d+)", linea_log)
+        if not gps_match:
+            return None
+        return float(gps_match.group(1)), float(gps_match.group(2))
+    
+    def evaluar_salud_servicio(self, logs_recientes: List[str], analisis=None) -> str:
+        # Determina el estado general del sistema usando parámetros configurables.
+        # Si se pasan los análisis ya calculados de logs_recientes (lista o lote
+        # columnar), se reutilizan en lugar de volver a evaluar los patrones
+        ventana = analisis_de_ventana(self.analizar_patron_log, logs_recientes, analisis, self.VENTANA_SALUD)
+        contadores = sumar_aportes(self._aporte_salud, len(self.CONTADORES_SALUD),
+                                   logs_recientes[-self.VENTANA_SALUD:], filas(ventana, *self.CAMPOS_SALUD))
+        return self._veredicto_salud(contadores)
+    
+    def crear_evaluador_salud(self) -> EvaluadorSalud:
+        # Evaluador incremental con el mismo veredicto que evaluar_salud_servicio
+        return EvaluadorSalud(self)
+    
+    def crear_evaluador_temporal(self, ventanas=None, umbrales=None) -> EvaluadorSaludTemporal:
+        # Evaluador por ventanas de tiempo (1m, 5m, 15m...). Las ventanas salen de
+        # `ventanas_salud` y los umbrales de cada una de `umbrales_ventanas` en
+        # config.yaml si no se indican (por defecto, los de umbrales_salud)
+        return EvaluadorSaludTemporal(self, ventanas or self.config.get('ventanas_salud', VENTANAS_SALUD_POR_DEFECTO),
+                                      umbrales if umbrales is not None else self.config.get('umbrales_ventanas'))
+    
+    def _aporte_salud(self, linea_log: str, nivel: int) -> Tuple[int, int, int]:
+        return (
+            1 if nivel == NIVEL_CRITICAL else 0,
+            1 if nivel == NIVEL_WARNING else 0,
+            1 if "GPS" in linea_log and "OK" in linea_log else 0
+        )
+    
+    def _veredicto_salud(self, contadores: List[int], umbrales: Optional[Dict] = None) -> str:
+        umbrales = umbrales or self.umbrales_salud
+        errores_criticos, warnings, gps_ok = contadores
+        gps_disponible = gps_ok > 0
+        if errores_criticos >= umbrales["errores_criticos"]:
             return "CRITICAL"
         elif errores_criticos >= 1 or not gps_disponible:
             return "ERROR"
-        elif warnings >= 3:
+        elif warnings >= umbrales["warnings"]:
             return "WARNING"
         else:
             return "OK"
@@ -126,5 +217,4 @@ class AvionicsMonitor:
             return False
     
     def _extraer_timestamp(self, linea_log: str) -> Optional[str]:
-        timestamp_match = re.search(r"\[([\d-]+\s[\d:]+)\]", linea_log)
-        return timestamp_match.group(1) if timestamp_match else None
\ No newline at end of file
+        return extraer_timestamp_texto(linea_log)
\ No newline at end of file
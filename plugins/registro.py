@@ -0,0 +1,162 @@
+"""
+Registro de plugins: descubre una sola vez qué monitores hay y reutiliza sus
+instancias en lugar de importar y construir un monitor en cada uso.
+
+Los plugins salen de tres sitios, de menor a mayor prioridad:
+  - los módulos de la carpeta plugins/ (asset_api -> AssetApiMonitor)
+  - PLUGINS_INCLUIDOS, para los que no siguen esa convención
+  - la sección `plugins` de config.yaml, al estilo entry point:
+        plugins:
+          mi_servicio: "paquete.modulo:MiServicioMonitor"
+
+Se construye un monitor por par (plugin, opciones) con sus patrones ya
+compilados. Cuando config.yaml cambia (fecha de modificación) se vuelve a
+leer la tabla y se descartan las instancias, para que los monitores nuevos
+tomen la configuración actualizada.
+"""
+import importlib
+import json
+import os
+import pkgutil
+from typing import Dict, List, Optional, Tuple
+
+from utils.yaml_config import CONFIG_YAML_PATH, cargar_config_yaml
+
+# Nombre en config.yaml -> "modulo:Clase"
+PLUGINS_INCLUIDOS = {
+    "avionics": "plugins.avionics:AvionicsMonitor",
+    "asset_api": "plugins.assetapi:AssetAPIMonitor",
+    "runtime": "plugins.runtime:RuntimeMonitor",
+}
+
+# Módulos de plugins/ que no son monitores
+_MODULOS_EXCLUIDOS = {"registro"}
+
+_SIN_LEER = object()
+
+
+def nombre_clase(nombre_plugin: str) -> str:
+    """asset_api -> AssetApiMonitor"""
+    return ''.join(p.capitalize() for p in nombre_plugin.split('_')) + "Monitor"
+
+
+class RegistroPlugins:
+    def __init__(self, config_path: str = None, paquete: str = "plugins",
+                 incluidos: Optional[Dict[str, str]] = None):
+        self.config_path = config_path or CONFIG_YAML_PATH
+        self.paquete = paquete
+        self.incluidos = PLUGINS_INCLUIDOS if incluidos is None else incluidos
+        self.config: Dict = {}
+        self._mtime = _SIN_LEER
+        self._tabla: Dict[str, str] = {}
+        self._clases: Dict[str, type] = {}
+        # (plugin, opciones serializadas) -> monitor
+        self._instancias: Dict[Tuple[str, str], object] = {}
+
+    def recargar_si_cambio(self) -> bool:
+        """
+        Vuelve a leer config.yaml si cambió desde la última vez.
+
+        :return: True si se recargó (y se descartaron las instancias)
+        """
+        try:
+            mtime = os.path.getmtime(self.config_path)
+        except OSError:
+            mtime = None
+        if mtime == self._mtime:
+            return False
+
+        self._mtime = mtime
+        self.config = cargar_config_yaml(self.config_path)
+        self._tabla = self._descubrir()
+        self._clases.clear()
+        self._instancias.clear()
+        return True
+
+    def _descubrir(self) -> Dict[str, str]:
+        tabla = {}
+        paquete = importlib.import_module(self.paquete)
+        # Los módulos ya registrados con otro nombre no se descubren de nuevo
+        ya_incluidos = {referencia.partition(":")[0] for referencia in self.incluidos.values()}
+        for modulo in pkgutil.iter_modules(paquete.__path__):
+            ruta = f"{self.paquete}.{modulo.name}"
+            if modulo.name.startswith("_") or modulo.name in _MODULOS_EXCLUIDOS or ruta in ya_incluidos:
+                continue
+            tabla[modulo.name] = f"{ruta}:{nombre_clase(modulo.name)}"
+        tabla.update(self.incluidos)
+        tabla.update(self.config.get("plugins") or {})
+        return tabla
+
+    def nombres(self) -> List[str]:
+        self.recargar_si_cambio()
+        return sorted(self._tabla)
+
+    def clase(self, nombre_plugin: str) -> Optional[type]:
+        """La clase del monitor, importada una sola vez. None si no se encuentra."""
+        self.recargar_si_cambio()
+        if nombre_plugin in self._clases:
+            return self._clases[nombre_plugin]
+        referencia = self._tabla.get(nombre_plugin)
+        if referencia is None:
+            print(f"[ERROR] Plugin desconocido: {nombre_plugin}")
+            return None
+        try:
+            modulo, _, clase = referencia.partition(":")
+            cls = getattr(importlib.import_module(modulo), clase or nombre_clase(nombre_plugin))
+        except Exception as e:
+            print(f"[ERROR] No se pudo cargar el plugin {nombre_plugin} ({referencia}): {e}")
+            return None
+        self._clases[nombre_plugin] = cls
+        return cls
+
+    def obtener(self, nombre_plugin: str, opciones: Optional[Dict] = None):
+        """
+        Devuelve el monitor para un plugin, construyéndolo solo la primera vez.
+
+        :param nombre_plugin: Nombre del plugin (avionics, asset_api, runtime...)
+        :param opciones: Atributos del monitor a sobrescribir (p. ej. errores_criticos);
+            cada combinación distinta tiene su propia instancia
+        :return: El monitor, o None si no se pudo construir
+        """
+        self.recargar_si_cambio()
+        clave = (nombre_plugin, json.dumps(opciones or {}, sort_keys=True, default=str))
+        monitor = self._instancias.get(clave)
+        if monitor is None:
+            monitor = self._construir(nombre_plugin, opciones or {})
+            if monitor is not None:
+                self._instancias[clave] = monitor
+        return monitor
+
+    def _construir(self, nombre_plugin: str, opciones: Dict):
+        cls = self.clase(nombre_plugin)
+        if cls is None:
+            return None
+        try:
+            monitor = cls()
+        except Exception as e:
+            print(f"[ERROR] No se pudo instanciar plugin {nombre_plugin}: {e}")
+            return None
+        for atributo, valor in opciones.items():
+            if hasattr(monitor, atributo):
+                setattr(monitor, atributo, valor)
+            else:
+                print(f"[WARNING] El plugin {nombre_plugin} no tiene la opción '{atributo}'")
+        if "errores_criticos" in opciones or "errores_warning" in opciones:
+            self._recompilar(monitor)
+        return monitor
+
+    @staticmethod
+    def _recompilar(monitor) -> None:
+        if hasattr(monitor, "recompilar_patrones"):
+            monitor.recompilar_patrones()
+        else:
+            from utils.motor_patrones import MotorPatrones
+            monitor.motor = MotorPatrones(monitor.errores_criticos, monitor.errores_warning)
+            monitor.cache_analisis.limpiar()
+
+    def limpiar(self) -> None:
+        """Olvida todo; la próxima consulta vuelve a descubrir los plugins."""
+        self._mtime = _SIN_LEER
+        self._tabla.clear()
+        self._clases.clear()
+        self._instancias.clear()
@@ -5,10 +5,22 @@ import re
 import os
 import json
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from utils.reinicio_global import reinicio_simple
+from utils.motor_patrones import MotorPatrones
+from utils.analisis_columnar import (CODIGO_NIVEL, NIVEL_CRITICAL, a_entero, analisis_de_ventana,
+                                     columna_enteros, columna_niveles, filas, lineas_en_mayusculas)
+from utils.cache_analisis import CacheLRU
+from utils.timestamps import extraer_timestamp, extraer_timestamp_texto
+from utils.escaneo_mmap import escanear_archivo
+from utils.ventana_salud import VENTANAS_SALUD_POR_DEFECTO, EvaluadorSalud, EvaluadorSaludTemporal, sumar_aportes
 
 class RuntimeMonitor:
+    # Evaluación de salud: últimas 20 líneas (ver utils/ventana_salud.py)
+    VENTANA_SALUD = 20
+    CAMPOS_SALUD = ("nivel", "memoria_mb")
+    CONTADORES_SALUD = ("errores_criticos", "memoria_alta")
+    
     def __init__(self):
         self.errores_criticos = [
             r"OUT.*OF.*MEMORY",
@@ -24,58 +36,148 @@ class RuntimeMonitor:
             r"DISK.*SPACE.*LOW",
             r"THREAD.*CONTENTION"
         ]
+        
+        # Umbrales desde la sección `servicios` de config.yaml
+        try:
+            from utils.yaml_config import get_config_for_plugin
+            self.config = get_config_for_plugin('runtime')
+        except ImportError:
+            self.config = {}
+        self.umbral_memoria_mb = self.config.get('umbral_memoria_mb', 8000)
+        self.umbral_criticos = self.config.get('umbral_errores_criticos', 2)
+        # Umbrales de _veredicto_salud; `umbrales_salud` en config.yaml los
+        # cambia y `umbrales_ventanas` los ajusta para cada ventana de tiempo
+        self.umbrales_salud = {
+            "errores_criticos": self.umbral_criticos,
+            "memoria_alta_error": 5,
+            "memoria_alta_warning": 2,
+            **self.config.get('umbrales_salud', {})
+        }
+        
+        # Patrones compilados una sola vez (una búsqueda por severidad y línea)
+        self.motor = MotorPatrones(self.errores_criticos, self.errores_warning)
+        # Análisis ya hechos, por contenido de línea (acotado, LRU)
+        self.cache_analisis = CacheLRU()
     
     def detectar_error_critico(self, linea_log: str) -> bool:
-        for patron in self.errores_criticos:
-            if re.search(patron, linea_log, re.IGNORECASE):
-                return True
-        return False
+        return self.motor.es_critico(linea_log)
     
     def analizar_patron_log(self, linea_log: str) -> Dict:
-        resultado = {
-            "timestamp": self._extraer_timestamp(linea_log),
-            "nivel": "INFO",
-            "memoria_mb": None,
-            "cpu_porcentaje": None,
+        # El dict devuelto puede venir de la cache: no hay que modificarlo
+        analisis = self.cache_analisis.obtener(linea_log)
+        if analisis is None:
+            analisis = self._analizar_linea(linea_log)
+            self.cache_analisis.guardar(linea_log, analisis)
+        return analisis
+    
+    def _analizar_linea(self, linea_log: str) -> Dict:
+        # Una sola copia en mayúsculas para el prefiltro y los chequeos de texto
+        nivel, patron = self._clasificar_nivel(linea_log, linea_log.upper())
+        memoria_mb, cpu_porcentaje = self._extraer_metricas(linea_log)
+        timestamp, timestamp_ms = extraer_timestamp(linea_log)
+        return {
+            "timestamp": timestamp,
+            "timestamp_ms": timestamp_ms,
+            "nivel": nivel,
+            "memoria_mb": memoria_mb,
+            "cpu_porcentaje": cpu_porcentaje,
+            "patron": patron,
             "mensaje": linea_log.strip()
         }
-        
-        if self.detectar_error_critico(linea_log):
-            resultado["nivel"] = "CRITICAL"
-        elif any(re.search(w, linea_log, re.IGNORECASE) for w in self.errores_warning):
-            resultado["nivel"] = "WARNING"
-        elif "ERROR" in linea_log.upper():
-            resultado["nivel"] = "ERROR"
-        
-        # Extraer métricas
-        memoria_match = re.search(r"MEMORY.*?(\d+)MB", linea_log)
-        if memoria_match:
-            resultado["memoria_mb"] = int(memoria_match.group(1))
-        
-        cpu_match = re.search(r"CPU.*?(\d+)%", linea_log)
-        if cpu_match:
-            resultado["cpu_porcentaje"] = int(cpu_match.group(1))
-        
-        return resultado
     
-    def evaluar_salud_servicio(self, logs_recientes: List[str]) -> str:
-        errores_criticos = 0
-        memoria_alta = 0
-        
-        for log in logs_recientes[-20:]:
-            analisis = self.analizar_patron_log(log)
-            
-            if analisis["nivel"] == "CRITICAL":
-                errores_criticos += 1
-            
-            if analisis["memoria_mb"] and analisis["memoria_mb"] > 8000:
-                memoria_alta += 1
+    def analizar_lote(self, lineas: List[str], lineas_mayus: Optional[List[str]] = None) -> Dict:
+        """
+        Analiza un lote de líneas sin crear un dict por línea.
+        Devuelve columnas paralelas a lineas: "nivel" (códigos de
+        utils.analisis_columnar), "timestamp", "timestamp_ms" (epoch en ms),
+        "memoria_mb" y "cpu_porcentaje" (SIN_VALOR cuando la línea no trae el dato).
+        lineas_mayus: las mismas líneas en mayúsculas, si ya se calcularon.
+        """
+        niveles = columna_niveles()
+        timestamps = []
+        timestamps_ms = columna_enteros()
+        memoria = columna_enteros()
+        cpu = columna_enteros()
+        for linea, linea_mayus in zip(lineas, lineas_en_mayusculas(lineas, lineas_mayus)):
+            nivel, _ = self._clasificar_nivel(linea, linea_mayus)
+            memoria_mb, cpu_porcentaje = self._extraer_metricas(linea)
+            timestamp, timestamp_ms = extraer_timestamp(linea)
+            niveles.append(CODIGO_NIVEL[nivel])
+            timestamps.append(timestamp)
+            timestamps_ms.append(a_entero(timestamp_ms))
+            memoria.append(a_entero(memoria_mb))
+            cpu.append(a_entero(cpu_porcentaje))
+        return {
+            "nivel": niveles,
+            "timestamp": timestamps,
+            "timestamp_ms": timestamps_ms,
+            "memoria_mb": memoria,
+            "cpu_porcentaje": cpu
+        }
+    
+    def _clasificar_nivel(self, linea_log: str, linea_mayus: str) -> Tuple[str, Optional[str]]:
+        """Devuelve (nivel, patrón que lo determinó o None) para una línea."""
+        nivel, patron = self.motor.clasificar(linea_log, linea_mayus)
+        if nivel:
+            return nivel, patron
+        return ("ERROR" if "ERROR" in linea_mayus else "INFO"), None
+    
+    def _extraer_metricas(self, linea_log: str) -> Tuple[Optional[int], Optional[int]]:
+        """Devuelve (memoria_mb, cpu_porcentaje) de la línea, o None si no están."""
+        memoria_mb = cpu_porcentaje = None
+        # Solo corremos cada regex si aparece la palabra que exige
+        if "MEMORY" in linea_log:
+            memoria_match = re.search(r"MEMORY.*?(\d+)MB", linea_log)
+            if memoria_match:
+                memoria_mb = int(memoria_match.group(1))
         
-        if errores_criticos >= 2:
+        if "CPU" in linea_log:
+            cpu_match = re.search(r"CPU.*?(\d+)%", linea_log)
+            if cpu_match:
+                cpu_porcentaje = int(cpu_match.group(1))
+        return memoria_mb, cpu_porcentaje
+    
+    def evaluar_salud_servicio(self, logs_recientes: List[str], analisis=None) -> str:
+        """
+        :param logs_recientes: Líneas de log recientes
+        :param analisis: Opcional, análisis ya calculados de logs_recientes (lista de
+            analizar_patron_log o lote de analizar_lote) para no volver a parsearlas
+        """
+        ventana = analisis_de_ventana(self.analizar_patron_log, logs_recientes, analisis, self.VENTANA_SALUD)
+        contadores = sumar_aportes(self._aporte_salud, len(self.CONTADORES_SALUD),
+                                   logs_recientes[-self.VENTANA_SALUD:], filas(ventana, *self.CAMPOS_SALUD))
+        return self._veredicto_salud(contadores)
+    
+    def crear_evaluador_salud(self) -> EvaluadorSalud:
+        """
+        Evaluador incremental: mismo veredicto que evaluar_salud_servicio,
+        pero actualizado en tiempo constante con cada línea nueva.
+        """
+        return EvaluadorSalud(self)
+    
+    def crear_evaluador_temporal(self, ventanas=None, umbrales=None) -> EvaluadorSaludTemporal:
+        """
+        Evaluador por ventanas de tiempo (1m, 5m, 15m...). Si no se indican, las
+        ventanas salen de `ventanas_salud` y los umbrales de cada una de
+        `umbrales_ventanas` en config.yaml (por defecto, los de umbrales_salud).
+        """
+        return EvaluadorSaludTemporal(self, ventanas or self.config.get('ventanas_salud', VENTANAS_SALUD_POR_DEFECTO),
+                                      umbrales if umbrales is not None else self.config.get('umbrales_ventanas'))
+    
+    def _aporte_salud(self, linea_log: str, nivel: int, memoria_mb: Optional[int]) -> Tuple[int, int]:
+        return (
+            1 if nivel == NIVEL_CRITICAL else 0,
+            1 if memoria_mb and memoria_mb > self.umbral_memoria_mb else 0
+        )
+    
+    def _veredicto_salud(self, contadores: List[int], umbrales: Optional[Dict] = None) -> str:
+        umbrales = umbrales or self.umbrales_salud
+        errores_criticos, memoria_alta = contadores
+        if errores_criticos >= umbrales["errores_criticos"]:
             return "CRITICAL"
-        elif errores_criticos >= 1 or memoria_alta >= 5:
+        elif errores_criticos >= 1 or memoria_alta >= umbrales["memoria_alta_error"]:
             return "ERROR"
-        elif memoria_alta >= 2:
+        elif memoria_alta >= umbrales["memoria_alta_warning"]:
             return "WARNING"
         else:
             return "OK"
@@ -91,8 +193,7 @@ class RuntimeMonitor:
             return False
     
     def _extraer_timestamp(self, linea_log: str) -> Optional[str]:
-        timestamp_match = re.search(r"\[([\d-]+\s[\d:]+)\]", linea_log)
-        return timestamp_match.group(1) if timestamp_match else None
+        return extraer_timestamp_texto(linea_log)
 
 # Mantener funciones existentes para compatibilidad
 def cargar_config(config_path):
@@ -114,6 +215,22 @@ def leer_logs(ruta_logs):
         print(f"Error leyendo logs: {e}")
         return None
 
+def escanear_logs(ruta_logs, monitor=None):
+    """
+    Como leer_logs, pero para archivos grandes: recorre el archivo mapeado en
+    memoria y devuelve solo las líneas críticas o de warning, como lista de
+    (byte donde empieza, línea, análisis). Las demás líneas no se decodifican.
+    """
+    if not os.path.exists(ruta_logs):
+        print(f"Error: No se encuentra el archivo {ruta_logs}")
+        return None
+    
+    try:
+        return list(escanear_archivo(ruta_logs, monitor or RuntimeMonitor()))
+    except Exception as e:
+        print(f"Error escaneando logs: {e}")
+        return None
+
 def registrar_evento(ruta_log, mensaje):
     timestamp = datetime.now().isoformat()
     with open(ruta_log, "a", encoding="utf-8") as f:
@@ -0,0 +1,158 @@
+"""
+Las pruebas importan los módulos igual que main.py (utils.x, plugins.x),
+así que la raíz del proyecto tiene que estar en sys.path.
+"""
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _rfc3339(instante):
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(instante)) + ".%09dZ" % int((instante % 1) * 1e9)
+
+
+class ServidorK8sFalso:
+    """
+    API server mínimo para las pruebas: lista, observa y borra pods de un
+    namespace y sirve sus logs (con tailLines, sinceSeconds, timestamps y
+    follow). Cada petición queda en `pedidos` como (método, ruta, parámetros).
+    Con `no_autorizado` responde 401 a todo, como con credenciales revocadas.
+    """
+
+    def __init__(self):
+        # pod -> {"fase", "contenedores"}
+        self.pods = {}
+        # (pod, contenedor) -> [(instante, texto)]
+        self.logs = {}
+        self.pedidos = []
+        self.eventos = queue.Queue()
+        self.no_autorizado = False
+        servidor = self
+
+        class Manejador(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def responder(self, cuerpo, tipo="application/json", estado=200):
+                self.send_response(estado)
+                self.send_header("Content-Type", tipo)
+                self.send_header("Content-Length", str(len(cuerpo)))
+                self.end_headers()
+                self.wfile.write(cuerpo)
+
+            def fragmento(self, datos):
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(datos), datos))
+                self.wfile.flush()
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                parametros = parse_qs(url.query)
+                servidor.pedidos.append(("GET", url.path, parametros))
+                partes = url.path.split("/")
+                if servidor.no_autorizado:
+                    self.responder(b'{"kind": "Status", "code": 401}', estado=401)
+                    return
+                if url.path.endswith("/pods") and parametros.get("watch") == ["true"]:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Transfer-Encoding", "chunked")
+                    self.end_headers()
+                    while True:
+                        evento = servidor.eventos.get()
+                        if evento is None:
+                            break
+                        self.fragmento((json.dumps(evento) + "\n").encode())
+                    self.fragmento(b"")
+                elif url.path.endswith("/pods"):
+                    self.responder(json.dumps({"kind": "PodList", "apiVersion": "v1",
+                                               "metadata": {"resourceVersion": "100"},
+                                               "items": [servidor.pod(nombre) for nombre in servidor.pods]}).encode())
+                elif url.path.endswith("/log"):
+                    if partes[-2] not in servidor.pods:
+                        self.responder(b'{"kind": "Status", "code": 404}', estado=404)
+                        return
+                    # Sin container, el primero del pod (como con un solo contenedor)
+                    contenedor = parametros.get("container", servidor.pods[partes[-2]]["contenedores"])[0]
+                    lineas = servidor.logs.get((partes[-2], contenedor), [])
+                    if "sinceSeconds" in parametros:
+                        limite = time.time() - int(parametros["sinceSeconds"][0])
+                        lineas = [linea for linea in lineas if linea[0] >= limite]
+                    if "tailLines" in parametros:
+                        lineas = lineas[-int(parametros["tailLines"][0]):]
+                    if parametros.get("timestamps") == ["true"]:
+                        cuerpo = "".join(f"{_rfc3339(instante)} {texto}\n" for instante, texto in lineas).encode()
+                    else:
+                        cuerpo = "".join(f"{texto}\n" for _, texto in lineas).encode()
+                    if parametros.get("follow") != ["true"]:
+                        self.responder(cuerpo, "text/plain")
+                        return
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain")
+                    self.send_header("Transfer-Encoding", "chunked")
+                    self.end_headers()
+                    if cuerpo:
+                        self.fragmento(cuerpo)
+                    time.sleep(0.3)
+                    self.fragmento(b"")
+                else:
+                    self.responder(b"{}", estado=404)
+
+            def do_DELETE(self):
+                url = urlparse(self.path)
+                servidor.pedidos.append(("DELETE", url.path, {}))
+                nombre = url.path.split("/")[-1]
+                if servidor.pods.pop(nombre, None) is None:
+                    self.responder(b"{}", estado=404)
+                    return
+                self.responder(json.dumps(servidor.pod(nombre)).encode())
+
+        self._http = ThreadingHTTPServer(("127.0.0.1", 0), Manejador)
+        self._http.daemon_threads = True
+        self.host = f"http://127.0.0.1:{self._http.server_port}"
+
+    def pod(self, nombre, version="1"):
+        datos = self.pods.get(nombre, {"fase": "Running", "contenedores": ["app"]})
+        return {"kind": "Pod", "apiVersion": "v1",
+                "metadata": {"name": nombre, "namespace": "ns", "resourceVersion": version},
+                "spec": {"containers": [{"name": contenedor} for contenedor in datos["contenedores"]]},
+                "status": {"phase": datos["fase"]}}
+
+    def agregar_pod(self, nombre, fase="Running", contenedores=("app",)):
+        self.pods[nombre] = {"fase": fase, "contenedores": list(contenedores)}
+
+    def escribir(self, pod, contenedor, texto, instante=None):
+        self.logs.setdefault((pod, contenedor), []).append((time.time() if instante is None else instante, texto))
+
+    def iniciar(self):
+        threading.Thread(target=self._http.serve_forever, daemon=True).start()
+
+    def detener(self):
+        self.eventos.put(None)
+        self._http.shutdown()
+        self._http.server_close()
+
+
+@pytest.fixture
+def api_k8s(monkeypatch):
+    """API server falso de Kubernetes, usado a través de K8S_API_HOST"""
+    pytest.importorskip("kubernetes")
+    from utils.k8s_utils import VARIABLE_HOST, descartar_api
+
+    servidor = ServidorK8sFalso()
+    servidor.iniciar()
+    monkeypatch.setenv(VARIABLE_HOST, servidor.host)
+    descartar_api()
+    yield servidor
+    descartar_api()
+    servidor.detener()
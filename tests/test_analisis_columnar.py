@@ -0,0 +1,79 @@
+import pytest
+
+from plugins.assetapi import AssetAPIMonitor
+from plugins.avionics import AvionicsMonitor
+from plugins.runtime import RuntimeMonitor
+from utils.analisis_columnar import (NIVEL_CRITICAL, NIVEL_INFO, SIN_VALOR, a_entero, analisis_de_ventana,
+                                     contar_niveles, filas, lineas_en_mayusculas, ultimos)
+
+LINEAS = [
+    "2024-01-01 10:00:00 INFO arranque",
+    "2024-01-01T10:00:01.250Z GET /api/assets HTTP/1.1 200 35ms",
+    "2024-01-01 10:00:02 POST /api/assets 503 1200ms",
+    "[2024-01-01 10:00:03] ERROR Out of memory: MEMORY usage 2048MB CPU 97%",
+    "GPS SIGNAL LOST LAT:40.4168 LON:-3.7038",
+    "GPS ACCURACY LOW LAT:-33.8 LON:151.2",
+    "battery low",
+    "ERROR algo salió mal",
+    "Kelvin K no ASCII",
+    "",
+]
+
+
+@pytest.fixture(params=[AvionicsMonitor, AssetAPIMonitor, RuntimeMonitor], ids=lambda cls: cls.__name__)
+def monitor(request):
+    return request.param()
+
+
+def test_lote_igual_que_linea_por_linea(monitor):
+    lote = monitor.analizar_lote(LINEAS)
+    columnas = list(lote)
+    assert all(len(lote[columna]) == len(LINEAS) for columna in columnas)
+    por_linea = [monitor.analizar_patron_log(linea) for linea in LINEAS]
+    assert list(filas(lote, *columnas)) == list(filas(por_linea, *columnas))
+
+
+def test_lote_con_mayusculas_precalculadas(monitor):
+    mayus = [linea.upper() for linea in LINEAS]
+    assert list(filas(monitor.analizar_lote(LINEAS, mayus), "nivel")) == \
+        list(filas(monitor.analizar_lote(LINEAS), "nivel"))
+    with pytest.raises(ValueError):
+        monitor.analizar_lote(LINEAS, mayus[:-1])
+
+
+def test_lote_vacio(monitor):
+    lote = monitor.analizar_lote([])
+    assert contar_niveles(lote) == {"INFO": 0, "WARNING": 0, "ERROR": 0, "CRITICAL": 0}
+
+
+def test_contar_niveles_y_ultimos():
+    lote = RuntimeMonitor().analizar_lote(LINEAS)
+    conteo = contar_niveles(lote)
+    assert sum(conteo.values()) == len(LINEAS)
+    assert conteo["CRITICAL"] == 1
+    recorte = ultimos(lote, 3)
+    assert list(recorte["nivel"]) == list(lote["nivel"][-3:])
+    assert ultimos([1, 2, 3], 2) == [2, 3]
+
+
+def test_metricas_ausentes_son_none():
+    lote = RuntimeMonitor().analizar_lote(["sin datos", "MEMORY 512MB"])
+    assert lote["memoria_mb"][0] == SIN_VALOR
+    assert list(filas(lote, "nivel", "memoria_mb")) == [(NIVEL_INFO, None), (NIVEL_INFO, 512)]
+
+
+def test_analisis_de_ventana():
+    monitor = RuntimeMonitor()
+    lote = monitor.analizar_lote(LINEAS)
+    ventana = analisis_de_ventana(monitor.analizar_patron_log, LINEAS, lote, 4)
+    assert list(ventana["nivel"]) == list(lote["nivel"][-4:])
+    assert len(analisis_de_ventana(monitor.analizar_patron_log, LINEAS, None, 4)) == 4
+    with pytest.raises(ValueError):
+        analisis_de_ventana(monitor.analizar_patron_log, LINEAS[:-1], lote, 4)
+
+
+def test_conversiones():
+    assert a_entero(None) == SIN_VALOR
+    assert a_entero(10 ** 30) == 2 ** 63 - 1
+    assert list(lineas_en_mayusculas(["ab"])) == ["AB"]
+    assert NIVEL_CRITICAL == 3
@@ -0,0 +1,60 @@
+import pytest
+
+from plugins.assetapi import AssetAPIMonitor
+from plugins.avionics import AvionicsMonitor
+from plugins.runtime import RuntimeMonitor
+from utils.analisis_columnar import contar_niveles
+from utils.analisis_compartido import AnalizadorCompartido, leer_lineas
+
+LINEAS = [
+    "2024-01-01 10:00:00 INFO arranque",
+    "GPS SIGNAL LOST",
+    "GET /api/assets HTTP/1.1 503 900ms",
+    "ERROR Out of memory: MEMORY 4096MB",
+    "battery low",
+    "línea con acentos ñ",
+]
+
+
+@pytest.fixture
+def monitores():
+    return {"avionics": AvionicsMonitor(), "asset_api": AssetAPIMonitor(), "runtime": RuntimeMonitor()}
+
+
+def test_mismo_resultado_que_cada_plugin_por_separado(monitores):
+    resultados = AnalizadorCompartido(monitores).analizar_lineas(LINEAS)
+    assert set(resultados) == set(monitores)
+    for nombre, monitor in monitores.items():
+        lote = monitor.analizar_lote(LINEAS)
+        assert resultados[nombre]["conteo"] == contar_niveles(lote)
+        assert resultados[nombre]["estado"] == monitor.evaluar_salud_servicio(LINEAS)
+
+
+def test_las_mayusculas_se_calculan_una_vez(monitores):
+    recibidas = []
+    for monitor in monitores.values():
+        original = monitor.analizar_lote
+        monitor.analizar_lote = lambda lineas, mayus=None, original=original: (recibidas.append(mayus),
+                                                                              original(lineas, mayus))[1]
+    AnalizadorCompartido(monitores).analizar_lineas(LINEAS)
+    assert len(recibidas) == 3
+    assert recibidas[0] == [linea.upper() for linea in LINEAS]
+    assert all(mayus is recibidas[0] for mayus in recibidas)
+
+
+def test_analizar_archivo(tmp_path, monitores):
+    ruta = tmp_path / "combinado.log"
+    ruta.write_bytes("\r\n".join(LINEAS).encode("utf-8") + b"\r\n")
+    analizador = AnalizadorCompartido({})
+    analizador.agregar_monitor("runtime", monitores["runtime"])
+    completo = analizador.analizar_archivo(str(ruta))
+    assert sum(completo["runtime"]["conteo"].values()) == len(LINEAS)
+    assert analizador.analizar_archivo(str(ruta), ultimas=2)["runtime"]["conteo"]["INFO"] == 2
+
+
+@pytest.mark.parametrize("ultimas", [None, 2, 100])
+def test_leer_lineas(tmp_path, ultimas):
+    ruta = tmp_path / "app.log"
+    ruta.write_bytes(b"uno\r\ndos\ntres\xff\ncuatro")
+    esperado = ["uno", "dos", "tres�", "cuatro"]
+    assert leer_lineas(str(ruta), ultimas) == (esperado[-ultimas:] if ultimas else esperado)
@@ -0,0 +1,77 @@
+import pytest
+
+from plugins.runtime import RuntimeMonitor
+from utils import analisis_paralelo
+from utils.analisis_paralelo import (analizar_archivo_paralelo, analizar_rango, combinar_parciales,
+                                     dividir_en_rangos, lineas_de_bloques)
+
+
+def generar_lineas(cantidad):
+    lineas = []
+    for i in range(cantidad):
+        minuto, segundo = divmod(i, 60)
+        if i % 37 == 5:
+            texto = "ERROR Out of memory en el worker"
+        elif i % 11 == 0:
+            texto = "WARNING MEMORY usage high 900MB"
+        else:
+            texto = f"INFO petición {i} ñ"
+        lineas.append(f"2024-01-01 10:{minuto % 60:02d}:{segundo:02d} {texto}")
+    return lineas
+
+
+@pytest.fixture
+def log(tmp_path):
+    lineas = generar_lineas(500)
+    ruta = tmp_path / "grande.log"
+    ruta.write_bytes(("\r\n".join(lineas[:250]) + "\n" + "\n".join(lineas[250:])).encode("utf-8"))
+    return str(ruta), lineas
+
+
+def esperado(lineas):
+    monitor = RuntimeMonitor()
+    niveles = [monitor.analizar_patron_log(linea)["nivel"] for linea in lineas]
+    conteo = {nivel: niveles.count(nivel) for nivel in ("INFO", "WARNING", "ERROR", "CRITICAL")}
+    criticas = [(i + 1, linea) for i, (linea, nivel) in enumerate(zip(lineas, niveles)) if nivel == "CRITICAL"]
+    return conteo, criticas[0], criticas[-1]
+
+
+@pytest.mark.parametrize("partes", [1, 2, 7, 50])
+def test_rangos_alineados_a_lineas(log, partes):
+    ruta, _ = log
+    with open(ruta, "rb") as f:
+        datos = f.read()
+    rangos = dividir_en_rangos(ruta, partes)
+    assert rangos[0][0] == 0 and rangos[-1][1] == len(datos)
+    for (_, fin), (inicio, _) in zip(rangos, rangos[1:]):
+        assert fin == inicio and datos[inicio - 1:inicio] == b"\n"
+
+
+def test_lineas_de_bloques_cortados():
+    datos = "uno\r\ndos ñ\ntres".encode("utf-8")
+    bloques = [datos[i:i + 3] for i in range(0, len(datos), 3)]
+    assert [linea for lote in lineas_de_bloques(bloques) for linea in lote] == ["uno", "dos ñ", "tres"]
+
+
+@pytest.mark.parametrize("partes", [1, 3, 16])
+def test_combinar_rangos_igual_que_linea_por_linea(log, partes):
+    ruta, lineas = log
+    parciales = [analizar_rango("runtime", ruta, inicio, fin) for inicio, fin in dividir_en_rangos(ruta, partes)]
+    reporte = combinar_parciales(parciales, RuntimeMonitor.VENTANA_SALUD)
+    conteo, primera, ultima = esperado(lineas)
+    assert reporte["lineas"] == len(lineas)
+    assert reporte["conteo"] == conteo
+    assert reporte["primera_critica"] == primera
+    assert reporte["ultima_critica"] == ultima
+    assert reporte["ultimas_lineas"] == lineas[-RuntimeMonitor.VENTANA_SALUD:]
+    assert sum(sum(cubeta.values()) for cubeta in reporte["histograma"].values()) == len(lineas)
+
+
+def test_con_procesos(log, monkeypatch):
+    ruta, lineas = log
+    monkeypatch.setattr(analisis_paralelo, "TAMANO_MINIMO_PARALELO", 0)
+    reporte = analizar_archivo_paralelo(ruta, "runtime", procesos=2)
+    conteo, primera, ultima = esperado(lineas)
+    assert reporte["conteo"] == conteo
+    assert (reporte["primera_critica"], reporte["ultima_critica"]) == (primera, ultima)
+    assert reporte["estado"] == RuntimeMonitor().evaluar_salud_servicio(lineas[-RuntimeMonitor.VENTANA_SALUD:])
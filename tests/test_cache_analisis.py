@@ -0,0 +1,63 @@
+import pytest
+
+from plugins.runtime import RuntimeMonitor
+from utils.cache_analisis import CacheLRU
+
+
+def test_descarta_la_menos_usada():
+    cache = CacheLRU(capacidad=2)
+    cache.guardar("a", {"nivel": "INFO"})
+    cache.guardar("b", {"nivel": "WARNING"})
+    assert cache.obtener("a") == {"nivel": "INFO"}  # "a" pasa a ser la más reciente
+    cache.guardar("c", {"nivel": "CRITICAL"})
+    assert len(cache) == 2
+    assert cache.obtener("b") is None
+    assert cache.obtener("a") is not None and cache.obtener("c") is not None
+    assert (cache.aciertos, cache.fallos) == (3, 1)
+
+
+def test_guardar_de_nuevo_actualiza():
+    cache = CacheLRU(capacidad=2)
+    cache.guardar("a", {"v": 1})
+    cache.guardar("a", {"v": 2})
+    assert len(cache) == 1
+    assert cache.obtener("a") == {"v": 2}
+    cache.limpiar()
+    assert len(cache) == 0
+
+
+def test_capacidad_invalida():
+    with pytest.raises(ValueError):
+        CacheLRU(capacidad=0)
+
+
+def test_el_plugin_no_vuelve_a_analizar_la_misma_linea():
+    monitor = RuntimeMonitor()
+    linea = "2024-01-01 10:00:00 ERROR Out of memory MEMORY 2048MB"
+    primero = monitor.analizar_patron_log(linea)
+    assert monitor.analizar_patron_log(linea) is primero
+    assert monitor.cache_analisis.aciertos == 1
+    assert primero["nivel"] == "CRITICAL"
+    assert primero["memoria_mb"] == 2048
+
+
+@pytest.mark.parametrize("modulo, clase", [("plugins.avionics", "AvionicsMonitor"),
+                                            ("plugins.assetapi", "AssetAPIMonitor"),
+                                            ("plugins.runtime", "RuntimeMonitor")])
+def test_cada_linea_se_analiza_una_vez(monkeypatch, modulo, clase):
+    import importlib
+
+    monitor = getattr(importlib.import_module(modulo), clase)()
+    analizadas = []
+    original = monitor._analizar_linea
+    monkeypatch.setattr(monitor, "_analizar_linea", lambda linea: (analizadas.append(linea), original(linea))[1])
+    lineas = [f"2024-01-01 10:00:{i:02d} INFO linea {i}" for i in range(40)] + ["GPS SIGNAL LOST", "HTTP 503"]
+
+    analisis = [monitor.analizar_patron_log(linea) for linea in lineas]
+    assert len(analizadas) == len(lineas)
+    # Con los análisis ya hechos no se vuelve a analizar nada...
+    con_analisis = monitor.evaluar_salud_servicio(lineas, analisis)
+    assert len(analizadas) == len(lineas)
+    # ...y sin ellos, la cache da el mismo veredicto sin reanalizar
+    assert monitor.evaluar_salud_servicio(lineas) == con_analisis
+    assert len(analizadas) == len(lineas)
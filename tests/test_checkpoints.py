@@ -0,0 +1,152 @@
+import json
+import os
+
+import pytest
+
+from plugins.runtime import RuntimeMonitor
+from utils.analisis_columnar import NIVEL_CRITICAL, NIVEL_INFO
+from utils.checkpoints import AlmacenCheckpoints
+from utils.file_utils import MonitorLogSimple
+
+
+class MonitorDePrueba(MonitorLogSimple):
+    def __init__(self, *args, **kwargs):
+        self.lotes = []
+        super().__init__(*args, **kwargs)
+
+    def mostrar_lote(self, lineas, analisis=None):
+        self.lotes.append((list(lineas), analisis))
+
+    def lineas(self):
+        return [linea for lote, _ in self.lotes for linea in lote]
+
+
+@pytest.fixture
+def ruta(tmp_path):
+    return str(tmp_path / "app.log")
+
+
+@pytest.fixture
+def ruta_checkpoints(tmp_path):
+    return str(tmp_path / "checkpoints" / "checkpoints.json")
+
+
+def escribir(ruta, texto, modo="a"):
+    with open(ruta, modo, encoding="utf-8") as f:
+        f.write(texto)
+
+
+def seguir_y_cerrar(ruta, ruta_checkpoints, **kwargs):
+    """Una ejecución del monitor: lee lo pendiente, guarda y termina"""
+    checkpoints = AlmacenCheckpoints(ruta_checkpoints)
+    monitor = MonitorDePrueba(ruta, checkpoints=checkpoints, **kwargs)
+    monitor.leer_contenido_nuevo()
+    monitor.cerrar()
+    checkpoints.guardar()
+    return monitor
+
+
+def test_almacen_guarda_y_carga(tmp_path, ruta_checkpoints):
+    almacen = AlmacenCheckpoints(ruta_checkpoints, intervalo=3600)
+    almacen.registrar("app.log", (1, 2), 10, b"0123456789")
+    assert not os.path.exists(ruta_checkpoints)  # No se escribe por cada registro
+    almacen.guardar()
+    with open(ruta_checkpoints, encoding="utf-8") as f:
+        assert json.load(f)[os.path.abspath("app.log")]["offset"] == 10
+
+    checkpoint = AlmacenCheckpoints(ruta_checkpoints).obtener("app.log")
+    assert checkpoint["offset"] == 10
+    assert almacen.coincide(checkpoint, (1, 2), b"0123456789")
+    assert not almacen.coincide(checkpoint, (1, 2), b"otra cosa")
+    assert not almacen.coincide(checkpoint, (1, 3), b"0123456789")
+
+
+def test_almacen_con_archivo_roto(ruta_checkpoints):
+    os.makedirs(os.path.dirname(ruta_checkpoints))
+    escribir(ruta_checkpoints, "{no es json", "w")
+    assert AlmacenCheckpoints(ruta_checkpoints).checkpoints == {}
+
+
+def test_fsync_antes_de_reemplazar(monkeypatch, ruta_checkpoints):
+    import utils.checkpoints as modulo
+
+    pasos = []
+    fsync, replace = os.fsync, os.replace
+    monkeypatch.setattr(modulo.os, "fsync", lambda fd: (pasos.append("fsync"), fsync(fd)))
+    monkeypatch.setattr(modulo.os, "replace", lambda a, b: (pasos.append("replace"), replace(a, b)))
+    almacen = AlmacenCheckpoints(ruta_checkpoints, intervalo=3600)
+    almacen.registrar("app.log", (1, 2), 10, b"x")
+    almacen.guardar()
+    assert pasos[:2] == ["fsync", "replace"]
+
+
+def test_guardado_periodico_sin_mas_lecturas(ruta_checkpoints):
+    import signal
+    import time
+
+    manejador = signal.getsignal(signal.SIGTERM)
+    almacen = AlmacenCheckpoints(ruta_checkpoints, intervalo=0.05)
+    try:
+        almacen.iniciar_guardado_periodico()
+        assert signal.getsignal(signal.SIGTERM) is signal.default_int_handler
+        # El registro no llega a guardar: el intervalo todavía no pasó
+        almacen._ultimo_guardado = time.monotonic() + 3600
+        almacen.registrar("app.log", (1, 2), 10, b"x")
+        limite = time.monotonic() + 5
+        while not os.path.exists(ruta_checkpoints) and time.monotonic() < limite:
+            time.sleep(0.01)
+        assert AlmacenCheckpoints(ruta_checkpoints).obtener("app.log")["offset"] == 10
+
+        almacen.registrar("app.log", (1, 2), 20, b"x")
+    finally:
+        almacen.detener()
+        signal.signal(signal.SIGTERM, manejador)
+    assert AlmacenCheckpoints(ruta_checkpoints).obtener("app.log")["offset"] == 20
+
+
+def test_retoma_lo_escrito_mientras_estaba_detenido(ruta, ruta_checkpoints):
+    escribir(ruta, "antes de empezar\n", "w")
+    seguir_y_cerrar(ruta, ruta_checkpoints)
+    escribir(ruta, "mientras tanto 1\nmientras tanto 2\n")
+    monitor = seguir_y_cerrar(ruta, ruta_checkpoints)
+    assert monitor.lineas() == ["mientras tanto 1", "mientras tanto 2"]
+    # Sin nada nuevo, la siguiente ejecución no repite nada
+    assert seguir_y_cerrar(ruta, ruta_checkpoints).lineas() == []
+
+
+def test_linea_a_medias_no_avanza_el_checkpoint(ruta, ruta_checkpoints):
+    escribir(ruta, "", "w")
+    seguir_y_cerrar(ruta, ruta_checkpoints)
+    escribir(ruta, "completa\nmita")
+    assert seguir_y_cerrar(ruta, ruta_checkpoints).lineas() == ["completa"]
+    escribir(ruta, "d\n")
+    assert seguir_y_cerrar(ruta, ruta_checkpoints).lineas() == ["mitad"]
+
+
+def test_rotado_mientras_estaba_detenido(ruta, ruta_checkpoints):
+    escribir(ruta, "", "w")
+    seguir_y_cerrar(ruta, ruta_checkpoints)
+    escribir(ruta, "del viejo\n")
+    os.rename(ruta, ruta + ".1")
+    escribir(ruta, "del nuevo\n", "w")
+    # Se termina el archivo rotado y se sigue con el nuevo desde el principio
+    assert seguir_y_cerrar(ruta, ruta_checkpoints).lineas() == ["del viejo", "del nuevo"]
+
+
+def test_archivo_reemplazado_se_lee_desde_el_principio(ruta, ruta_checkpoints):
+    escribir(ruta, "contenido original\n", "w")
+    seguir_y_cerrar(ruta, ruta_checkpoints)
+    os.remove(ruta)
+    escribir(ruta, "otro archivo\n", "w")
+    assert seguir_y_cerrar(ruta, ruta_checkpoints).lineas() == ["otro archivo"]
+
+
+def test_la_puesta_al_dia_pasa_por_el_analizador(ruta, ruta_checkpoints):
+    escribir(ruta, "", "w")
+    seguir_y_cerrar(ruta, ruta_checkpoints)
+    escribir(ruta, "2024-01-01 10:00:00 OUT OF MEMORY\n2024-01-01 10:00:01 todo bien\n")
+    monitor = seguir_y_cerrar(ruta, ruta_checkpoints, analizador=RuntimeMonitor())
+    [(lineas, analisis)] = monitor.lotes
+    assert lineas == ["2024-01-01 10:00:00 OUT OF MEMORY", "2024-01-01 10:00:01 todo bien"]
+    assert list(analisis["nivel"]) == [NIVEL_CRITICAL, NIVEL_INFO]
+    assert monitor.estado_salud == "ERROR"
@@ -0,0 +1,82 @@
+import json
+import os
+
+import pytest
+
+from utils import config_loader
+from utils.config_loader import detectar_logs, generar_configuracion_automatica
+
+
+@pytest.fixture
+def arbol(tmp_path, monkeypatch):
+    monkeypatch.setattr(config_loader, "CACHE_DETECCION_PATH", str(tmp_path / "cache_deteccion.json"))
+    monkeypatch.setattr(config_loader, "_cache_directorios", None)
+    raiz = tmp_path / "logs"
+    for relativa in ("app.log", "app.log.1", "app.log.2.gz", "nginx/access.log", "apache2/access.log",
+                     "apache2/error.log-20240101.bz2", ".git/objetos.log", "notas.txt",
+                     "a/b/c/d/e/profundo.log"):
+        ruta = raiz / relativa
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        ruta.write_bytes(b"")
+    # Un enlace hacia arriba no tiene que hacer que la búsqueda dé vueltas
+    os.symlink(raiz, raiz / "nginx" / "ciclo")
+    return raiz
+
+
+def rutas(repositorios):
+    return {repo_id: repo["ruta_logs"] for repo_id, repo in repositorios.items()}
+
+
+def test_detectar_logs(arbol):
+    encontrados = rutas(detectar_logs(raices=[str(arbol)], profundidad_maxima=4))
+    assert encontrados == {
+        "app": str(arbol / "app.log"),
+        "access": str(arbol / "nginx" / "access.log"),
+        "apache2_access": str(arbol / "apache2" / "access.log"),
+        # Solo hay segmentos rotados, pero el repositorio es el del log vivo
+        "error": str(arbol / "apache2" / "error.log"),
+    }
+    assert "profundo" in detectar_logs(raices=[str(arbol)], profundidad_maxima=5)
+
+
+def test_raices_solapadas(arbol):
+    # La carpeta de nginx también cuelga de la primera raíz: se explora una sola vez
+    encontrados = rutas(detectar_logs(raices=[str(arbol), str(arbol / "nginx")]))
+    assert encontrados["access"] == str(arbol / "nginx" / "access.log")
+    assert not any(repo_id.startswith("nginx_") for repo_id in encontrados)
+
+
+def test_cache_de_directorios(arbol, monkeypatch):
+    detectar_logs(raices=[str(arbol)])
+    with open(config_loader.CACHE_DETECCION_PATH, encoding="utf-8") as f:
+        assert str(arbol) in json.load(f)
+
+    listados = []
+    scandir = os.scandir
+    monkeypatch.setattr(os, "scandir", lambda ruta: (listados.append(ruta), scandir(ruta))[1])
+    monkeypatch.setattr(config_loader, "_cache_directorios", None)
+    detectar_logs(raices=[str(arbol)])
+    assert listados == []
+
+    # Un log nuevo cambia el mtime del directorio: solo ese se vuelve a listar.
+    # Fijamos el mtime a mano para no depender de la resolución del reloj del sistema
+    (arbol / "nginx" / "nuevo.log").write_bytes(b"")
+    os.utime(arbol / "nginx", ns=(0, os.stat(arbol / "nginx").st_mtime_ns + 1))
+    assert "nuevo" in detectar_logs(raices=[str(arbol)])
+    assert listados == [str(arbol / "nginx")]
+
+
+def test_generar_configuracion_respeta_lo_manual(arbol, tmp_path, capsys):
+    config_path = str(tmp_path / "config" / "monitor_config.json")
+    os.makedirs(os.path.dirname(config_path))
+    manual = {"nombre": "App a mano", "ruta_logs": "/srv/app.log", "descripcion": "Configurado a mano"}
+    with open(config_path, "w", encoding="utf-8") as f:
+        json.dump({"repositorios": {"app": manual},
+                   "configuracion_general": {"deteccion_logs": {"raices": [str(arbol)]}}}, f)
+
+    config = generar_configuracion_automatica(config_path)
+    assert config["repositorios"]["app"] == manual
+    assert config["repositorios"]["access"]["ruta_logs"] == str(arbol / "nginx" / "access.log")
+    assert "Se agregaron 3 repositorios nuevos" in capsys.readouterr().out
+    with open(config_path, encoding="utf-8") as f:
+        assert json.load(f) == config
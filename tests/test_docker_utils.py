@@ -0,0 +1,96 @@
+import time
+
+import pytest
+
+docker = pytest.importorskip("docker")
+
+from utils import docker_utils  # noqa: E402
+from utils.docker_utils import LectorIncrementalDocker  # noqa: E402
+
+
+def _rfc3339(instante):
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(instante)) + ".%09dZ" % int((instante % 1) * 1e9)
+
+
+class ApiFalsa:
+    """api.logs de docker-py sobre una lista de (instante, línea)"""
+    def __init__(self):
+        self.lineas = []
+        self.llamadas = []
+
+    def logs(self, container, stdout=True, stderr=True, timestamps=False, tail="all", since=None):
+        self.llamadas.append({"tail": tail, "since": since})
+        if container == "no-existe":
+            raise docker.errors.NotFound("no existe")
+        lineas = [linea for linea in self.lineas if since is None or linea[0] >= since]
+        if tail != "all":
+            lineas = lineas[-tail:]
+        return "".join(f"{_rfc3339(instante)} {texto}\n" for instante, texto in lineas).encode()
+
+
+class ClienteFalso:
+    def __init__(self):
+        self.api = ApiFalsa()
+        self.cerrado = False
+
+    def close(self):
+        self.cerrado = True
+
+
+@pytest.fixture
+def cliente(monkeypatch):
+    cliente = ClienteFalso()
+    monkeypatch.setattr(docker_utils, "obtener_cliente", lambda: cliente)
+    return cliente
+
+
+def test_cliente_compartido(monkeypatch):
+    creados = []
+
+    def from_env(**kwargs):
+        creados.append(kwargs)
+        return ClienteFalso()
+
+    monkeypatch.setattr(docker_utils.docker, "from_env", from_env)
+    monkeypatch.setattr(docker_utils, "_cliente", None)
+    primero = docker_utils.obtener_cliente()
+    assert docker_utils.obtener_cliente() is primero
+    assert creados == [{"max_pool_size": docker_utils.POOL_CONEXIONES}]
+
+    docker_utils.descartar_cliente()
+    assert primero.cerrado
+    assert docker_utils.obtener_cliente() is not primero
+    assert len(creados) == 2
+    docker_utils.descartar_cliente()
+
+
+def test_lector_pide_solo_lo_nuevo(cliente):
+    base = time.time() - 100
+    cliente.api.lineas = [(base + i, f"vieja {i}") for i in range(10)]
+    lector = LectorIncrementalDocker(tail=3)
+
+    assert lector.leer_nuevos("app") == "vieja 7\nvieja 8\nvieja 9\n"
+    assert cliente.api.llamadas[-1] == {"tail": 3, "since": None}
+
+    # Mismo segundo que la última línea vista: since la vuelve a traer y se descarta
+    cliente.api.lineas.append((base + 9.5, "nueva"))
+    assert lector.leer_nuevos("app") == "nueva\n"
+    assert cliente.api.llamadas[-1] == {"tail": "all", "since": int(base + 9)}
+    assert lector.leer_nuevos("app") == ""
+
+
+def test_lector_ultimas_lineas_como_get_docker_logs(cliente):
+    base = time.time() - 100
+    cliente.api.lineas = [(base + i, f"linea {i}") for i in range(5)]
+    lector = LectorIncrementalDocker(tail=3)
+    assert lector.ultimas_lineas("app") == "linea 2\nlinea 3\nlinea 4\n"
+    cliente.api.lineas.append((base + 10, "linea 5"))
+    assert lector.ultimas_lineas("app") == "linea 3\nlinea 4\nlinea 5\n"
+
+    lector.olvidar("app")
+    assert lector.ultimas_lineas("app") == "linea 3\nlinea 4\nlinea 5\n"
+    assert cliente.api.llamadas[-1]["since"] is None
+
+
+def test_lector_contenedor_inexistente(cliente):
+    assert LectorIncrementalDocker().leer_nuevos("no-existe").startswith("[ERROR] Contenedor 'no-existe'")
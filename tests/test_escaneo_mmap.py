@@ -0,0 +1,74 @@
+import pytest
+
+import utils.yaml_config
+from plugins.avionics import AvionicsMonitor
+from utils import escaneo_mmap
+from utils.escaneo_mmap import escanear_archivo
+
+LINEAS = [
+    "2024-01-01 10:00:00 INFO todo bien",
+    "OUT OF MEMORY al arrancar",
+    "2024-01-01 10:00:01 ERROR out of memory en el worker",
+    "GPS SIGNAL LOST",
+    "aviso: gps signal lost",
+    "BATTERY LOW",
+    "battery low otra vez",
+    "nav nav FAIL",
+    "nav net FAIL",
+    "ÉCHEC du moteur",
+    "Kelvin K OUT OF MEMORY",
+    "",
+    "fin SIGNAL WEAK",
+]
+
+CONFIGURACIONES = [
+    {},
+    {"errores_criticos": [r"^OUT.*OF.*MEMORY", r"GPS.*LOST$"], "errores_warning": [r"^BATTERY"]},
+    {"errores_criticos": [r"(?i)GPS.*LOST", r"(\w+) \1 FAIL"], "errores_warning": [r"LOW$"]},
+    {"errores_criticos": [r"ÉCHEC", r"^OUT"], "errores_warning": [r"WEAK$"]},
+    {"errores_criticos": [r"^.*LOST$"], "errores_warning": [r"^$|^BATTERY"]},
+]
+
+
+def _monitor(monkeypatch, config):
+    monkeypatch.setattr(utils.yaml_config, "get_config_for_plugin", lambda nombre: dict(config))
+    return AvionicsMonitor()
+
+
+def _esperado(monitor, lineas):
+    resultado = []
+    for linea in lineas:
+        analisis = monitor.analizar_patron_log(linea)
+        if analisis["nivel"] in escaneo_mmap.SEVERIDADES_ESCANEO:
+            resultado.append((linea, analisis["nivel"]))
+    return resultado
+
+
+@pytest.mark.parametrize("config", CONFIGURACIONES)
+@pytest.mark.parametrize("fin_linea", ["\n", "\r\n"])
+def test_escaneo_igual_que_linea_por_linea(tmp_path, monkeypatch, config, fin_linea):
+    monitor = _monitor(monkeypatch, config)
+    ruta = tmp_path / "app.log"
+    ruta.write_bytes(fin_linea.join(LINEAS).encode("utf-8"))
+
+    encontrado = [(linea, analisis["nivel"]) for _, linea, analisis in escanear_archivo(str(ruta), monitor)]
+    assert encontrado == _esperado(monitor, LINEAS)
+
+
+def test_escaneo_por_bloques_pequenos(tmp_path, monkeypatch):
+    monkeypatch.setattr(escaneo_mmap, "TAMANO_BLOQUE_ESCANEO", 16)
+    monitor = _monitor(monkeypatch, CONFIGURACIONES[1])
+    ruta = tmp_path / "app.log"
+    ruta.write_bytes("\n".join(LINEAS * 3).encode("utf-8"))
+
+    encontrado = [(linea, analisis["nivel"]) for _, linea, analisis in escanear_archivo(str(ruta), monitor)]
+    assert encontrado == _esperado(monitor, LINEAS * 3)
+
+
+def test_ancla_de_inicio_en_tiempo_de_ejecucion(tmp_path, monkeypatch):
+    monitor = _monitor(monkeypatch, {"errores_criticos": [r"^OUT.*OF.*MEMORY"], "errores_warning": []})
+    ruta = tmp_path / "app.log"
+    ruta.write_bytes(b"arranque\nOUT OF MEMORY\nya no: OUT OF MEMORY\n")
+
+    posiciones = [(desde, linea) for desde, linea, _ in escanear_archivo(str(ruta), monitor)]
+    assert posiciones == [(9, "OUT OF MEMORY")]
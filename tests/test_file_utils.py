@@ -0,0 +1,213 @@
+import os
+
+import pytest
+
+from utils.file_utils import MonitorLogSimple
+
+
+class MonitorDePrueba(MonitorLogSimple):
+    """Guarda los lotes en lugar de imprimirlos"""
+    def __init__(self, *args, **kwargs):
+        self.lotes = []
+        super().__init__(*args, **kwargs)
+
+    def mostrar_lote(self, lineas, analisis=None):
+        self.lotes.append(list(lineas))
+
+    def lineas(self):
+        return [linea for lote in self.lotes for linea in lote]
+
+
+@pytest.fixture
+def ruta(tmp_path):
+    return str(tmp_path / "app.log")
+
+
+def escribir(ruta, datos, modo="ab"):
+    with open(ruta, modo) as f:
+        f.write(datos.encode("utf-8") if isinstance(datos, str) else datos)
+
+
+def test_empieza_por_el_final(ruta):
+    escribir(ruta, "vieja 1\nvieja 2\n")
+    monitor = MonitorDePrueba(ruta)
+    escribir(ruta, "nueva\n")
+    monitor.leer_contenido_nuevo()
+    assert monitor.lineas() == ["nueva"]
+    monitor.cerrar()
+
+
+def test_archivo_que_aparece_despues(ruta):
+    monitor = MonitorDePrueba(ruta)
+    escribir(ruta, "primera\n")
+    monitor.leer_contenido_nuevo()
+    assert monitor.lineas() == ["primera"]
+    monitor.cerrar()
+
+
+def test_linea_a_medias_espera_al_salto(ruta):
+    escribir(ruta, "")
+    monitor = MonitorDePrueba(ruta)
+    escribir(ruta, "completa\nmita")
+    monitor.leer_contenido_nuevo()
+    assert monitor.lineas() == ["completa"]
+    escribir(ruta, "d\n")
+    monitor.leer_contenido_nuevo()
+    assert monitor.lineas() == ["completa", "mitad"]
+    monitor.cerrar()
+
+
+def test_caracter_utf8_partido(ruta):
+    escribir(ruta, "")
+    monitor = MonitorDePrueba(ruta)
+    datos = "año ñandú\n".encode("utf-8")
+    corte = datos.index("ñ".encode("utf-8")) + 1
+    escribir(ruta, datos[:corte])
+    monitor.leer_contenido_nuevo()
+    escribir(ruta, datos[corte:])
+    monitor.leer_contenido_nuevo()
+    assert monitor.lineas() == ["año ñandú"]
+    monitor.cerrar()
+
+
+def test_crlf_partido_entre_lecturas(ruta):
+    escribir(ruta, "")
+    monitor = MonitorDePrueba(ruta)
+    escribir(ruta, "uno\r\ndos\r")
+    monitor.leer_contenido_nuevo()
+    assert monitor.lineas() == ["uno"]
+    escribir(ruta, "\n")
+    monitor.leer_contenido_nuevo()
+    assert monitor.lineas() == ["uno", "dos"]
+    monitor.cerrar()
+
+
+def test_linea_mas_larga_que_el_bloque(ruta):
+    escribir(ruta, "")
+    monitor = MonitorDePrueba(ruta, tamano_lote_maximo=16)
+    larga = "x" * 100
+    escribir(ruta, larga)
+    monitor.leer_contenido_nuevo()
+    assert monitor.lineas() == []
+    escribir(ruta, "\ncorta\n")
+    monitor.leer_contenido_nuevo()
+    assert monitor.lineas() == [larga, "corta"]
+    monitor.cerrar()
+
+
+def test_lotes_acotados(ruta):
+    escribir(ruta, "")
+    monitor = MonitorDePrueba(ruta, tamano_lote_maximo=64)
+    lineas = [f"linea {i:03d}" for i in range(50)]
+    escribir(ruta, "".join(linea + "\n" for linea in lineas))
+    monitor.leer_contenido_nuevo()
+    assert monitor.lineas() == lineas
+    assert len(monitor.lotes) > 1
+    monitor.cerrar()
+
+
+def test_rotacion_por_renombrado(ruta):
+    escribir(ruta, "")
+    monitor = MonitorDePrueba(ruta)
+    escribir(ruta, "antes\nultima sin salto")
+    os.rename(ruta, ruta + ".1")
+    escribir(ruta, "nuevo 1\n", "wb")
+    monitor.leer_contenido_nuevo()
+    assert monitor.lineas() == ["antes", "ultima sin salto", "nuevo 1"]
+    escribir(ruta, "nuevo 2\n")
+    monitor.leer_contenido_nuevo()
+    assert monitor.lineas()[-1] == "nuevo 2"
+    monitor.cerrar()
+
+
+def test_rotacion_por_copytruncate(ruta):
+    escribir(ruta, "")
+    monitor = MonitorDePrueba(ruta)
+    escribir(ruta, "una linea bastante larga\n")
+    monitor.leer_contenido_nuevo()
+    escribir(ruta, "corta\n", "wb")
+    monitor.leer_contenido_nuevo()
+    assert monitor.lineas() == ["una linea bastante larga", "corta"]
+    monitor.cerrar()
+
+
+def test_archivo_borrado_y_recreado(ruta):
+    escribir(ruta, "")
+    monitor = MonitorDePrueba(ruta)
+    os.remove(ruta)
+    monitor.leer_contenido_nuevo()
+    escribir(ruta, "otra vez\n")
+    monitor.leer_contenido_nuevo()
+    assert monitor.lineas() == ["otra vez"]
+    monitor.cerrar()
+
+
+def test_rafaga_de_eventos_en_pocas_lecturas(ruta):
+    from watchdog.events import FileModifiedEvent
+
+    escribir(ruta, "")
+    monitor = MonitorDePrueba(ruta, latencia_maxima=0.2)
+    lecturas = []
+    original = monitor._leer_contenido_nuevo
+    monitor._leer_contenido_nuevo = lambda: (lecturas.append(1), original())
+    monitor.iniciar_lector()
+    for i in range(200):
+        escribir(ruta, f"linea {i}\n")
+        monitor.on_modified(FileModifiedEvent(ruta))
+    monitor.detener_lector()
+    assert monitor.lineas() == [f"linea {i}" for i in range(200)]
+    # Un evento por escritura, pero las lecturas se agrupan por latencia_maxima
+    assert len(lecturas) <= 5
+    monitor.cerrar()
+
+
+def test_eventos_de_otros_archivos_se_ignoran(ruta, tmp_path):
+    from watchdog.events import FileModifiedEvent
+
+    escribir(ruta, "")
+    monitor = MonitorDePrueba(ruta)
+    escribir(ruta, "nueva\n")
+    monitor.on_modified(FileModifiedEvent(str(tmp_path / "otro.log")))
+    assert monitor.lineas() == []
+    # Sin hilo lector, el evento se atiende en el momento
+    monitor.on_modified(FileModifiedEvent(ruta))
+    assert monitor.lineas() == ["nueva"]
+    monitor.cerrar()
+
+
+def test_varios_archivos_con_un_solo_lector(tmp_path, capsys):
+    from watchdog.events import FileModifiedEvent, FileMovedEvent
+    from utils.file_utils import MonitorMultiplesLogs
+
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    api = str(tmp_path / "a" / "api.log")
+    worker = str(tmp_path / "b" / "worker.log")
+    escribir(api, "")
+    escribir(worker, "")
+    # El mismo archivo con dos etiquetas se sigue una sola vez
+    multi = MonitorMultiplesLogs({"api": api, "worker": worker, "repetido": api})
+    assert len(multi.colas) == 2
+    assert multi.directorios() == sorted([str(tmp_path / "a"), str(tmp_path / "b")])
+
+    escribir(api, "hola api\n")
+    escribir(worker, "hola worker\n")
+    multi.on_any_event(FileModifiedEvent(api))
+    multi.leer_pendientes()
+    salida = capsys.readouterr().out
+    assert "[api] hola api" in salida
+    assert "hola worker" not in salida  # Sin evento no se lee
+
+    multi.on_any_event(FileModifiedEvent(str(tmp_path / "b" / "otro.log")))
+    multi.on_any_event(FileModifiedEvent(worker))
+    multi.leer_pendientes()
+    assert "[worker] hola worker" in capsys.readouterr().out
+
+    # Un archivo renombrado hacia uno de los logs marca el destino
+    temporal = str(tmp_path / "b" / "worker.log.tmp")
+    escribir(temporal, "rotado\n")
+    os.replace(temporal, worker)
+    multi.on_any_event(FileMovedEvent(temporal, worker))
+    multi.leer_pendientes()
+    assert "[worker] rotado" in capsys.readouterr().out
+    multi.cerrar()
@@ -0,0 +1,85 @@
+import bz2
+import gzip
+import lzma
+import os
+
+import pytest
+
+from plugins.runtime import RuntimeMonitor
+from utils.historial_logs import (analizar_historial, leer_bloques_comprimido, nombre_log_base,
+                                  segmentos_historial)
+
+from test_analisis_paralelo import esperado, generar_lineas
+
+
+def escribir_segmento(ruta, lineas):
+    datos = ("\n".join(lineas) + "\n").encode("utf-8")
+    abrir = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}.get(os.path.splitext(str(ruta))[1], open)
+    with abrir(ruta, "wb") as f:
+        f.write(datos)
+
+
+@pytest.mark.parametrize("nombre, base", [
+    ("app.log", "app.log"),
+    ("app.log.2.gz", "app.log"),
+    ("app.log-20240101.bz2", "app.log"),
+    ("app.logger", None),
+    ("notas.txt", None),
+])
+def test_nombre_log_base(nombre, base):
+    assert nombre_log_base(nombre) == base
+
+
+def test_segmentos_por_indice(tmp_path):
+    for nombre in ("app.log", "app.log.1", "app.log.2.gz", "app.log.10.xz", "otro.log.1", "app.log.bak.txt"):
+        (tmp_path / nombre).write_bytes(b"")
+    segmentos = [os.path.basename(ruta) for ruta in segmentos_historial(str(tmp_path / "app.log"))]
+    assert segmentos == ["app.log.10.xz", "app.log.2.gz", "app.log.1", "app.log"]
+
+
+def test_segmentos_por_fecha_de_modificacion(tmp_path):
+    for i, nombre in enumerate(("app.log-20240103", "app.log-20240101.gz", "app.log.1")):
+        ruta = tmp_path / nombre
+        ruta.write_bytes(b"")
+        os.utime(ruta, (1000 + i, 1000 + i))
+    segmentos = [os.path.basename(ruta) for ruta in segmentos_historial(str(tmp_path / "app.log"))]
+    # Sin log vivo no hay nada que poner al final
+    assert segmentos == ["app.log-20240103", "app.log-20240101.gz", "app.log.1"]
+
+
+def test_bloques_comprimidos(tmp_path):
+    ruta = tmp_path / "app.log.1.gz"
+    datos = os.urandom(1000)
+    with gzip.open(ruta, "wb") as f:
+        f.write(datos)
+    bloques = list(leer_bloques_comprimido(str(ruta), tamano_bloque=64))
+    assert b"".join(bloques) == datos
+    assert max(len(bloque) for bloque in bloques) <= 64
+
+    # Dejar de consumir a mitad de camino no deja el hilo colgado
+    for _ in leer_bloques_comprimido(str(ruta), tamano_bloque=16):
+        break
+
+
+def test_error_de_descompresion(tmp_path):
+    ruta = tmp_path / "app.log.1.gz"
+    ruta.write_bytes(b"esto no es gzip")
+    with pytest.raises(OSError):
+        list(leer_bloques_comprimido(str(ruta)))
+
+
+def test_historial_igual_que_un_solo_archivo(tmp_path):
+    lineas = generar_lineas(800)
+    partes = {"app.log.3.xz": lineas[:150], "app.log.2.gz": lineas[150:400],
+              "app.log.1.bz2": lineas[400:500], "app.log.0": lineas[500:700], "app.log": lineas[700:]}
+    for nombre, contenido in partes.items():
+        escribir_segmento(tmp_path / nombre, contenido)
+
+    reporte = analizar_historial(str(tmp_path / "app.log"), "runtime", procesos=1)
+    conteo, primera, ultima = esperado(lineas)
+    assert [os.path.basename(ruta) for ruta in reporte["segmentos"]] == list(partes)
+    assert reporte["lineas"] == len(lineas)
+    assert reporte["conteo"] == conteo
+    assert (reporte["primera_critica"], reporte["ultima_critica"]) == (primera, ultima)
+    assert reporte["estado"] == RuntimeMonitor().evaluar_salud_servicio(lineas[-RuntimeMonitor.VENTANA_SALUD:])
+    assert reporte["bytes"] == sum(os.path.getsize(ruta) for ruta in reporte["segmentos"])
@@ -0,0 +1,123 @@
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+from plugins.runtime import RuntimeMonitor
+from utils.indice_tiempos import (IndiceTiempos, analizar_intervalo, lineas_en_intervalo, parsear_fecha,
+                                  ruta_indice)
+from utils.timestamps import epoch_ms
+
+INICIO = int(datetime(2024, 7, 14, 14, tzinfo=timezone.utc).timestamp()) * 1000
+
+
+def generar_lineas(desde, cantidad):
+    """Una línea por segundo; algunas llevan una traza sin fecha detrás"""
+    lineas = []
+    for i in range(desde, desde + cantidad):
+        instante = datetime.fromtimestamp(INICIO / 1000 + i, tz=timezone.utc)
+        nivel = "ERROR Out of memory" if i % 13 == 0 else f"INFO petición {i}"
+        lineas.append(f"{instante:%Y-%m-%d %H:%M:%S} {nivel}")
+        if i % 7 == 0:
+            lineas.append(f"    at worker.py línea {i}")
+    return lineas
+
+
+def escribir(ruta, lineas, modo="a"):
+    with open(ruta, modo, encoding="utf-8", newline="") as f:
+        f.write("".join(linea + "\n" for linea in lineas))
+
+
+def en_intervalo(lineas, desde_ms, hasta_ms):
+    """Filtrado línea por línea, sin índice"""
+    seleccion, dentro = [], False
+    for linea in lineas:
+        ms = epoch_ms(linea)
+        if ms is not None:
+            dentro = desde_ms <= ms < hasta_ms
+        if dentro:
+            seleccion.append(linea)
+    return seleccion
+
+
+@pytest.fixture
+def log(tmp_path):
+    ruta = str(tmp_path / "app.log")
+    lineas = generar_lineas(0, 1200)
+    escribir(ruta, lineas, "w")
+    return ruta, lineas
+
+
+def test_parsear_fecha():
+    assert parsear_fecha("2024-07-14 14:00") == INICIO
+    assert parsear_fecha(" 2024-07-14 14:00:30 ") == INICIO + 30000
+    assert parsear_fecha("14:00") is None
+
+
+def test_indice_se_guarda_y_se_carga(log):
+    ruta, _ = log
+    indice = IndiceTiempos(ruta, intervalo=512)
+    assert indice.actualizar() > 10
+    assert os.path.exists(ruta_indice(ruta))
+    assert list(indice.offsets) == sorted(indice.offsets)
+
+    cargado = IndiceTiempos(ruta, intervalo=512)
+    assert (cargado.tiempos, cargado.offsets) == (indice.tiempos, indice.offsets)
+    assert cargado.actualizar() == 0
+    # Con otro intervalo el índice guardado no sirve
+    assert len(IndiceTiempos(ruta, intervalo=1024).offsets) == 0
+
+
+def test_crecer_agrega_entradas_sin_reconstruir(log):
+    ruta, _ = log
+    indice = IndiceTiempos(ruta, intervalo=512)
+    indice.actualizar()
+    anteriores = list(indice.offsets)
+    escribir(ruta, generar_lineas(1200, 600))
+    assert indice.actualizar() > 0
+    assert list(indice.offsets[:len(anteriores)]) == anteriores
+
+    # Lo agregado al archivo del índice es lo mismo que indexar todo de cero
+    os.remove(ruta_indice(ruta))
+    desde_cero = IndiceTiempos(ruta, intervalo=512)
+    desde_cero.actualizar()
+    assert IndiceTiempos(ruta, intervalo=512).offsets == desde_cero.offsets
+
+
+def test_rotacion_reconstruye(log, tmp_path):
+    ruta, _ = log
+    indice = IndiceTiempos(ruta, intervalo=512)
+    indice.actualizar()
+    nuevo = str(tmp_path / "nuevo.log")
+    escribir(nuevo, generar_lineas(5000, 100), "w")
+    os.replace(nuevo, ruta)
+    indice.actualizar()
+    assert indice.tiempos[0] == INICIO + 5000 * 1000
+    assert IndiceTiempos(ruta, intervalo=512).offsets == indice.offsets
+
+
+@pytest.mark.parametrize("desde, hasta", [(0, 60), (100, 101), (333, 777), (1100, 5000), (-50, 10), (2000, 3000)])
+def test_intervalo_igual_que_linea_por_linea(log, desde, hasta):
+    ruta, lineas = log
+    desde_ms, hasta_ms = INICIO + desde * 1000, INICIO + hasta * 1000
+    indice = IndiceTiempos(ruta, intervalo=512)
+    indice.actualizar()
+    leidas = [linea for lote in lineas_en_intervalo(ruta, desde_ms, hasta_ms, indice) for linea in lote]
+    assert leidas == en_intervalo(lineas, desde_ms, hasta_ms)
+
+    inicio, fin = indice.rango_bytes(desde_ms, hasta_ms)
+    if 0 < desde and hasta < 1100:
+        # Solo se lee el tramo del intervalo, no el archivo entero
+        assert fin is not None and fin - inicio < os.path.getsize(ruta) / 2
+
+
+def test_analizar_intervalo(log):
+    ruta, lineas = log
+    desde_ms, hasta_ms = INICIO + 200 * 1000, INICIO + 500 * 1000
+    seleccion = en_intervalo(lineas, desde_ms, hasta_ms)
+    reporte = analizar_intervalo(ruta, "runtime", desde_ms, hasta_ms)
+    monitor = RuntimeMonitor()
+    assert reporte["lineas"] == len(seleccion)
+    assert reporte["conteo"]["CRITICAL"] == sum(
+        monitor.analizar_patron_log(linea)["nivel"] == "CRITICAL" for linea in seleccion)
+    assert reporte["estado"] == monitor.evaluar_salud_servicio(seleccion[-RuntimeMonitor.VENTANA_SALUD:])
@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+pytest.importorskip("kubernetes")
+
+from utils import k8s_selector  # noqa: E402
+from utils.k8s_selector import get_k8s_logs_por_selector, stream_k8s_logs_por_selector  # noqa: E402
+
+
+@pytest.fixture
+def replicas(api_k8s):
+    antes = time.time() - 60
+    for pod in ("web-1", "web-2"):
+        api_k8s.agregar_pod(pod, contenedores=("app", "sidecar"))
+        for contenedor in ("app", "sidecar"):
+            for i in range(5):
+                api_k8s.escribir(pod, contenedor, f"{pod}-{contenedor}-{i}", antes + i)
+    api_k8s.agregar_pod("web-0", fase="Pending")
+    return api_k8s
+
+
+def _leer(stream, cantidad, timeout=5):
+    lineas = []
+    limite = time.time() + timeout
+    while len(lineas) < cantidad and time.time() < limite:
+        lineas.append(next(stream))
+    return lineas
+
+
+def test_consulta_de_todas_las_replicas(replicas):
+    logs = get_k8s_logs_por_selector("ns", "app=web", tail=2)
+    lineas = logs.splitlines()
+    assert len(lineas) == 8
+    assert "[web-1/app] web-1-app-4" in lineas
+    assert "[web-2/sidecar] web-2-sidecar-3" in lineas
+    assert "web-0" not in logs
+
+
+def test_stream_desde_no_repite_lo_anterior(replicas, monkeypatch):
+    monkeypatch.setattr(k8s_selector, "ESPERA_RECONEXION", 0.2)
+    desde = time.time() - 1
+    replicas.escribir("web-2", "app", "despues del reinicio")
+    stream = stream_k8s_logs_por_selector("ns", "app=web", desde=desde)
+    try:
+        assert _leer(stream, 1) == ["[web-2/app] despues del reinicio\n"]
+    finally:
+        stream.close()
+    seguimientos = [parametros for metodo, ruta, parametros in replicas.pedidos
+                    if ruta.endswith("/log") and parametros.get("follow") == ["true"]]
+    assert seguimientos
+    assert all("sinceSeconds" in parametros and "tailLines" not in parametros for parametros in seguimientos)
+
+
+def test_stream_sin_desde_empieza_por_la_cola(replicas, monkeypatch):
+    monkeypatch.setattr(k8s_selector, "ESPERA_RECONEXION", 0.2)
+    stream = stream_k8s_logs_por_selector("ns", "app=web", tail=1)
+    try:
+        lineas = sorted(_leer(stream, 4))
+    finally:
+        stream.close()
+    assert lineas == sorted(f"[{pod}/{contenedor}] {pod}-{contenedor}-4\n"
+                            for pod in ("web-1", "web-2") for contenedor in ("app", "sidecar"))
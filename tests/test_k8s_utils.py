@@ -0,0 +1,64 @@
+import threading
+
+import pytest
+
+pytest.importorskip("kubernetes")
+
+from utils import k8s_utils  # noqa: E402
+from utils.k8s_utils import (POOL_CONEXIONES, descartar_api, get_k8s_pod_logs, obtener_api,  # noqa: E402
+                             stream_k8s_pod_logs)
+
+
+@pytest.fixture
+def pod(api_k8s):
+    api_k8s.agregar_pod("web-1")
+    for i in range(5):
+        api_k8s.escribir("web-1", "app", f"linea {i}")
+    return api_k8s
+
+
+def test_cliente_compartido(api_k8s):
+    clientes = []
+    hilos = [threading.Thread(target=lambda: clientes.append(obtener_api())) for _ in range(8)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    # Todos los hilos comparten un solo cliente con su pool de conexiones
+    assert all(cliente is clientes[0] for cliente in clientes)
+    configuracion = clientes[0].api_client.configuration
+    assert configuracion.host == api_k8s.host
+    assert configuracion.connection_pool_maxsize == POOL_CONEXIONES
+
+    descartar_api()
+    assert obtener_api() is not clientes[0]
+
+
+def test_host_explicito(api_k8s, monkeypatch):
+    monkeypatch.delenv(k8s_utils.VARIABLE_HOST)
+    descartar_api()
+    assert obtener_api(api_k8s.host).api_client.configuration.host == api_k8s.host
+
+
+def test_logs_de_un_pod(pod, monkeypatch):
+    cargas = []
+    cargar = k8s_utils._cargar_configuracion
+    monkeypatch.setattr(k8s_utils, "_cargar_configuracion", lambda *args: (cargas.append(args), cargar(*args))[1])
+    assert get_k8s_pod_logs("web-1", "ns", tail=2) == "linea 3\nlinea 4\n"
+    assert get_k8s_pod_logs("web-1", "ns", tail=2) == "linea 3\nlinea 4\n"
+    assert "no encontrado" in get_k8s_pod_logs("web-9", "ns")
+    assert "".join(stream_k8s_pod_logs("web-1", "ns")) == "".join(f"linea {i}\n" for i in range(5))
+    # Las llamadas reutilizan el cliente: la configuración se cargó una sola vez
+    assert len(cargas) == 1
+
+
+def test_no_autorizado_descarta_el_cliente(pod):
+    cliente = obtener_api()
+    pod.no_autorizado = True
+    assert get_k8s_pod_logs("web-1", "ns").startswith("[ERROR] Error de API Kubernetes")
+    assert k8s_utils._api is None
+
+    # Con credenciales válidas otra vez, la próxima llamada crea un cliente nuevo
+    pod.no_autorizado = False
+    assert get_k8s_pod_logs("web-1", "ns", tail=1) == "linea 4\n"
+    assert obtener_api() is not cliente
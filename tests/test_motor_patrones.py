@@ -0,0 +1,126 @@
+import re
+
+import pytest
+
+from utils.motor_patrones import MotorPatrones, PrefiltroLiterales, extraer_literal_obligatorio
+
+CRITICOS = [r"OUT.*OF.*MEMORY", r"HTTP.*5\d\d", r"GPS.*SIGNAL.*LOST", r"DEADLOCK\s+DETECTED"]
+WARNINGS = [r"MEMORY.*USAGE.*HIGH", r"HTTP.*4\d\d", r"BATTERY.*LOW"]
+
+LINEAS = [
+    "2024-01-01 10:00:00 INFO todo bien",
+    "2024-01-01 10:00:01 ERROR Out of memory en el worker",
+    "GET /api HTTP/1.1 503",
+    "GET /api HTTP/1.1 404",
+    "memory usage high: 9000MB",
+    "gps signal lost",
+    "Deadlock   detected",
+    "deadlockdetected",
+    "battery is low",
+    "Kelvin K no ASCII OUT OF MEMORY",
+    "",
+]
+
+
+@pytest.mark.parametrize("patron, literal", [
+    (r"OUT.*OF.*MEMORY", "MEMORY"),
+    (r"HTTP.*5\d\d", "HTTP"),
+    (r"GPS.*SIGNAL.*LOST", "SIGNAL"),
+    (r"ERROR|FATAL", None),
+    (r"(?i)panic", None),
+    (r"colou?r", "COLO"),
+    (r"\.ERROR", ".ERROR"),
+])
+def test_literal_obligatorio(patron, literal):
+    assert extraer_literal_obligatorio(patron) == literal
+
+
+@pytest.mark.parametrize("patron", [r"\x41BC", r"caf\u00e9", r"\N{LATIN SMALL LETTER E WITH ACUTE}x", r"A\tB",
+                                    r"FOO\0101BAR", r"FOO\12BAR", r"(\w+) \1 FAIL"])
+def test_escapes_alfanumericos_sin_prefiltro(patron):
+    # El literal que representan no es el texto del escape
+    assert extraer_literal_obligatorio(patron) is None
+
+
+@pytest.mark.parametrize("patron", CRITICOS + WARNINGS + [r"colou?r", r"\.ERROR", r"A[0-9]+B"])
+def test_literal_aparece_en_toda_coincidencia(patron):
+    literal = extraer_literal_obligatorio(patron)
+    for linea in LINEAS + ["color", "colour", "x.error", "a12b"]:
+        if re.search(patron, linea, re.IGNORECASE) and linea.isascii():
+            assert literal is None or literal in linea.upper()
+
+
+def test_prefiltro_sin_literales_es_none():
+    assert PrefiltroLiterales.desde_patrones([r"OUT.*OF.*MEMORY", r"ERROR|FATAL"]) is None
+
+
+@pytest.mark.parametrize("linea", LINEAS)
+def test_clasificar_igual_que_re_search(linea):
+    motor = MotorPatrones(CRITICOS, WARNINGS)
+    esperado = (None, None)
+    for nivel, patrones in (("CRITICAL", CRITICOS), ("WARNING", WARNINGS)):
+        coincidencias = [p for p in patrones if re.search(p, linea, re.IGNORECASE)]
+        if coincidencias:
+            esperado = (nivel, coincidencias[0])
+            break
+    assert motor.clasificar(linea) == esperado
+    assert motor.es_critico(linea) == (esperado[0] == "CRITICAL")
+
+
+def test_patrones_con_escapes_no_descartan_lineas():
+    motor = MotorPatrones([r"\x41LARMA"], [])
+    assert motor.clasificar("ALARMA en el sensor") == ("CRITICAL", r"\x41LARMA")
+
+
+def test_sin_patrones():
+    motor = MotorPatrones([], [])
+    assert motor.clasificar("OUT OF MEMORY") == (None, None)
+    assert motor.patrones_bytes() == (None, None)
+
+
+def test_patrones_bytes_encuentran_lo_mismo():
+    motor = MotorPatrones(CRITICOS, WARNINGS)
+    literales, completa = motor.patrones_bytes()
+    for linea in LINEAS:
+        if linea.isascii():
+            assert (completa.search(linea.encode()) is not None) == (motor.clasificar(linea)[0] is not None)
+            if motor.clasificar(linea)[0] is not None:
+                assert any(literal in linea.upper().encode() for literal in literales)
+
+
+def test_patrones_no_combinables_se_buscan_uno_a_uno():
+    motor = MotorPatrones([r"(?i)GPS.*LOST", r"(\w+) \1 FAIL"], [r"BATTERY.*LOW"])
+    assert not motor.combinable
+    assert motor.clasificar("gps signal lost") == ("CRITICAL", r"(?i)GPS.*LOST")
+    assert motor.clasificar("disk disk FAIL") == ("CRITICAL", r"(\w+) \1 FAIL")
+    assert motor.clasificar("disk net FAIL") == (None, None)
+    assert motor.clasificar("battery low") == ("WARNING", r"BATTERY.*LOW")
+
+
+def test_mismo_grupo_con_nombre_en_dos_patrones():
+    motor = MotorPatrones([r"(?P<n>GPS) LOST", r"(?P<n>NAV) ERROR"], [])
+    assert motor.clasificar("NAV ERROR") == ("CRITICAL", r"(?P<n>NAV) ERROR")
+
+
+def test_patron_invalido_error_claro():
+    with pytest.raises(ValueError, match=r"GPS\(LOST"):
+        MotorPatrones([r"GPS(LOST"], [])
+
+
+def test_avionics_con_patrones_de_configuracion(monkeypatch):
+    import utils.yaml_config
+    from plugins.avionics import AvionicsMonitor
+
+    monkeypatch.setattr(utils.yaml_config, "get_config_for_plugin", lambda nombre: {
+        "errores_criticos": [r"(?i)GPS.*LOST", r"(\w+) \1 FAIL"],
+    })
+    monitor = AvionicsMonitor()
+    assert monitor.detectar_error_critico("GPS signal lost")
+    assert monitor.detectar_error_critico("nav nav FAIL")
+    assert not monitor.detectar_error_critico("todo bien")
+
+
+def test_escape_octal_sigue_coincidiendo():
+    motor = MotorPatrones([r"FOO\101BAR"], [])
+    assert motor.prefiltro is None
+    assert motor.clasificar("xx FOOABAR") == ("CRITICAL", r"FOO\101BAR")
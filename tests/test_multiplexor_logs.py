@@ -0,0 +1,99 @@
+"""
+El multiplexor solo existe en health-monitor-main, cuyo paquete utils se llama
+igual que el de la raíz: lo cargamos desde su archivo (solo usa la biblioteca
+estándar).
+"""
+import importlib.util
+import os
+import threading
+import time
+
+import pytest
+
+_RUTA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                     "health-monitor-main", "utils", "multiplexor_logs.py")
+_spec = importlib.util.spec_from_file_location("multiplexor_logs", _RUTA)
+multiplexor_logs = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(multiplexor_logs)
+MultiplexorLogs = multiplexor_logs.MultiplexorLogs
+
+
+def recoger(multiplexor, cantidad, limite=5.0):
+    lineas = []
+    fin = time.time() + limite
+    while len(lineas) < cantidad and time.time() < fin:
+        lineas.extend(multiplexor.siguiente_lote(timeout=0.1))
+    return lineas
+
+
+@pytest.fixture
+def multiplexor():
+    multiplexor = MultiplexorLogs(espera_reconexion=60)
+    yield multiplexor
+    multiplexor.detener()
+
+
+def test_fragmentos_a_lineas(multiplexor):
+    multiplexor.seguir("api", lambda: iter(["uno\r\ndo", "s\n", "tr", "es\ncuatro"]))
+    lineas = recoger(multiplexor, 4)
+    assert lineas == [("api", "uno"), ("api", "dos"), ("api", "tres"), ("api", "cuatro")]
+
+
+def test_varios_servicios_a_la_vez(multiplexor):
+    # Cada stream espera al otro: solo avanzan si se leen en paralelo
+    turno_api, turno_worker = threading.Event(), threading.Event()
+
+    def stream(nombre, propio, ajeno):
+        for i in range(3):
+            yield f"{nombre} {i}\n"
+            ajeno.set()
+            propio.wait(2)
+            propio.clear()
+
+    multiplexor.seguir("api", lambda: stream("api", turno_api, turno_worker))
+    multiplexor.seguir("worker", lambda: stream("worker", turno_worker, turno_api))
+    assert multiplexor.siguiendo() == ["api", "worker"]
+    lineas = recoger(multiplexor, 6)
+    for nombre in ("api", "worker"):
+        assert [linea for origen, linea in lineas if origen == nombre] == [f"{nombre} {i}" for i in range(3)]
+
+
+def test_reconexion_cuando_el_stream_termina(multiplexor):
+    multiplexor.espera_reconexion = 0.05
+    aperturas = []
+
+    def abrir():
+        aperturas.append(time.time())
+        if len(aperturas) == 2:
+            raise ConnectionError("corte")
+        return iter([f"apertura {len(aperturas)}\n"])
+
+    multiplexor.seguir("api", abrir)
+    lineas = recoger(multiplexor, 2)
+    assert lineas[:2] == [("api", "apertura 1"), ("api", "apertura 3")]
+    assert aperturas[1] - aperturas[0] >= 0.05
+
+
+def test_lineas_de_un_lector_viejo_se_descartan():
+    multiplexor = MultiplexorLogs(espera_reconexion=60)
+    multiplexor.seguir("api", lambda: iter(["vieja 1\nvieja 2\n"]))
+    while multiplexor.cola.qsize() < 2:
+        time.sleep(0.01)
+    # El mismo nombre pasa a ser otro contenedor con líneas viejas todavía en la cola
+    multiplexor.dejar_de_seguir("api")
+    multiplexor.seguir("api", lambda: iter(["nueva\n"]))
+    assert recoger(multiplexor, 1) == [("api", "nueva")]
+    assert multiplexor.siguiente_lote(timeout=0.1) == []
+    multiplexor.detener()
+
+
+def test_cola_llena_frena_al_lector():
+    multiplexor = MultiplexorLogs(tamano_cola=5, espera_reconexion=60)
+    multiplexor.seguir("api", lambda: (f"linea {i}\n" for i in range(50)))
+    time.sleep(0.2)
+    assert multiplexor.cola.qsize() == 5
+    lineas = multiplexor.siguiente_lote(maximo=3)
+    assert len(lineas) == 3
+    lineas.extend(recoger(multiplexor, 47))
+    assert [linea for _, linea in lineas] == [f"linea {i}" for i in range(50)]
+    multiplexor.detener()
@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+from plugins.registro import RegistroPlugins, nombre_clase
+from plugins.runtime import RuntimeMonitor
+
+
+@pytest.fixture
+def config_yaml(tmp_path):
+    return tmp_path / "config.yaml"
+
+
+def escribir_config(ruta, texto, mtime):
+    ruta.write_text(texto, encoding="utf-8")
+    # La recarga depende de la fecha de modificación: la fijamos a mano
+    os.utime(ruta, (mtime, mtime))
+
+
+def test_nombre_clase():
+    assert nombre_clase("asset_api") == "AssetApiMonitor"
+    assert nombre_clase("runtime") == "RuntimeMonitor"
+
+
+def test_descubre_los_plugins(config_yaml):
+    nombres = RegistroPlugins(str(config_yaml)).nombres()
+    assert {"avionics", "asset_api", "runtime"} <= set(nombres)
+    assert "registro" not in nombres
+
+
+def test_reutiliza_instancias(config_yaml):
+    registro = RegistroPlugins(str(config_yaml))
+    monitor = registro.obtener("runtime")
+    assert isinstance(monitor, RuntimeMonitor)
+    assert registro.obtener("runtime") is monitor
+    assert registro.obtener("runtime", {}) is monitor
+
+
+def test_opciones_distintas_instancias_distintas(config_yaml):
+    registro = RegistroPlugins(str(config_yaml))
+    normal = registro.obtener("runtime")
+    propio = registro.obtener("runtime", {"errores_criticos": [r"FALLO\s+PROPIO"]})
+    assert propio is not normal
+    assert registro.obtener("runtime", {"errores_criticos": [r"FALLO\s+PROPIO"]}) is propio
+    # Las opciones de patrones se compilan en el motor del monitor
+    assert propio.analizar_patron_log("un fallo   propio")["nivel"] == "CRITICAL"
+    assert normal.analizar_patron_log("un fallo   propio")["nivel"] != "CRITICAL"
+
+
+def test_plugin_desconocido(config_yaml, capsys):
+    registro = RegistroPlugins(str(config_yaml))
+    assert registro.obtener("no_existe") is None
+    assert "Plugin desconocido" in capsys.readouterr().out
+
+
+def test_plugins_de_config_y_recarga(config_yaml):
+    escribir_config(config_yaml, 'plugins:\n  mi_servicio: "plugins.runtime:RuntimeMonitor"\n', 1_000_000)
+    registro = RegistroPlugins(str(config_yaml))
+    monitor = registro.obtener("mi_servicio")
+    assert isinstance(monitor, RuntimeMonitor)
+    assert not registro.recargar_si_cambio()
+    assert registro.obtener("mi_servicio") is monitor
+
+    escribir_config(config_yaml, 'plugins:\n  otro: "plugins.runtime:RuntimeMonitor"\n', 2_000_000)
+    assert registro.recargar_si_cambio()
+    assert "mi_servicio" not in registro.nombres()
+    nuevo = registro.obtener("otro")
+    assert nuevo is not None and nuevo is not monitor
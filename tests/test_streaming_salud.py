@@ -0,0 +1,98 @@
+"""
+Etapa de análisis del modo streaming de health-monitor-main. Su main.py
+importa su propio paquete utils, que se llama igual que el de la raíz, así
+que se ejecuta en un proceso aparte con health-monitor-main en sys.path y los
+streams y reinicios de Docker reemplazados por unos falsos.
+"""
+import json
+import os
+import subprocess
+import sys
+
+HEALTH_MONITOR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "health-monitor-main")
+
+CONFIG = """services:
+  - name: Runtime
+    plugin: runtime
+    source: docker
+    container_id: c1
+    max_restarts: 3
+    time_window_minutes: 60
+"""
+
+GUION = """
+import json, time
+import main
+
+main.EVALUATION_INTERVAL = 0.2
+aperturas, reinicios = [], []
+
+def stream_docker_logs(container_id, since=None):
+    aperturas.append(since)
+    if len(aperturas) == 1:
+        # Antes del reinicio: muchas líneas sanas y una ráfaga de errores críticos
+        for i in range(100):
+            yield f"INFO petición {i}\\n"
+        for i in range(30):
+            yield f"CRITICAL OUT OF MEMORY {i}\\n"
+    else:
+        for i in range(5):
+            yield f"INFO después del reinicio {i}\\n"
+    time.sleep(60)
+
+main.stream_docker_logs = stream_docker_logs
+main.restart_docker_container = lambda container_id: reinicios.append((container_id, time.time()))
+main.run_healthcheck_streaming(duration_seconds=1.5)
+print(json.dumps({"aperturas": aperturas, "reinicios": reinicios}))
+"""
+
+
+GUION_SANO = """
+import time
+import main
+
+main.EVALUATION_INTERVAL = 0.2
+
+def stream_docker_logs(container_id, since=None):
+    for i in range(500):
+        yield f"INFO petición {i}\\n"
+    time.sleep(60)
+
+main.stream_docker_logs = stream_docker_logs
+main.run_healthcheck_streaming(duration_seconds=1)
+"""
+
+
+def ejecutar(tmp_path, guion):
+    (tmp_path / "config.yaml").write_text(CONFIG, encoding="utf-8")
+    entorno = dict(os.environ, PYTHONPATH=HEALTH_MONITOR)
+    proceso = subprocess.run([sys.executable, "-c", guion], cwd=tmp_path, env=entorno,
+                             capture_output=True, text=True, timeout=60)
+    assert proceso.returncode == 0, proceso.stderr
+    return proceso.stdout
+
+
+def test_solo_se_guardan_las_ultimas_lineas(tmp_path):
+    ejecutar(tmp_path, GUION_SANO)
+    estado = json.loads((tmp_path / "state" / "health_status.json").read_text(encoding="utf-8"))
+    assert estado["Runtime"]["status"] == "healthy"
+    assert estado["Runtime"]["logs"].splitlines() == [f"INFO petición {i}" for i in range(480, 500)]
+
+
+def test_error_critico_reinicia_una_vez_y_retoma_desde_el_reinicio(tmp_path):
+    resultado = json.loads(ejecutar(tmp_path, GUION).splitlines()[-1])
+
+    # La ráfaga de errores gasta un solo reinicio (cooldown)
+    assert [container_id for container_id, _ in resultado["reinicios"]] == ["c1"]
+    momento_reinicio = resultado["reinicios"][0][1]
+    # El stream nuevo pide solo lo escrito desde el reinicio
+    assert resultado["aperturas"][0] is None
+    assert len(resultado["aperturas"]) == 2
+    assert resultado["aperturas"][1] >= momento_reinicio
+
+    estado = json.loads((tmp_path / "state" / "health_status.json").read_text(encoding="utf-8"))
+    assert estado["Runtime"]["status"] == "healthy"
+    # Solo quedan las líneas de después del reinicio
+    assert estado["Runtime"]["logs"].splitlines() == [f"INFO después del reinicio {i}" for i in range(5)]
+    historial = json.loads((tmp_path / "state" / "restart_state.json").read_text(encoding="utf-8"))
+    assert len(historial["Runtime"]) == 1 and historial["Runtime"][0] <= momento_reinicio
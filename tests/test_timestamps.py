@@ -0,0 +1,119 @@
+import re
+from datetime import datetime, timezone
+
+import pytest
+
+from utils.timestamps import (epoch_ms, epoch_ns_prefijo, extraer_timestamp, extraer_timestamp_texto, lineas_desde_cursor,
+                              parsear_en)
+
+REGEX_HISTORICA = re.compile(r"\[([\d-]+\s[\d:]+)\]")
+
+
+def ms_utc(*fecha, ms=0):
+    return int(datetime(*fecha, tzinfo=timezone.utc).timestamp()) * 1000 + ms
+
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("2024-07-14 14:00:00", ms_utc(2024, 7, 14, 14)),
+    ("2024-07-14T14:00:00Z", ms_utc(2024, 7, 14, 14)),
+    ("2024-07-14T14:00:00.5", ms_utc(2024, 7, 14, 14, ms=500)),
+    ("2024-07-14T14:00:00,123456789Z", ms_utc(2024, 7, 14, 14, ms=123)),
+    ("2024-07-14T14:00:00+02:00", ms_utc(2024, 7, 14, 12)),
+    ("2024-07-14T14:00:00-0330", ms_utc(2024, 7, 14, 17, 30)),
+    ("2024-07-14 23:59:60", ms_utc(2024, 7, 15)),
+])
+def test_parsear_en(texto, esperado):
+    assert parsear_en(texto) == esperado
+
+
+@pytest.mark.parametrize("texto", [
+    "2024-13-01 00:00:00",
+    "2024-02-30 00:00:00",
+    "2024-01-01 24:00:00",
+    "2024-01-01 1²:00:00",
+    "2024-01-01",
+    "no es una fecha",
+])
+def test_parsear_en_rechaza(texto):
+    assert parsear_en(texto) is None
+
+
+@pytest.mark.parametrize("linea", [
+    "[2024-01-01 10:00:00] INFO arranque",
+    "2024-01-01T10:00:00Z INFO iso",
+    "INFO en medio 2024-01-01 10:00:00 del texto",
+    "[2024-1-1 10:00:00] formato raro",
+    "sin fecha",
+    "",
+])
+def test_extraer_timestamp_igual_que_la_regex(linea):
+    match = REGEX_HISTORICA.search(linea)
+    assert extraer_timestamp_texto(linea) == (match.group(1) if match else None)
+    assert extraer_timestamp(linea)[0] == extraer_timestamp_texto(linea)
+
+
+def test_epoch_ms_de_linea():
+    assert epoch_ms("[2024-01-01 10:00:00] INFO") == ms_utc(2024, 1, 1, 10)
+    assert epoch_ms("INFO 2024-01-01T10:00:00Z") == ms_utc(2024, 1, 1, 10)
+    assert epoch_ms("INFO") is None
+
+
+@pytest.mark.parametrize("timestamp, esperado", [
+    ("2024-07-14T14:00:00.123456789Z", ms_utc(2024, 7, 14, 14) * 1_000_000 + 123456789),
+    ("2024-07-14T14:00:00.1Z", ms_utc(2024, 7, 14, 14) * 1_000_000 + 100_000_000),
+    ("2024-07-14T14:00:00Z", ms_utc(2024, 7, 14, 14) * 1_000_000),
+    ("2024-07-14T16:00:00.000000001+02:00", ms_utc(2024, 7, 14, 14) * 1_000_000 + 1),
+    ("basura", None),
+])
+def test_epoch_ns_prefijo(timestamp, esperado):
+    assert epoch_ns_prefijo(timestamp) == esperado
+
+
+def test_epoch_ns_prefijo_ordena_aunque_el_texto_no():
+    # Los ceros finales de la fracción se recortan: como texto "...00.5Z" > "...00.123Z"
+    assert epoch_ns_prefijo("2024-07-14T14:00:00.5Z") > epoch_ns_prefijo("2024-07-14T14:00:00.123Z")
+
+
+def prefijadas(*pares):
+    return [f"{timestamp} {texto}" for timestamp, texto in pares]
+
+
+def test_cursor_primera_consulta():
+    lineas = prefijadas(("2024-07-14T14:00:00.1Z", "a"), ("2024-07-14T14:00:00.2Z", "b"))
+    nuevas, cursor = lineas_desde_cursor(lineas, None)
+    assert nuevas == ["a", "b"]
+    assert cursor == (epoch_ns_prefijo("2024-07-14T14:00:00.2Z"), 1)
+
+
+def test_cursor_descarta_lo_ya_visto():
+    # La segunda consulta se pide "desde" el mismo segundo y repite sus líneas
+    primera = prefijadas(("2024-07-14T14:00:00.1Z", "a"), ("2024-07-14T14:00:00.2Z", "b"))
+    _, cursor = lineas_desde_cursor(primera, None)
+    segunda = primera + prefijadas(("2024-07-14T14:00:00.3Z", "c"))
+    nuevas, cursor = lineas_desde_cursor(segunda, cursor)
+    assert nuevas == ["c"]
+    assert lineas_desde_cursor(segunda, cursor)[0] == []
+
+
+def test_cursor_lineas_con_el_mismo_instante():
+    mismo = "2024-07-14T14:00:00.5Z"
+    _, cursor = lineas_desde_cursor(prefijadas((mismo, "a"), (mismo, "b")), None)
+    assert cursor == (epoch_ns_prefijo(mismo), 2)
+    # Una tercera línea con el mismo ns es nueva; las dos primeras no
+    nuevas, cursor = lineas_desde_cursor(prefijadas((mismo, "a"), (mismo, "b"), (mismo, "c")), cursor)
+    assert nuevas == ["c"]
+    assert cursor == (epoch_ns_prefijo(mismo), 3)
+
+
+def test_cursor_fraccion_recortada():
+    # ".5" es posterior a ".123" aunque como texto sea menor
+    _, cursor = lineas_desde_cursor(prefijadas(("2024-07-14T14:00:00.123Z", "a")), None)
+    nuevas, _ = lineas_desde_cursor(prefijadas(("2024-07-14T14:00:00.123Z", "a"),
+                                               ("2024-07-14T14:00:00.5Z", "b")), cursor)
+    assert nuevas == ["b"]
+
+
+def test_cursor_lineas_sin_prefijo_pasan_tal_cual():
+    nuevas, cursor = lineas_desde_cursor(["sin timestamp"], (10, 1))
+    assert nuevas == ["sin timestamp"]
+    assert cursor == (10, 1)
@@ -0,0 +1,25 @@
+import pytest
+
+from utils.ultimas_lineas import leer_ultimas_lineas
+
+CONTENIDOS = [
+    "",
+    "una sola sin salto",
+    "una\n",
+    "a\nb\nc\n",
+    "a\nb\nc",
+    "\n\n\n",
+    "a\r\nb\r\nc\r\n",
+    "".join(f"línea {i} ñandú\n" for i in range(200)),
+]
+
+
+@pytest.mark.parametrize("contenido", CONTENIDOS)
+@pytest.mark.parametrize("cantidad", [0, 1, 2, 5, 500])
+@pytest.mark.parametrize("tamano_bloque", [1, 7, 64 * 1024])
+def test_igual_que_readlines(tmp_path, contenido, cantidad, tamano_bloque):
+    ruta = tmp_path / "app.log"
+    ruta.write_bytes(contenido.encode("utf-8"))
+    with open(ruta, encoding="utf-8") as f:
+        esperado = f.readlines()[-cantidad:] if cantidad > 0 else []
+    assert leer_ultimas_lineas(str(ruta), cantidad, tamano_bloque=tamano_bloque) == esperado
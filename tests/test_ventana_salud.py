@@ -0,0 +1,139 @@
+import random
+
+import pytest
+
+from plugins.assetapi import AssetAPIMonitor
+from plugins.avionics import AvionicsMonitor
+from plugins.runtime import RuntimeMonitor
+from utils.ventana_salud import EvaluadorSalud, parsear_duracion, peor_estado
+
+LINEAS = [
+    "[2024-01-01 10:00:00] CRITICAL OUT OF MEMORY",
+    "[2024-01-01 10:00:00] WARNING MEMORY USAGE HIGH 9000MB",
+    "[2024-01-01 10:00:00] MEMORY USAGE HIGH 100MB",
+    "GET /api HTTP/1.1 500",
+    "GET /api HTTP/1.1 200",
+    "GPS OK",
+    "GPS SIGNAL LOST",
+    "BATTERY LOW",
+    "INFO todo bien",
+]
+
+
+@pytest.fixture(params=[RuntimeMonitor, AssetAPIMonitor, AvionicsMonitor])
+def monitor(request):
+    return request.param()
+
+
+def test_incremental_igual_que_evaluar_salud_servicio(monitor):
+    aleatorio = random.Random(7)
+    lineas = [aleatorio.choice(LINEAS) for _ in range(300)]
+    evaluador = monitor.crear_evaluador_salud()
+    for i, linea in enumerate(lineas, 1):
+        assert evaluador.agregar(linea) == monitor.evaluar_salud_servicio(lineas[:i])
+    assert len(evaluador) == monitor.VENTANA_SALUD
+
+
+def test_agregar_lote_devuelve_el_peor_estado_del_lote(monitor):
+    aleatorio = random.Random(11)
+    lineas = [aleatorio.choice(LINEAS) for _ in range(300)]
+    por_linea = monitor.crear_evaluador_salud()
+    por_lote = monitor.crear_evaluador_salud()
+    for inicio in range(0, len(lineas), 41):
+        lote = lineas[inicio:inicio + 41]
+        peor = "OK"
+        for linea in lote:
+            peor = peor_estado(peor, por_linea.agregar(linea))
+        assert por_lote.agregar_lote(lote, monitor.analizar_lote(lote)) == peor
+        assert por_lote.contadores == por_linea.contadores
+
+
+def test_error_que_sale_de_la_ventana_dentro_del_lote():
+    monitor = RuntimeMonitor()
+    lote = [LINEAS[0]] + ["INFO todo bien"] * (monitor.VENTANA_SALUD + 5)
+    evaluador = monitor.crear_evaluador_salud()
+    assert evaluador.agregar_lote(lote, monitor.analizar_lote(lote)) == "ERROR"
+    assert evaluador.estado() == "OK"
+
+
+def test_reiniciar():
+    monitor = RuntimeMonitor()
+    evaluador = EvaluadorSalud(monitor, tamano=5)
+    evaluador.agregar(LINEAS[0])
+    evaluador.reiniciar()
+    assert evaluador.estado() == "OK" and len(evaluador) == 0
+
+
+@pytest.mark.parametrize("valor, segundos", [(90, 90), ("90s", 90), ("5m", 300), ("1h", 3600), ("1.5m", 90)])
+def test_parsear_duracion(valor, segundos):
+    assert parsear_duracion(valor) == segundos
+
+
+@pytest.mark.parametrize("valor", ["0m", -5, "m"])
+def test_parsear_duracion_invalida(valor):
+    with pytest.raises(ValueError):
+        parsear_duracion(valor)
+
+
+def memoria_alta(minuto, segundo=0):
+    return f"[2024-01-01 10:{minuto:02d}:{segundo:02d}] MEMORY USAGE HIGH 9000MB"
+
+
+def test_ventanas_por_tiempo_expiran():
+    monitor = RuntimeMonitor()
+    evaluador = monitor.crear_evaluador_temporal(["1m", "5m"], umbrales={})
+    for segundo in range(0, 60, 10):
+        evaluador.agregar(memoria_alta(0, segundo))
+    assert evaluador.estados() == {"1m": "ERROR", "5m": "ERROR"}
+    evaluador.agregar("[2024-01-01 10:02:00] INFO todo bien")
+    assert evaluador.estados() == {"1m": "OK", "5m": "ERROR"}
+    evaluador.agregar("[2024-01-01 10:06:00] INFO todo bien")
+    assert evaluador.estados() == {"1m": "OK", "5m": "OK"}
+
+
+def test_umbrales_por_ventana():
+    monitor = RuntimeMonitor()
+    evaluador = monitor.crear_evaluador_temporal(
+        ["1m", "15m"], umbrales={"15m": {"memoria_alta_error": 20, "memoria_alta_warning": 8}})
+    for minuto in range(10):
+        evaluador.agregar(memoria_alta(minuto))
+    # En el último minuto hay una sola muestra; en 15 minutos, 10
+    assert evaluador.estados() == {"1m": "OK", "15m": "WARNING"}
+
+
+def test_el_ahora_es_la_ultima_linea_y_no_el_reloj():
+    monitor = RuntimeMonitor()
+    evaluador = monitor.crear_evaluador_temporal(["1m"], umbrales={})
+    # Un log de hace años sigue evaluándose igual
+    for segundo in range(5):
+        evaluador.agregar(memoria_alta(0, segundo))
+    assert evaluador.estado() == "ERROR"
+
+
+def test_lineas_sin_fecha():
+    monitor = RuntimeMonitor()
+    evaluador = monitor.crear_evaluador_temporal(["1m"], umbrales={})
+    # Antes de la primera fecha cuentan igual, y pasan a la primera cubeta
+    evaluador.agregar("OUT OF MEMORY")
+    assert evaluador.estado() == "ERROR"
+    evaluador.agregar("[2024-01-01 10:00:00] INFO")
+    assert evaluador.resumen()["1m"]["errores_criticos"] == 1
+    evaluador.agregar("[2024-01-01 10:01:00] INFO")
+    assert evaluador.estado() == "OK"
+    # Después, una línea sin fecha cuenta en el segundo de la anterior
+    evaluador.agregar("OUT OF MEMORY")
+    evaluador.agregar("[2024-01-01 10:02:00] INFO")
+    assert evaluador.estado() == "OK"
+
+
+def test_agregar_lote_temporal_igual_que_por_linea(monitor):
+    aleatorio = random.Random(3)
+    lineas = [f"[2024-01-01 10:{i // 60:02d}:{i % 60:02d}] {aleatorio.choice(LINEAS).split('] ')[-1]}"
+              for i in range(0, 1200, 7)]
+    por_linea = monitor.crear_evaluador_temporal()
+    por_lote = monitor.crear_evaluador_temporal()
+    for linea in lineas:
+        por_linea.agregar(linea)
+    por_lote.agregar_lote(lineas, monitor.analizar_lote(lineas))
+    assert por_lote.resumen() == por_linea.resumen()
+    assert por_lote.estados() == por_linea.estados()
@@ -0,0 +1,70 @@
+"""
+Análisis de un mismo log con varios plugins a la vez.
+
+Muchos hosts escriben varios subsistemas en un único log combinado. En lugar
+de leerlo una vez por plugin, AnalizadorCompartido lo lee y decodifica una
+sola vez, separa las líneas y las pasa a mayúsculas una sola vez, y entrega
+esas mismas listas a cada monitor. Devuelve un veredicto por plugin.
+"""
+from typing import Dict, List, Optional
+
+from utils.analisis_columnar import contar_niveles
+from utils.ultimas_lineas import leer_ultimas_lineas
+
+
+def leer_lineas(ruta: str, ultimas: Optional[int] = None) -> List[str]:
+    """
+    Lee un archivo de log como lista de líneas (sin el salto de línea).
+
+    :param ruta: Archivo de log
+    :param ultimas: Quedarse solo con las últimas N líneas (None = todas)
+    """
+    if ultimas:
+        # Solo se leen y decodifican los bytes del final del archivo
+        return [linea[:-1] if linea.endswith("\n") else linea
+                for linea in leer_ultimas_lineas(ruta, ultimas, errors="replace")]
+    # Lectura y decodificación de una sola vez; los saltos \r\n llegan como \n
+    with open(ruta, "r", encoding="utf-8", errors="replace") as f:
+        lineas = f.read().split("\n")
+    if lineas and lineas[-1] == "":
+        lineas.pop()
+    return lineas
+
+
+class AnalizadorCompartido:
+    def __init__(self, monitores: Dict[str, object]):
+        """
+        :param monitores: Nombre del plugin -> monitor (con analizar_lote y
+            evaluar_salud_servicio), p. ej. los del registro de plugins
+        """
+        self.monitores = dict(monitores)
+
+    def agregar_monitor(self, nombre: str, monitor) -> None:
+        self.monitores[nombre] = monitor
+
+    def analizar_lineas(self, lineas: List[str]) -> Dict[str, Dict]:
+        """
+        Analiza las mismas líneas con todos los monitores.
+
+        :return: Por plugin: {"estado": veredicto, "conteo": líneas por nivel,
+            "lote": columnas de analizar_lote}
+        """
+        lineas_mayus = [linea.upper() for linea in lineas]
+        resultados = {}
+        for nombre, monitor in self.monitores.items():
+            lote = monitor.analizar_lote(lineas, lineas_mayus)
+            resultados[nombre] = {
+                "estado": monitor.evaluar_salud_servicio(lineas, analisis=lote),
+                "conteo": contar_niveles(lote),
+                "lote": lote
+            }
+        return resultados
+
+    def analizar_archivo(self, ruta: str, ultimas: Optional[int] = None) -> Dict[str, Dict]:
+        """
+        Lee el archivo una sola vez y lo analiza con todos los monitores.
+
+        :param ruta: Archivo de log
+        :param ultimas: Analizar solo las últimas N líneas (None = todas)
+        """
+        return self.analizar_lineas(leer_lineas(ruta, ultimas))
@@ -0,0 +1,241 @@
+"""
+Análisis completo de logs grandes repartido entre procesos.
+
+El archivo se divide en rangos de bytes alineados a saltos de línea y cada
+rango se analiza en un proceso aparte con analizar_lote del plugin. Cada
+proceso devuelve un resultado parcial pequeño (conteos, histograma por
+minuto, primera y última línea crítica, sus últimas líneas) y aquí se
+combinan en un único reporte.
+
+Uso desde consola:
+    python -m utils.analisis_paralelo /var/log/app.log runtime --procesos 32
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from utils.analisis_columnar import NIVEL_CRITICAL, NIVELES, SIN_VALOR
+
+# Por debajo de este tamaño no compensa arrancar procesos
+TAMANO_MINIMO_PARALELO = 8 * 1024 * 1024
+# Cuánto se lee de cada vez dentro de un rango
+TAMANO_BLOQUE = 4 * 1024 * 1024
+# Rangos por proceso: más de uno para que los procesos rápidos no esperen
+RANGOS_POR_PROCESO = 4
+
+# Registro de plugins de cada proceso trabajador (se crea al primer uso)
+_registro = None
+
+
+def dividir_en_rangos(ruta: str, partes: int) -> List[Tuple[int, int]]:
+    """
+    Divide el archivo en hasta `partes` rangos [inicio, fin) que empiezan
+    siempre al principio de una línea.
+    """
+    tamano = os.path.getsize(ruta)
+    if tamano == 0:
+        return []
+    cortes = [0]
+    with open(ruta, "rb") as f:
+        for i in range(1, partes):
+            objetivo = tamano * i // partes
+            if objetivo <= cortes[-1]:
+                continue
+            # Avanzamos hasta el final de la línea en la que cae el corte
+            f.seek(objetivo - 1)
+            f.readline()
+            posicion = f.tell()
+            if cortes[-1] < posicion < tamano:
+                cortes.append(posicion)
+    cortes.append(tamano)
+    return list(zip(cortes, cortes[1:]))
+
+
+def _leer_bloques_rango(ruta: str, inicio: int, fin: int, tamano_bloque: int = TAMANO_BLOQUE) -> Iterator[bytes]:
+    with open(ruta, "rb") as f:
+        f.seek(inicio)
+        restante = fin - inicio
+        while restante > 0:
+            datos = f.read(min(tamano_bloque, restante))
+            if not datos:
+                break
+            restante -= len(datos)
+            yield datos
+
+
+def lineas_de_bloques(bloques: Iterable[bytes]) -> Iterator[List[str]]:
+    """
+    Convierte bloques de bytes arbitrarios en bloques de líneas (ya
+    decodificadas, sin salto). La línea cortada al final de un bloque se
+    completa con el siguiente.
+    """
+    pendiente = b""
+    for datos in bloques:
+        datos = pendiente + datos
+        corte = datos.rfind(b"\n")
+        if corte < 0:
+            pendiente = datos
+            continue
+        pendiente = datos[corte + 1:]
+        yield _decodificar(datos[:corte])
+    if pendiente:
+        yield _decodificar(pendiente)
+
+
+def _decodificar(datos: bytes) -> List[str]:
+    lineas = datos.decode("utf-8", errors="replace").split("\n")
+    return [linea[:-1] if linea.endswith("\r") else linea for linea in lineas]
+
+
+def obtener_monitor(plugin: str):
+    global _registro
+    if _registro is None:
+        from plugins.registro import RegistroPlugins
+        _registro = RegistroPlugins()
+    monitor = _registro.obtener(plugin)
+    if monitor is None:
+        raise ValueError(f"No se pudo cargar el plugin {plugin}")
+    return monitor
+
+
+def analizar_rango(plugin: str, ruta: str, inicio: int, fin: int) -> Dict:
+    """
+    Analiza un rango del archivo. Se ejecuta en los procesos trabajadores,
+    así que recibe el nombre del plugin y no el monitor.
+
+    :return: Resultado parcial; ver combinar_parciales
+    """
+    parcial = analizar_bloques_lineas(obtener_monitor(plugin), lineas_de_bloques(_leer_bloques_rango(ruta, inicio, fin)))
+    parcial["bytes"] = fin - inicio
+    return parcial
+
+
+def analizar_bloques_lineas(monitor, bloques_lineas: Iterable[List[str]]) -> Dict:
+    """
+    Analiza bloques de líneas consecutivas con analizar_lote del monitor.
+
+    :return: Resultado parcial sin "bytes"; ver combinar_parciales
+    """
+    conteo = [0] * len(NIVELES)
+    histograma: Dict[int, List[int]] = {}
+    primera_critica = ultima_critica = None
+    cola: List[str] = []
+    lineas_previas = 0
+
+    for lineas in bloques_lineas:
+        lote = monitor.analizar_lote(lineas)
+        niveles = lote["nivel"]
+        for nivel, ms in zip(niveles, lote["timestamp_ms"]):
+            conteo[nivel] += 1
+            if ms != SIN_VALOR:
+                minuto = ms // 60000
+                cubeta = histograma.get(minuto)
+                if cubeta is None:
+                    cubeta = histograma[minuto] = [0] * len(NIVELES)
+                cubeta[nivel] += 1
+        if NIVEL_CRITICAL in niveles:
+            if primera_critica is None:
+                indice = niveles.index(NIVEL_CRITICAL)
+                primera_critica = (lineas_previas + indice, lineas[indice])
+            indice = len(niveles) - 1 - niveles[::-1].index(NIVEL_CRITICAL)
+            ultima_critica = (lineas_previas + indice, lineas[indice])
+        lineas_previas += len(lineas)
+        cola = (cola + lineas[-monitor.VENTANA_SALUD:])[-monitor.VENTANA_SALUD:]
+
+    return {
+        "lineas": lineas_previas,
+        "conteo": conteo,
+        "histograma": histograma,
+        "primera_critica": primera_critica,
+        "ultima_critica": ultima_critica,
+        "ultimas_lineas": cola
+    }
+
+
+def combinar_parciales(parciales: List[Dict], ventana: int) -> Dict:
+    """
+    Junta los resultados de los rangos (en orden de archivo) en un reporte.
+    Las líneas críticas se devuelven como (número de línea desde 1, texto).
+    """
+    reporte = {
+        "lineas": 0,
+        "bytes": 0,
+        "conteo": [0] * len(NIVELES),
+        "histograma": {},
+        "primera_critica": None,
+        "ultima_critica": None,
+        "ultimas_lineas": []
+    }
+    for parcial in parciales:
+        desplazamiento = reporte["lineas"]
+        for i, valor in enumerate(parcial["conteo"]):
+            reporte["conteo"][i] += valor
+        for minuto, cubeta in parcial["histograma"].items():
+            total = reporte["histograma"].setdefault(minuto, [0] * len(NIVELES))
+            for i, valor in enumerate(cubeta):
+                total[i] += valor
+        if parcial["primera_critica"] and reporte["primera_critica"] is None:
+            indice, linea = parcial["primera_critica"]
+            reporte["primera_critica"] = (desplazamiento + indice + 1, linea)
+        if parcial["ultima_critica"]:
+            indice, linea = parcial["ultima_critica"]
+            reporte["ultima_critica"] = (desplazamiento + indice + 1, linea)
+        reporte["ultimas_lineas"] = (reporte["ultimas_lineas"] + parcial["ultimas_lineas"])[-ventana:]
+        reporte["lineas"] += parcial["lineas"]
+        reporte["bytes"] += parcial["bytes"]
+
+    reporte["conteo"] = dict(zip(NIVELES, reporte["conteo"]))
+    reporte["histograma"] = {minuto * 60000: dict(zip(NIVELES, cubeta))
+                             for minuto, cubeta in sorted(reporte["histograma"].items())}
+    return reporte
+
+
+def parciales_archivo(ruta: str, plugin: str, procesos: Optional[int] = None) -> List[Dict]:
+    """Resultados parciales de todo el archivo, en orden, repartidos entre procesos si compensa"""
+    procesos = procesos or os.cpu_count() or 1
+    tamano = os.path.getsize(ruta)
+
+    if procesos == 1 or tamano < TAMANO_MINIMO_PARALELO:
+        return [analizar_rango(plugin, ruta, inicio, fin) for inicio, fin in dividir_en_rangos(ruta, 1)]
+    rangos = dividir_en_rangos(ruta, procesos * RANGOS_POR_PROCESO)
+    with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+        # map respeta el orden de los rangos, que es el que necesita la combinación
+        return list(ejecutor.map(analizar_rango, *zip(*((plugin, ruta, inicio, fin) for inicio, fin in rangos))))
+
+
+def analizar_archivo_paralelo(ruta: str, plugin: str, procesos: Optional[int] = None) -> Dict:
+    """
+    Analiza un archivo de log completo con el plugin indicado.
+
+    :param ruta: Archivo de log
+    :param plugin: Nombre del plugin en el registro (avionics, asset_api, runtime)
+    :param procesos: Procesos trabajadores (por defecto, uno por núcleo)
+    :return: Reporte con "lineas", "bytes", "conteo" por nivel, "histograma"
+        (ms epoch del minuto -> conteo por nivel), "primera_critica" y
+        "ultima_critica" ((número de línea, texto) o None) y "estado" (la
+        salud del servicio según las últimas líneas del archivo)
+    """
+    monitor = obtener_monitor(plugin)
+    reporte = combinar_parciales(parciales_archivo(ruta, plugin, procesos), monitor.VENTANA_SALUD)
+    reporte["estado"] = monitor.evaluar_salud_servicio(reporte.pop("ultimas_lineas"))
+    return reporte
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Análisis completo de un log en paralelo")
+    parser.add_argument("ruta", help="Archivo de log")
+    parser.add_argument("plugin", help="Plugin a usar (avionics, asset_api, runtime)")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos trabajadores (por defecto, uno por núcleo)")
+    args = parser.parse_args()
+
+    inicio = time.time()
+    reporte = analizar_archivo_paralelo(args.ruta, args.plugin, args.procesos)
+    print(f"Estado: {reporte['estado']}")
+    print(f"Líneas: {reporte['lineas']} ({reporte['bytes'] / 1024 / 1024:.1f} MB) en {time.time() - inicio:.1f}s")
+    print(f"Conteo: {reporte['conteo']}")
+    if reporte["primera_critica"]:
+        print(f"Primera crítica (línea {reporte['primera_critica'][0]}): {reporte['primera_critica'][1][:100]}")
+        print(f"Última crítica (línea {reporte['ultima_critica'][0]}): {reporte['ultima_critica'][1][:100]}")
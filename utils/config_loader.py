@@ -2,8 +2,12 @@
 Utilidades para cargar y manejar configuración de repositorios
 Versión mejorada con rutas más robustas y mejor manejo de errores
 """
+import fnmatch
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.historial_logs import nombre_log_base
 
 # Definir rutas de manera más robusta
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -83,42 +87,144 @@ def listar_repositorios_disponibles():
     
     return repositorios
 
-def detectar_logs():
+# Dónde se buscan logs si monitor_config.json no dice otra cosa
+# (configuracion_general -> deteccion_logs -> raices)
+RAICES_DETECCION = [
+    "./logs", 
+    "../logs", 
+    "./", 
+    "../",
+    "./var/log",
+    "/var/log",  # Solo en sistemas Unix
+    "./tmp"
+]
+PROFUNDIDAD_MAXIMA = 4
+EXCLUIR_DETECCION = ["*/.git", "*/node_modules", "*/__pycache__", "*/.venv", "*/venv", "/proc", "/sys"]
+HILOS_DETECCION = 8
+CACHE_DETECCION_PATH = os.path.join(BASE_DIR, "config", "cache_deteccion.json")
+
+# Directorio -> [mtime_ns, logs que contiene, subdirectorios]. Un directorio
+# solo cambia de mtime cuando se crean, borran o renombran entradas en él,
+# así que si coincide no hace falta volver a listarlo.
+_cache_directorios = None
+
+def _cargar_cache_deteccion():
+    global _cache_directorios
+    if _cache_directorios is None:
+        try:
+            with open(CACHE_DETECCION_PATH, 'r', encoding='utf-8') as f:
+                _cache_directorios = json.load(f)
+        except (OSError, ValueError):
+            _cache_directorios = {}
+    return _cache_directorios
+
+def _guardar_cache_deteccion(cache):
+    try:
+        temporal = CACHE_DETECCION_PATH + ".tmp"
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+        os.replace(temporal, CACHE_DETECCION_PATH)
+    except OSError as e:
+        print(f"Error guardando cache de detección: {e}")
+
+def _excluido(ruta, excluir):
+    return any(fnmatch.fnmatch(ruta, patron) for patron in excluir)
+
+def _explorar_directorio(directorio, cache):
+    """
+    Devuelve (logs, subdirectorios) de un directorio, usando la cache si su
+    mtime no cambió. Los logs se devuelven como nombre del log vivo.
     """
-    Detecta archivos .log en directorios comunes
-    Versión mejorada que busca en más ubicaciones
+    mtime = os.stat(directorio).st_mtime_ns
+    guardado = cache.get(directorio)
+    if guardado and guardado[0] == mtime:
+        return guardado[1], guardado[2]
+    
+    logs = set()
+    subdirectorios = []
+    with os.scandir(directorio) as entradas:
+        for entrada in entradas:
+            try:
+                # Sin seguir enlaces a directorios, para no entrar en ciclos
+                if entrada.is_dir(follow_symlinks=False):
+                    subdirectorios.append(entrada.path)
+                    continue
+            except OSError:
+                continue
+            # Los segmentos rotados (app.log.1, app.log.2.gz...) cuentan
+            # como el mismo repositorio que su log vivo (app.log)
+            nombre_log = nombre_log_base(entrada.name)
+            if nombre_log:
+                logs.add(nombre_log)
+    logs = sorted(logs)
+    cache[directorio] = [mtime, logs, subdirectorios]
+    return logs, subdirectorios
+
+def detectar_logs(raices=None, profundidad_maxima=PROFUNDIDAD_MAXIMA, excluir=None, hilos=HILOS_DETECCION):
     """
-    directorios = [
-        "./logs", 
-        "../logs", 
-        "./", 
-        "../",
-        "./var/log",
-        "/var/log",  # Solo en sistemas Unix
-        "./tmp"
-    ]
+    Detecta archivos .log (y sus segmentos rotados) recorriendo las raíces
+    recursivamente, hasta profundidad_maxima niveles por debajo de cada una.
+    Cada nivel se explora en paralelo con un pool de hilos (en discos de red
+    casi todo el tiempo se va en esperar al servidor) y los directorios que
+    no cambiaron desde la última vez salen de la cache sin listarlos.
+    
+    :param raices: Directorios donde buscar (por defecto RAICES_DETECCION)
+    :param excluir: Patrones glob de rutas a saltar (por defecto EXCLUIR_DETECCION)
+    """
+    raices = RAICES_DETECCION if raices is None else raices
+    excluir = EXCLUIR_DETECCION if excluir is None else excluir
+    cache = _cargar_cache_deteccion()
     
     repositorios_detectados = {}
+    visitados = set()
+    explorados = []
+    # (directorio, profundidad, raíz desde la que se llegó)
+    nivel = []
+    for raiz in raices:
+        if os.path.isdir(raiz):
+            nivel.append((os.path.abspath(raiz), 0, raiz))
     
-    for directorio in directorios:
-        try:
-            if os.path.exists(directorio) and os.path.isdir(directorio):
-                for archivo in os.listdir(directorio):
-                    if archivo.endswith(".log"):
-                        repo_id = archivo.replace(".log", "")
-                        ruta_completa = os.path.abspath(os.path.join(directorio, archivo))
-                        repositorios_detectados[repo_id] = {
-                            "nombre": f"Auto: {repo_id}",
-                            "ruta_logs": ruta_completa,
-                            "descripcion": f"Detectado automáticamente en {directorio}"
-                        }
-        except PermissionError:
-            # Saltamos directorios sin permisos
-            continue
-        except Exception as e:
-            print(f"Error explorando directorio {directorio}: {e}")
-            continue
+    with ThreadPoolExecutor(max_workers=hilos) as ejecutor:
+        while nivel:
+            # Las raíces se solapan ("./" contiene a "./logs"): cada directorio se explora una vez
+            pendientes = []
+            for directorio, profundidad, raiz in nivel:
+                real = os.path.realpath(directorio)
+                if real not in visitados and not _excluido(directorio, excluir):
+                    visitados.add(real)
+                    explorados.append(directorio)
+                    pendientes.append((directorio, profundidad, raiz))
+            
+            futuros = [(ejecutor.submit(_explorar_directorio, directorio, cache), directorio, profundidad, raiz)
+                       for directorio, profundidad, raiz in pendientes]
+            nivel = []
+            for futuro, directorio, profundidad, raiz in futuros:
+                try:
+                    logs, subdirectorios = futuro.result()
+                except PermissionError:
+                    # Saltamos directorios sin permisos
+                    continue
+                except OSError as e:
+                    print(f"Error explorando directorio {directorio}: {e}")
+                    continue
+                
+                for nombre_log in logs:
+                    repo_id = nombre_log.replace(".log", "")
+                    ruta_completa = os.path.join(directorio, nombre_log)
+                    existente = repositorios_detectados.get(repo_id)
+                    if existente and existente["ruta_logs"] != ruta_completa:
+                        # Mismo nombre en otra carpeta (nginx/access.log y apache2/access.log)
+                        repo_id = f"{os.path.basename(directorio)}_{repo_id}"
+                    repositorios_detectados.setdefault(repo_id, {
+                        "nombre": f"Auto: {repo_id}",
+                        "ruta_logs": ruta_completa,
+                        "descripcion": f"Detectado automáticamente en {directorio}"
+                    })
+                if profundidad < profundidad_maxima:
+                    nivel.extend((subdirectorio, profundidad + 1, raiz) for subdirectorio in subdirectorios)
     
+    # Solo se guardan los directorios de esta búsqueda: los borrados desaparecen de la cache
+    _guardar_cache_deteccion({directorio: cache[directorio] for directorio in explorados if directorio in cache})
     return repositorios_detectados
 
 def generar_configuracion_automatica(config_path=None):
@@ -132,8 +238,14 @@ def generar_configuracion_automatica(config_path=None):
     # Cargar configuración existente si existe
     config_existente = cargar_configuracion_repositorios(config_path) or {}
     
-    # Detectar nuevos logs
-    repositorios_detectados = detectar_logs()
+    # Detectar nuevos logs (raíces, profundidad y exclusiones se pueden
+    # ajustar en configuracion_general -> deteccion_logs)
+    deteccion = config_existente.get("configuracion_general", {}).get("deteccion_logs", {})
+    repositorios_detectados = detectar_logs(
+        raices=deteccion.get("raices"),
+        profundidad_maxima=deteccion.get("profundidad_maxima", PROFUNDIDAD_MAXIMA),
+        excluir=deteccion.get("excluir")
+    )
     
     # Merge: mantener configuraciones manuales, agregar solo nuevos
     repositorios_finales = config_existente.get("repositorios", {})
@@ -0,0 +1,142 @@
+"""
+Escaneo de archivos de log completos mapeados en memoria.
+
+En los análisis históricos más del 95% de las líneas no tienen nada que ver
+con los patrones de severidad. En lugar de decodificar el archivo entero a
+texto, lo mapeamos con mmap y buscamos en bytes: por bloques alineados a
+saltos de línea se buscan los literales obligatorios de los patrones (con
+bytes.find, sin crear un objeto por línea) y solo en esas líneas se prueba la
+regex completa. Únicamente las líneas que coinciden se recortan (memoryview)
+y se decodifican para clasificarlas con el motor normal, así que el
+resultado es el mismo que analizando línea por línea.
+"""
+import mmap
+import os
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+SEVERIDADES_ESCANEO = ("CRITICAL", "WARNING")
+TAMANO_BLOQUE_ESCANEO = 8 * 1024 * 1024
+_NO_ASCII = re.compile(rb"[\x80-\xff]")
+
+
+def escanear_archivo(ruta: str, monitor, inicio: int = 0) -> Iterator[Tuple[int, str, Dict]]:
+    """
+    Recorre un archivo y entrega solo las líneas con un patrón crítico o de warning.
+
+    :param ruta: Archivo de log
+    :param monitor: Plugin con motor (MotorPatrones) y analizar_patron_log
+    :param inicio: Byte desde el que empezar (debe ser principio de línea)
+    :return: Iterador de (byte donde empieza la línea, línea, análisis)
+    """
+    literales, completa = monitor.motor.patrones_bytes()
+    if completa is None:
+        return
+    with open(ruta, "rb") as f:
+        tamano = os.fstat(f.fileno()).st_size
+        if tamano <= inicio:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            vista = memoryview(buffer)
+            try:
+                for desde, hasta in _lineas_coincidentes(buffer, literales, completa, inicio, tamano):
+                    linea = vista[desde:hasta].tobytes().decode("utf-8", errors="replace")
+                    if linea.endswith("\r"):
+                        linea = linea[:-1]
+                    analisis = monitor.analizar_patron_log(linea)
+                    if analisis["nivel"] in SEVERIDADES_ESCANEO:
+                        yield desde, linea, analisis
+            finally:
+                # Sin referencias al buffer exportado, el mmap se puede cerrar
+                vista.release()
+
+
+def _lineas_coincidentes(buffer, literales: Optional[List[bytes]], completa, inicio: int,
+                         tamano: int) -> Iterator[Tuple[int, int]]:
+    """Límites [desde, hasta) de las líneas que hay que decodificar, en orden."""
+    escaner = None
+    if literales is None:
+        # Algún patrón no exige literal: las candidatas salen de la regex completa
+        # (más las líneas no ASCII, que siempre se deciden decodificadas). Con
+        # $ en los patrones, las líneas CRLF también: en el buffer el \r queda
+        # entre el final del texto y el \n
+        alternativas = [completa.pattern, _NO_ASCII.pattern]
+        if b"$" in completa.pattern:
+            alternativas.append(rb"\r$")
+        escaner = re.compile(b"|".join(alternativas), re.IGNORECASE | re.MULTILINE)
+    posicion = inicio
+    while posicion < tamano:
+        fin = buffer.find(b"\n", min(posicion + TAMANO_BLOQUE_ESCANEO, tamano))
+        fin = tamano if fin < 0 else fin + 1
+        for desde, hasta in _candidatas_bloque(buffer, literales, escaner, posicion, fin):
+            # Las líneas ASCII ya se pueden descartar en bytes; las demás se
+            # deciden decodificadas. El \r final no forma parte de la línea
+            fin_texto = hasta - 1 if hasta > desde and buffer[hasta - 1] == 0x0D else hasta
+            if (completa.search(buffer, desde, fin_texto) is not None
+                    or _NO_ASCII.search(buffer, desde, hasta) is not None):
+                yield desde, hasta
+        posicion = fin
+
+
+def _candidatas_bloque(buffer, literales: Optional[List[bytes]], escaner, inicio: int, fin: int):
+    if literales is None:
+        return _lineas_con(buffer, lambda p: _buscar(escaner, buffer, p, fin), inicio, fin)
+
+    # upper() de bytes solo toca ASCII, igual que el prefiltro sobre texto
+    mayus = buffer[inicio:fin].upper()
+    inicios = set()
+    for literal in literales:
+        p = mayus.find(literal)
+        while p >= 0:
+            linea = mayus.rfind(b"\n", 0, p) + 1
+            inicios.add(linea)
+            siguiente = mayus.find(b"\n", p)
+            if siguiente < 0:
+                break
+            p = mayus.find(literal, siguiente + 1)
+    if not mayus.isascii():
+        p = _buscar(_NO_ASCII, mayus, 0, len(mayus))
+        while p >= 0:
+            inicios.add(mayus.rfind(b"\n", 0, p) + 1)
+            siguiente = mayus.find(b"\n", p)
+            if siguiente < 0:
+                break
+            p = _buscar(_NO_ASCII, mayus, siguiente + 1, len(mayus))
+    del mayus
+
+    candidatas = []
+    for desde in sorted(inicios):
+        desde += inicio
+        hasta = buffer.find(b"\n", desde, fin)
+        candidatas.append((desde, fin if hasta < 0 else hasta))
+    return candidatas
+
+
+def _buscar(regex, datos, posicion: int, fin: int) -> int:
+    encontrado = regex.search(datos, posicion, fin)
+    return encontrado.start() if encontrado else -1
+
+
+def _lineas_con(buffer, buscar, inicio: int, fin: int) -> Iterator[Tuple[int, int]]:
+    posicion = inicio
+    while True:
+        p = buscar(posicion)
+        # Una coincidencia vacía justo en `fin` sería la línea del bloque siguiente
+        if p < 0 or p >= fin:
+            return
+        desde = max(buffer.rfind(b"\n", inicio, p) + 1, inicio)
+        hasta = buffer.find(b"\n", p, fin)
+        if hasta < 0:
+            hasta = fin
+        yield desde, hasta
+        posicion = hasta + 1
+
+
+def contar_severidades(ruta: str, monitor) -> Dict[str, int]:
+    """
+    :return: {"CRITICAL": n, "WARNING": n} del archivo completo
+    """
+    conteo = dict.fromkeys(SEVERIDADES_ESCANEO, 0)
+    for _, _, analisis in escanear_archivo(ruta, monitor):
+        conteo[analisis["nivel"]] += 1
+    return conteo
@@ -2,29 +2,176 @@
 Clase que se encargará de leers archivo logs
 """
 
+import codecs
 import os
+import threading
 import time
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
+# Tiempo máximo entre que llega un evento y se leen las líneas nuevas (segundos)
+LATENCIA_MAXIMA = 0.2
+# Bytes de líneas que se leen y se muestran de una vez como máximo
+TAMANO_LOTE_MAXIMO = 1024 * 1024
+# Bytes antes del checkpoint que se comparan al reanudar (ver utils/checkpoints.py)
+LONGITUD_HUELLA = 256
+
 class MonitorLogSimple(FileSystemEventHandler):
-    def __init__(self, ruta_completa_archivo):
+    def __init__(self, ruta_completa_archivo, latencia_maxima=LATENCIA_MAXIMA,
+                 tamano_lote_maximo=TAMANO_LOTE_MAXIMO, etiqueta=None, bloque=None,
+                 checkpoints=None, analizador=None):
         # Guardamos la ruta del archivo que queremos monitorear
         self.archivo_objetivo = ruta_completa_archivo
         
+        # Cuando seguimos varios archivos a la vez, cada línea lleva el nombre
+        # de su origen para distinguirlas en la salida
+        self.etiqueta = etiqueta
+        self.prefijo = f"[{etiqueta}] " if etiqueta else ""
+        
+        # Con escrituras en ráfaga watchdog manda un evento por cada write.
+        # En lugar de leer en cada evento solo marcamos el archivo como
+        # "pendiente"; un hilo lector lo vacía como mucho una vez por
+        # latencia_maxima, así muchos eventos se convierten en una sola lectura
+        self.latencia_maxima = latencia_maxima
+        self.tamano_lote_maximo = tamano_lote_maximo
+        self.pendiente = threading.Event()
+        self._detener = threading.Event()
+        self._hilo_lector = None
+        self._lock = threading.Lock()
+        
+        # Leemos bytes, no texto: cuando llega el evento puede que la última
+        # línea esté escrita a medias (o que un carácter UTF-8 de varios bytes
+        # esté cortado). Solo mostramos líneas completas y guardamos el resto
+        # en `incompleta` hasta la próxima lectura. `bloque` es el buffer en el
+        # que se lee, reutilizado en cada lectura (se puede compartir entre
+        # monitores que lean desde un mismo hilo)
+        self._bloque = bloque if bloque is not None else bytearray(tamano_lote_maximo)
+        self._incompleta = bytearray()
+        self._decodificador = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        
         # Esta variable mantiene nuestra posición actual en el archivo
         # Piénsalo como un marcapáginas en un libro
         self.posicion_actual = 0
         
+        # El archivo queda abierto mientras lo seguimos: reabrirlo en cada
+        # evento es caro cuando se escribe miles de veces por segundo.
+        # Guardamos también su identidad (dispositivo, inodo) para darnos
+        # cuenta cuando logrotate lo renombra y crea uno nuevo con el mismo nombre
+        self.archivo = None
+        self.identidad = None
+        
+        # Almacén de checkpoints (AlmacenCheckpoints de utils/checkpoints.py):
+        # si lo hay, anotamos hasta dónde leímos para poder retomar al reiniciar
+        self.checkpoints = checkpoints
+        
+        # Monitor de un plugin (con analizar_lote): si lo hay, cada lote de
+        # líneas nuevas se analiza de una vez antes de mostrarlo, también el
+        # de lo escrito mientras estábamos detenidos
+        self.analizador = analizador
+        # Y su evaluador incremental lleva el estado de salud línea a línea, por
+        # ventanas de tiempo si el plugin las tiene; solo se avisa cuando el
+        # estado cambia
+        self.evaluador = None
+        if analizador is not None:
+            crear_evaluador = getattr(analizador, "crear_evaluador_temporal", analizador.crear_evaluador_salud)
+            self.evaluador = crear_evaluador()
+        self.estado_salud = "OK"
+        checkpoint = checkpoints.obtener(self.archivo_objetivo) if checkpoints else None
+        
+        if checkpoint and self._reanudar(checkpoint):
+            print(f"{self.prefijo}Retomando desde la última lectura...")
         # Si el archivo ya existe cuando empezamos, nos posicionamos al final
         # Esto significa que solo veremos logs NUEVOS, no los históricos
-        if os.path.exists(self.archivo_objetivo):
-            with open(self.archivo_objetivo, 'r', encoding='utf-8') as archivo:
-                archivo.seek(0, 2)  # El "2" significa "ir al final del archivo"
-                self.posicion_actual = archivo.tell()  # tell() nos dice dónde estamos
-                print("Archivo encontrado. Esperando nuevos logs...")
+        elif self._abrir(desde_el_final=True):
+            print(f"{self.prefijo}Archivo encontrado. Esperando nuevos logs...")
         else:
-            print(f"Archivo {self.archivo_objetivo} no existe. Esperando...")
+            print(f"{self.prefijo}Archivo {self.archivo_objetivo} no existe. Esperando...")
+    
+    def _abrir(self, desde_el_final=False):
+        """
+        Abre el archivo (en binario: las posiciones son bytes y se pueden
+        comparar con el tamaño) y guarda su identidad. Devuelve False si no existe.
+        """
+        try:
+            archivo = open(self.archivo_objetivo, 'rb')
+        except FileNotFoundError:
+            return False
+        info = os.fstat(archivo.fileno())
+        self.archivo = archivo
+        self.identidad = (info.st_dev, info.st_ino)
+        self.posicion_actual = self._inicio_ultima_linea(info.st_size) if desde_el_final else 0
+        self._reiniciar_buffer()
+        return True
+    
+    def _inicio_ultima_linea(self, tamano):
+        """
+        Si el archivo termina con una línea a medias, devuelve dónde empieza
+        para que al completarse se muestre entera y no solo su final
+        """
+        desde = max(0, tamano - len(self._bloque))
+        self.archivo.seek(desde)
+        final = self.archivo.read(tamano - desde)
+        if not final or final.endswith(b"\n"):
+            return tamano
+        salto = final.rfind(b"\n")
+        if salto < 0:
+            return tamano if desde > 0 else 0
+        return desde + salto + 1
+    
+    def _reanudar(self, checkpoint):
+        """
+        Se posiciona donde quedó la última ejecución. Si mientras tanto el
+        archivo rotó y el viejo sigue en la carpeta (app.log.1), se abre ese
+        para terminar de leerlo; la próxima lectura detecta la rotación y
+        pasa al archivo nuevo desde el principio.
+        
+        :return: False si no hay nada de dónde retomar
+        """
+        candidatos = [self.archivo_objetivo] + self._archivos_rotados()
+        for ruta in candidatos:
+            try:
+                archivo = open(ruta, 'rb')
+            except OSError:
+                continue
+            info = os.fstat(archivo.fileno())
+            identidad = (info.st_dev, info.st_ino)
+            offset = checkpoint["offset"]
+            if identidad != (checkpoint["dispositivo"], checkpoint["inodo"]) or info.st_size < offset:
+                archivo.close()
+                continue
+            archivo.seek(offset - min(offset, LONGITUD_HUELLA))
+            if not self.checkpoints.coincide(checkpoint, identidad, archivo.read(min(offset, LONGITUD_HUELLA))):
+                archivo.close()
+                continue
+            self.archivo = archivo
+            self.identidad = identidad
+            self.posicion_actual = offset
+            self._reiniciar_buffer()
+            return True
+        
+        # El archivo que leíamos ya no está (o se truncó): lo que haya ahora es nuevo
+        if self._abrir():
+            return True
+        return False
+    
+    def _archivos_rotados(self):
+        """Archivos de la misma carpeta que empiezan con el nombre del log (app.log.1, ...)"""
+        directorio, nombre = os.path.split(self.archivo_objetivo)
+        try:
+            return [entrada.path for entrada in os.scandir(directorio or ".")
+                    if entrada.name.startswith(nombre) and entrada.name != nombre and entrada.is_file()]
+        except OSError:
+            return []
+    
+    def _reiniciar_buffer(self):
+        self._incompleta.clear()
+        self._decodificador.reset()
+    
+    def cerrar(self):
+        if self.archivo is not None:
+            self.archivo.close()
+            self.archivo = None
+            self.identidad = None
     
     def on_modified(self, event):
         """
@@ -34,52 +181,193 @@ class MonitorLogSimple(FileSystemEventHandler):
         # Solo nos importa si el archivo que cambió es exactamente el que queremos
         # y si no es un directorio (sino un archivo real)
         if event.src_path == self.archivo_objetivo and not event.is_directory:
+            if self._hilo_lector is None:
+                self.leer_contenido_nuevo()
+            else:
+                self.pendiente.set()  # El hilo lector se encarga
+    
+    # Cuando logrotate renombra el archivo o crea uno nuevo no llega un
+    # on_modified para nuestra ruta, así que también escuchamos estos eventos
+    def on_created(self, event):
+        self.on_modified(event)
+    
+    def on_moved(self, event):
+        self.on_modified(event)
+    
+    def on_deleted(self, event):
+        self.on_modified(event)
+    
+    def iniciar_lector(self):
+        """Arranca el hilo que lee el archivo cuando hay eventos pendientes"""
+        if self._hilo_lector is None:
+            self._detener.clear()
+            self._hilo_lector = threading.Thread(target=self._bucle_lector, daemon=True)
+            self._hilo_lector.start()
+    
+    def detener_lector(self):
+        if self._hilo_lector is not None:
+            self._detener.set()
+            self.pendiente.set()  # Despertamos al hilo si estaba esperando
+            self._hilo_lector.join()
+            self._hilo_lector = None
+    
+    def _bucle_lector(self):
+        while not self._detener.is_set():
+            self.pendiente.wait()
+            if self._detener.is_set():
+                break
+            self.pendiente.clear()
+            # Lo que se escribió desde el último evento se lee de una vez
             self.leer_contenido_nuevo()
+            # Los eventos que lleguen mientras tanto solo vuelven a marcar
+            # "pendiente" y se atienden juntos en la siguiente vuelta
+            self._detener.wait(self.latencia_maxima)
+        # Última lectura para no perder lo escrito justo antes de detener
+        self.leer_contenido_nuevo()
     
     def leer_contenido_nuevo(self):
+        with self._lock:
+            self._leer_contenido_nuevo()
+    
+    def _leer_contenido_nuevo(self):
         """
         Esta función lee solo las líneas que se agregaron desde la última vez
-        que revisamos el archivo
+        que revisamos el archivo, teniendo en cuenta las rotaciones:
+        - copytruncate: el mismo archivo vuelve a tamaño cero -> leemos desde el principio
+        - renombrado + archivo nuevo: terminamos de leer el viejo y pasamos al nuevo
         """
         try:
-            with open(self.archivo_objetivo, 'r', encoding='utf-8') as archivo:
-                # Vamos a nuestra posición guardada (nuestro marcapáginas)
-                archivo.seek(self.posicion_actual)
-                
-                # Leemos todas las líneas desde esa posición hasta el final
-                lineas_nuevas = archivo.readlines()
-                
-                # Procesamos cada línea nueva
-                for linea in lineas_nuevas:
-                    linea_limpia = linea.strip()  # Quitamos espacios y saltos de línea
-                    if linea_limpia:  # Solo procesamos líneas que no están vacías
-                        self.mostrar_nueva_linea(linea_limpia)
-                
-                # Actualizamos nuestro marcapáginas para la próxima vez
-                self.posicion_actual = archivo.tell()
+            if self.archivo is None:
+                # El archivo no existía (o había desaparecido) y acaba de aparecer:
+                # todo su contenido es nuevo
+                if not self._abrir():
+                    return
+            
+            try:
+                info = os.stat(self.archivo_objetivo)
+                identidad_en_disco = (info.st_dev, info.st_ino)
+            except FileNotFoundError:
+                identidad_en_disco = None
+            
+            if identidad_en_disco != self.identidad:
+                # Rotación por renombrado (o borrado): lo que quedaba por leer
+                # del archivo viejo sigue accesible por nuestro handle abierto.
+                # Nadie va a terminar su última línea, así que sale tal cual
+                self._leer_hasta_el_final(es_el_final=True)
+                self.cerrar()
+                if identidad_en_disco is None:
+                    print(f"{self.prefijo}El archivo desapareció. Esperando a que reaparezca...")
+                    return
+                print(f"{self.prefijo}Archivo rotado. Siguiendo el archivo nuevo...")
+                if self._abrir():
+                    self._leer_hasta_el_final()
+                return
+            
+            if os.fstat(self.archivo.fileno()).st_size < self.posicion_actual:
+                # Rotación por copytruncate: el archivo se vació y se escribe de nuevo
+                print(f"{self.prefijo}Archivo truncado. Leyendo desde el principio...")
+                self.posicion_actual = 0
+                self._reiniciar_buffer()
+            self._leer_hasta_el_final()
                 
         except FileNotFoundError:
             # El archivo fue eliminado mientras lo estábamos leyendo
-            print("El archivo desapareció. Esperando a que reaparezca...")
+            print(f"{self.prefijo}El archivo desapareció. Esperando a que reaparezca...")
         except PermissionError:
             # No tenemos permisos para leer el archivo
-            print("Sin permisos para leer el archivo")
+            print(f"{self.prefijo}Sin permisos para leer el archivo")
     
-    def mostrar_nueva_linea(self, contenido):
+    def _leer_hasta_el_final(self, es_el_final=False):
+        # Vamos a nuestra posición guardada (nuestro marcapáginas)
+        self.archivo.seek(self.posicion_actual)
+        
+        with memoryview(self._bloque) as vista:
+            while True:
+                # Leemos de una vez hasta tamano_lote_maximo bytes en el buffer reutilizable
+                leidos = self.archivo.readinto(self._bloque)
+                if not leidos:
+                    break
+                
+                # Actualizamos nuestro marcapáginas para la próxima vez
+                self.posicion_actual += leidos
+                
+                # Todo lo que hay hasta el último salto de línea son líneas completas;
+                # lo que viene después se queda esperando al resto de la línea
+                corte = self._bloque.rfind(b"\n", 0, leidos) + 1
+                if not corte:
+                    self._incompleta += vista[:leidos]
+                    continue
+                self._incompleta += vista[:corte]
+                texto = self._decodificador.decode(self._incompleta)
+                self._incompleta[:] = vista[corte:leidos]
+                self._mostrar_texto(texto)
+        
+        if es_el_final and self._incompleta:
+            self._mostrar_texto(self._decodificador.decode(bytes(self._incompleta), final=True))
+            self._reiniciar_buffer()
+        
+        if self.checkpoints is not None:
+            self._registrar_checkpoint()
+    
+    def _registrar_checkpoint(self):
+        # El checkpoint apunta al final de la última línea completa que mostramos
+        offset = self.posicion_actual - len(self._incompleta)
+        self.archivo.seek(offset - min(offset, LONGITUD_HUELLA))
+        ultimos_bytes = self.archivo.read(min(offset, LONGITUD_HUELLA))
+        self.archivo.seek(self.posicion_actual)
+        self.checkpoints.registrar(self.archivo_objetivo, self.identidad, offset, ultimos_bytes)
+    
+    def _mostrar_texto(self, texto):
+        # Quitamos espacios y saltos de línea, y nos quedamos con las que no están vacías
+        lote = [linea for linea in (linea.strip() for linea in texto.split("\n")) if linea]
+        if not lote:
+            return
+        if self.analizador is None:
+            self.mostrar_lote(lote)
+        else:
+            analisis = self.analizador.analizar_lote(lote)
+            self.mostrar_lote(lote, analisis)
+            self.actualizar_salud(self.evaluador.agregar_lote(lote, analisis))
+    
+    def mostrar_lote(self, lineas, analisis=None):
         """
-        Aquí decides qué hacer con cada línea nueva del log.
-        Por ahora solo la mostramos, pero podrías:
+        Aquí decides qué hacer con las líneas nuevas del log.
+        Por ahora solo las mostramos (con su nivel si el lote se analizó), pero podrías:
         - Filtrar solo errores
-        - Guardarla en una base de datos  
+        - Guardarlas en una base de datos  
         - Enviar una alerta por email
         - etc.
+        
+        :param analisis: Lote columnar de analizar_lote paralelo a lineas, o None
         """
         timestamp = time.strftime("%H:%M:%S")  # Hora actual
-        print(f"[{timestamp}] {contenido}")
+        # Un solo print por lote: con miles de líneas por segundo, un print
+        # por línea cuesta más que leerlas
+        if analisis is None:
+            print("\n".join(f"[{timestamp}] {self.prefijo}{linea}" for linea in lineas))
+        else:
+            # Solo se llega aquí con un analizador, que viene del paquete
+            from utils.analisis_columnar import NIVEL_INFO, NIVELES
+            print("\n".join(
+                f"[{timestamp}] {self.prefijo}" + (f"[{NIVELES[nivel]}] " if nivel != NIVEL_INFO else "") + linea
+                for linea, nivel in zip(lineas, analisis["nivel"])))
+    
+    def actualizar_salud(self, estado):
+        if estado != self.estado_salud:
+            print(f"{self.prefijo}Estado de salud: {self.estado_salud} -> {estado}")
+            self.estado_salud = estado
+    
+    def mostrar_nueva_linea(self, contenido):
+        self.mostrar_lote([contenido])
 
-def monitorear_log(ruta_archivo):
+def monitorear_log(ruta_archivo, checkpoints=None, analizador=None):
     """
     Función principal que configura todo el sistema de monitoreo
+    
+    Con un almacén de checkpoints (AlmacenCheckpoints) se retoma donde quedó
+    la ejecución anterior en lugar de empezar por el final del archivo.
+    Con un analizador (el monitor de un plugin) cada lote se analiza con su
+    analizar_lote antes de mostrarse
     """
     # Necesitamos separar el directorio del nombre del archivo
     # porque watchdog monitorea directorios, no archivos individuales
@@ -93,7 +381,7 @@ def monitorear_log(ruta_archivo):
     print("Presiona Ctrl+C para detener")
     
     # Creamos nuestro monitor personalizado
-    monitor = MonitorLogSimple(ruta_archivo)
+    monitor = MonitorLogSimple(ruta_archivo, checkpoints=checkpoints, analizador=analizador)
     
     # Creamos el observador que va a estar pendiente de cambios
     observador = Observer()
@@ -101,9 +389,16 @@ def monitorear_log(ruta_archivo):
     # Le decimos al observador que vigile el directorio y use nuestro monitor
     observador.schedule(monitor, directorio, recursive=False)
     
-    # Iniciamos la vigilancia
+    # Iniciamos la vigilancia y el hilo que lee las líneas nuevas
+    monitor.iniciar_lector()
     observador.start()
     
+    # Lo escrito mientras el monitor estaba detenido se lee ya, en lotes grandes,
+    # sin esperar al próximo evento
+    if checkpoints is not None:
+        checkpoints.iniciar_guardado_periodico()
+        monitor.pendiente.set()
+    
     try:
         # Mantenemos el programa corriendo hasta que el usuario lo detenga
         while True:
@@ -115,7 +410,147 @@ def monitorear_log(ruta_archivo):
         
     # Esperamos a que el observador termine limpiamente
     observador.join()
+    monitor.detener_lector()
+    monitor.cerrar()
+    if checkpoints is not None:
+        checkpoints.detener()
+    print("Monitor detenido correctamente")
+
+class MonitorMultiplesLogs(FileSystemEventHandler):
+    """
+    Sigue muchos archivos a la vez con un solo observador y un solo hilo lector.
+    Cada archivo tiene su propio MonitorLogSimple (su marcapáginas, su handle
+    abierto, su manejo de rotaciones), pero no su propio hilo: los eventos
+    solo anotan qué archivos tienen novedades y el hilo lector los recorre.
+    """
+    def __init__(self, rutas, latencia_maxima=LATENCIA_MAXIMA, tamano_lote_maximo=TAMANO_LOTE_MAXIMO,
+                 checkpoints=None, analizador=None):
+        """
+        :param rutas: Diccionario etiqueta -> ruta del archivo de log
+        :param checkpoints: AlmacenCheckpoints compartido por todos los archivos (opcional)
+        :param analizador: Monitor de plugin con el que se analiza cada lote (opcional)
+        """
+        self.latencia_maxima = latencia_maxima
+        # Todos los archivos se leen desde el mismo hilo: comparten el buffer de lectura
+        bloque = bytearray(tamano_lote_maximo)
+        # Ruta absoluta -> estado de ese archivo; así cada evento se resuelve
+        # con una búsqueda en el diccionario, sigamos 2 archivos o 500
+        self.colas = {}
+        for etiqueta, ruta in rutas.items():
+            ruta_absoluta = os.path.abspath(ruta)
+            if ruta_absoluta not in self.colas:
+                self.colas[ruta_absoluta] = MonitorLogSimple(
+                    ruta_absoluta, latencia_maxima, tamano_lote_maximo, etiqueta=etiqueta, bloque=bloque,
+                    checkpoints=checkpoints, analizador=analizador)
+        
+        self.pendientes = set()
+        self._hay_pendientes = threading.Event()
+        self._detener = threading.Event()
+        self._lock = threading.Lock()
+        self._hilo_lector = None
+    
+    def directorios(self):
+        """Directorios a vigilar, cada uno una sola vez aunque tenga varios logs"""
+        return sorted({os.path.dirname(ruta) for ruta in self.colas})
+    
+    def _marcar(self, ruta):
+        if ruta in self.colas:
+            with self._lock:
+                self.pendientes.add(ruta)
+            self._hay_pendientes.set()
+    
+    def marcar_todos(self):
+        """Hace que el hilo lector revise todos los archivos (p. ej. al retomar)"""
+        with self._lock:
+            self.pendientes.update(self.colas)
+        self._hay_pendientes.set()
+    
+    def on_any_event(self, event):
+        # Los eventos de abrir/cerrar sin escribir no traen nada nuevo
+        if event.is_directory or event.event_type not in ("modified", "created", "moved", "deleted"):
+            return
+        self._marcar(event.src_path)
+        # Un archivo renombrado hacia uno de nuestros logs también es novedad
+        destino = getattr(event, "dest_path", None)
+        if destino:
+            self._marcar(destino)
+    
+    def iniciar_lector(self):
+        if self._hilo_lector is None:
+            self._detener.clear()
+            self._hilo_lector = threading.Thread(target=self._bucle_lector, daemon=True)
+            self._hilo_lector.start()
+    
+    def detener_lector(self):
+        if self._hilo_lector is not None:
+            self._detener.set()
+            self._hay_pendientes.set()
+            self._hilo_lector.join()
+            self._hilo_lector = None
+    
+    def _bucle_lector(self):
+        while not self._detener.is_set():
+            self._hay_pendientes.wait()
+            if self._detener.is_set():
+                break
+            self.leer_pendientes()
+            self._detener.wait(self.latencia_maxima)
+        self.leer_pendientes()
+    
+    def leer_pendientes(self):
+        with self._lock:
+            self._hay_pendientes.clear()
+            pendientes, self.pendientes = self.pendientes, set()
+        for ruta in pendientes:
+            self.colas[ruta].leer_contenido_nuevo()
+    
+    def cerrar(self):
+        for cola in self.colas.values():
+            cola.cerrar()
+
+def monitorear_logs(rutas, checkpoints=None, analizador=None):
+    """
+    Como monitorear_log, pero siguiendo varios archivos a la vez.
+    Todas las líneas salen por la misma salida con el nombre de su origen.
+    
+    :param rutas: Diccionario etiqueta -> ruta del archivo de log
+    :param checkpoints: AlmacenCheckpoints para retomar donde quedó cada archivo
+    :param analizador: Monitor de plugin con el que se analiza cada lote (opcional)
+    """
+    monitor = MonitorMultiplesLogs(rutas, checkpoints=checkpoints, analizador=analizador)
+    print(f"Monitoreando {len(monitor.colas)} archivos")
+    print("Presiona Ctrl+C para detener")
+    
+    # Un único observador para todos los directorios
+    observador = Observer()
+    for directorio in monitor.directorios():
+        try:
+            observador.schedule(monitor, directorio, recursive=False)
+        except OSError as e:
+            print(f"No se puede vigilar {directorio}: {e}")
+    
+    monitor.iniciar_lector()
+    observador.start()
+    if checkpoints is not None:
+        checkpoints.iniciar_guardado_periodico()
+        monitor.marcar_todos()
+    
+    try:
+        while True:
+            time.sleep(1)
+            
+    except KeyboardInterrupt:
+        print("\nDeteniendo monitor...")
+        observador.stop()
+        
+    observador.join()
+    monitor.detener_lector()
+    monitor.cerrar()
+    if checkpoints is not None:
+        checkpoints.detener()
     print("Monitor detenido correctamente")
 
 # Para usar el monitor, simplemente llama:
-# monitorear_log("ruta/completa/a/tu/archivo.log")
\ No newline at end of file
+# monitorear_log("ruta/completa/a/tu/archivo.log")
+# o, para varios a la vez:
+# monitorear_logs({"api": "logs/api.log", "worker": "logs/worker.log"})
\ No newline at end of file
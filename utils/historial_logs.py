@@ -0,0 +1,170 @@
+"""
+Análisis del historial completo de un log, incluidos sus segmentos rotados.
+
+logrotate deja junto al log vivo archivos como app.log.1, app.log.2.gz o
+app.log-20240101.bz2. Aquí se encuentran, se ordenan del más viejo al más
+nuevo y se pasan por el mismo camino de líneas que analisis_paralelo, así que
+una sola llamada analiza toda la historia de un servicio.
+
+Los segmentos comprimidos (.gz, .bz2, .xz) se leen por bloques y se
+descomprimen en un hilo aparte que deja los bloques en una cola acotada:
+mientras ese hilo descomprime el bloque siguiente (zlib, bz2 y lzma liberan
+el GIL), el hilo principal busca patrones en el anterior.
+
+Uso desde consola:
+    python -m utils.historial_logs /var/log/app.log runtime
+"""
+import bz2
+import gzip
+import lzma
+import os
+import queue
+import re
+import threading
+from typing import Dict, Iterator, List, Optional
+
+from utils.analisis_paralelo import (TAMANO_BLOQUE, analizar_bloques_lineas, combinar_parciales,
+                                     lineas_de_bloques, obtener_monitor, parciales_archivo)
+
+EXTENSIONES_COMPRIMIDAS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+# Bloques descomprimidos que pueden esperar en la cola a ser analizados
+BLOQUES_EN_COLA = 4
+
+# app.log.3, app.log.3.gz, app.log-20240101, app.log-20240101.xz ...
+_ROTADO = re.compile(r"^(?P<base>.+?\.log)(?:(?P<separador>[.-])(?P<sufijo>[\w-]+?))?(?P<compresion>\.gz|\.bz2|\.xz)?$")
+_FIN = object()
+
+
+def nombre_log_base(nombre: str) -> Optional[str]:
+    """
+    Nombre del log vivo al que pertenece un archivo: "app.log.2.gz" -> "app.log".
+    None si no parece un log.
+    """
+    coincidencia = _ROTADO.match(nombre)
+    return coincidencia.group("base") if coincidencia else None
+
+
+def segmentos_historial(ruta_log: str) -> List[str]:
+    """
+    Segmentos de un log del más viejo al más nuevo, con el log vivo al final.
+    Se ordenan por índice de rotación (app.log.3 es más viejo que app.log.1);
+    si algún segmento no tiene índice numérico (fechas), por fecha de modificación.
+    """
+    directorio, nombre = os.path.split(os.path.abspath(ruta_log))
+    rotados = []
+    try:
+        with os.scandir(directorio) as entradas:
+            for entrada in entradas:
+                coincidencia = _ROTADO.match(entrada.name)
+                if (coincidencia is None or coincidencia.group("base") != nombre
+                        or entrada.name == nombre or not entrada.is_file()):
+                    continue
+                # app.log.3 lleva índice; app.log-20240101 (dateext) es una fecha, no un índice
+                sufijo = coincidencia.group("sufijo")
+                es_indice = coincidencia.group("separador") == "." and sufijo.isdigit()
+                indice = int(sufijo) if es_indice else None
+                rotados.append((indice, entrada.stat().st_mtime, entrada.path))
+    except OSError as e:
+        print(f"[ERROR] No se pudo listar {directorio}: {e}")
+
+    if rotados and all(indice is not None for indice, _, _ in rotados):
+        rotados.sort(key=lambda segmento: -segmento[0])
+    else:
+        rotados.sort(key=lambda segmento: segmento[1])
+    segmentos = [ruta for _, _, ruta in rotados]
+    if os.path.isfile(ruta_log):
+        segmentos.append(os.path.abspath(ruta_log))
+    return segmentos
+
+
+def es_comprimido(ruta: str) -> bool:
+    return os.path.splitext(ruta)[1].lower() in EXTENSIONES_COMPRIMIDAS
+
+
+def leer_bloques_comprimido(ruta: str, tamano_bloque: int = TAMANO_BLOQUE) -> Iterator[bytes]:
+    """Bloques descomprimidos de un segmento, producidos por un hilo aparte"""
+    abrir = EXTENSIONES_COMPRIMIDAS[os.path.splitext(ruta)[1].lower()]
+    cola: queue.Queue = queue.Queue(maxsize=BLOQUES_EN_COLA)
+    detener = threading.Event()
+
+    def entregar(elemento) -> bool:
+        # Esperamos lugar en la cola sin quedarnos colgados si ya nadie consume
+        while not detener.is_set():
+            try:
+                cola.put(elemento, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def descomprimir():
+        try:
+            with abrir(ruta, "rb") as f:
+                while True:
+                    datos = f.read(tamano_bloque)
+                    if not datos or not entregar(datos):
+                        break
+            entregar(_FIN)
+        except Exception as e:
+            entregar(e)
+
+    hilo = threading.Thread(target=descomprimir, daemon=True)
+    hilo.start()
+    try:
+        while True:
+            elemento = cola.get()
+            if elemento is _FIN:
+                return
+            if isinstance(elemento, Exception):
+                raise elemento
+            yield elemento
+    finally:
+        detener.set()
+        hilo.join()
+
+
+def analizar_historial(ruta_log: str, plugin: str, procesos: Optional[int] = None) -> Dict:
+    """
+    Analiza un log y todos sus segmentos rotados como si fueran un solo archivo.
+
+    :param ruta_log: Ruta del log vivo (app.log)
+    :param plugin: Nombre del plugin en el registro (avionics, asset_api, runtime)
+    :param procesos: Procesos para los segmentos sin comprimir (ver analizar_archivo_paralelo)
+    :return: El mismo reporte que analizar_archivo_paralelo, más "segmentos"
+        (las rutas analizadas, en orden); "bytes" son bytes en disco
+    """
+    monitor = obtener_monitor(plugin)
+    segmentos = segmentos_historial(ruta_log)
+    parciales = []
+    for segmento in segmentos:
+        if es_comprimido(segmento):
+            parcial = analizar_bloques_lineas(monitor, lineas_de_bloques(leer_bloques_comprimido(segmento)))
+            parcial["bytes"] = os.path.getsize(segmento)
+            parciales.append(parcial)
+        else:
+            parciales.extend(parciales_archivo(segmento, plugin, procesos))
+
+    reporte = combinar_parciales(parciales, monitor.VENTANA_SALUD)
+    reporte["estado"] = monitor.evaluar_salud_servicio(reporte.pop("ultimas_lineas"))
+    reporte["segmentos"] = segmentos
+    return reporte
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Análisis de un log y sus segmentos rotados")
+    parser.add_argument("ruta", help="Archivo de log vivo (app.log)")
+    parser.add_argument("plugin", help="Plugin a usar (avionics, asset_api, runtime)")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos trabajadores (por defecto, uno por núcleo)")
+    args = parser.parse_args()
+
+    inicio = time.time()
+    reporte = analizar_historial(args.ruta, args.plugin, args.procesos)
+    print(f"Segmentos: {len(reporte['segmentos'])}")
+    for segmento in reporte["segmentos"]:
+        print(f"  {segmento}")
+    print(f"Estado: {reporte['estado']}")
+    print(f"Líneas: {reporte['lineas']} ({reporte['bytes'] / 1024 / 1024:.1f} MB) en {time.time() - inicio:.1f}s")
+    print(f"Conteo: {reporte['conteo']}")
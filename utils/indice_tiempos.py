@@ -0,0 +1,253 @@
+"""
+Índice disperso timestamp -> offset para leer un intervalo de tiempo de un log enorme.
+
+Junto al log se guarda un archivo app.log.indice.bin con una entrada cada
+INTERVALO_INDICE bytes: (ms epoch de la primera línea con fecha a partir de
+ese byte, offset donde empieza esa línea). Para analizar "de 14:00 a 14:10"
+se busca en el índice con búsqueda binaria y se lee solo ese tramo del
+archivo, en lugar de recorrerlo desde el principio.
+
+El índice no se recorre línea por línea: por cada límite de INTERVALO_INDICE
+se salta al límite y se leen unas pocas líneas. Cuando el log crece se
+agregan entradas al final del índice en lugar de reconstruirlo; solo se
+reconstruye si el log rotó o se truncó. Se supone que las fechas del log
+van en orden (como mucho con pequeños desórdenes entre hilos).
+
+Uso desde consola:
+    python -m utils.indice_tiempos /var/log/app.log runtime --desde "2024-07-14 14:00" --hasta "2024-07-14 14:10"
+"""
+import os
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from utils.analisis_paralelo import (TAMANO_BLOQUE, analizar_bloques_lineas, combinar_parciales,
+                                     lineas_de_bloques, obtener_monitor)
+from utils.timestamps import epoch_ms, parsear_en
+
+# Bytes de log entre dos entradas del índice
+INTERVALO_INDICE = 64 * 1024
+# Líneas que se miran después de un límite buscando una con fecha
+LINEAS_BUSQUEDA = 64
+EXTENSION_INDICE = ".indice.bin"
+
+# Cabecera: firma, dispositivo, inodo, intervalo y próximo límite por indexar
+_CABECERA = struct.Struct("<8sQQQQ")
+_FIRMA = b"HMIDX001"
+# Entrada: ms epoch, offset
+_ENTRADA = struct.Struct("<qQ")
+
+
+def ruta_indice(ruta_log: str) -> str:
+    return ruta_log + EXTENSION_INDICE
+
+
+class IndiceTiempos:
+    def __init__(self, ruta_log: str, intervalo: int = INTERVALO_INDICE):
+        self.ruta_log = ruta_log
+        self.ruta = ruta_indice(ruta_log)
+        self.intervalo = intervalo
+        self.identidad: Tuple[int, int] = (0, 0)
+        self.siguiente_limite = 0
+        self.tiempos = array("q")
+        self.offsets = array("q")
+        self._cargar()
+
+    def _cargar(self) -> None:
+        try:
+            with open(self.ruta, "rb") as f:
+                cabecera = f.read(_CABECERA.size)
+                datos = f.read()
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            print(f"Error leyendo índice {self.ruta}: {e}")
+            return
+        if len(cabecera) < _CABECERA.size:
+            return
+        firma, dispositivo, inodo, intervalo, siguiente = _CABECERA.unpack(cabecera)
+        if firma != _FIRMA or intervalo != self.intervalo:
+            return
+        # Una entrada a medio escribir (corte durante la escritura) se descarta
+        datos = datos[:len(datos) - len(datos) % _ENTRADA.size]
+        for ms, offset in _ENTRADA.iter_unpack(datos):
+            self.tiempos.append(ms)
+            self.offsets.append(offset)
+        self.identidad = (dispositivo, inodo)
+        self.siguiente_limite = siguiente
+
+    def _reiniciar(self, identidad: Tuple[int, int]) -> None:
+        self.identidad = identidad
+        self.siguiente_limite = 0
+        self.tiempos = array("q")
+        self.offsets = array("q")
+
+    def actualizar(self) -> int:
+        """
+        Agrega al índice las entradas de lo que se escribió desde la última vez.
+
+        :return: Cuántas entradas nuevas se agregaron
+        """
+        with open(self.ruta_log, "rb") as log:
+            info = os.fstat(log.fileno())
+            identidad = (info.st_dev, info.st_ino)
+            limite_anterior = self.siguiente_limite - self.intervalo
+            if identidad != self.identidad or info.st_size < limite_anterior:
+                # Otro archivo (rotó) o se truncó: el índice viejo no sirve
+                self._reiniciar(identidad)
+                reconstruir = True
+            else:
+                reconstruir = False
+            nuevas = self._indexar(log, info.st_size)
+
+        if nuevas or reconstruir:
+            self._guardar(nuevas, reconstruir)
+        return len(nuevas)
+
+    def _indexar(self, log, tamano: int) -> List[Tuple[int, int]]:
+        nuevas = []
+        ultimo_offset = self.offsets[-1] if self.offsets else -1
+        while self.siguiente_limite < tamano:
+            limite = self.siguiente_limite
+            if limite == 0:
+                log.seek(0)
+            else:
+                # Terminamos la línea en la que cae el límite
+                log.seek(limite - 1)
+                log.readline()
+            entrada = None
+            for _ in range(LINEAS_BUSQUEDA):
+                offset = log.tell()
+                linea = log.readline()
+                if not linea.endswith(b"\n"):
+                    # Fin del archivo (o línea a medio escribir): se retoma la próxima vez
+                    return nuevas
+                ms = epoch_ms(linea.decode("utf-8", errors="replace"))
+                if ms is not None:
+                    entrada = (ms, offset)
+                    break
+            if entrada is not None and entrada[1] > ultimo_offset:
+                nuevas.append(entrada)
+                self.tiempos.append(entrada[0])
+                self.offsets.append(entrada[1])
+                ultimo_offset = entrada[1]
+            self.siguiente_limite = limite + self.intervalo
+        return nuevas
+
+    def _guardar(self, nuevas: List[Tuple[int, int]], reconstruir: bool) -> None:
+        cabecera = _CABECERA.pack(_FIRMA, self.identidad[0], self.identidad[1], self.intervalo, self.siguiente_limite)
+        try:
+            if reconstruir or not os.path.exists(self.ruta):
+                with open(self.ruta, "wb") as f:
+                    f.write(cabecera)
+                    for ms, offset in zip(self.tiempos, self.offsets):
+                        f.write(_ENTRADA.pack(ms, offset))
+                return
+            # Las entradas nuevas van al final y la cabecera se reescribe en su lugar
+            with open(self.ruta, "r+b") as f:
+                f.seek(0, os.SEEK_END)
+                f.write(b"".join(_ENTRADA.pack(ms, offset) for ms, offset in nuevas))
+                f.seek(0)
+                f.write(cabecera)
+        except OSError as e:
+            print(f"Error guardando índice {self.ruta}: {e}")
+
+    def rango_bytes(self, desde_ms: int, hasta_ms: int) -> Tuple[int, Optional[int]]:
+        """
+        Tramo del log que contiene todas las líneas con fecha en [desde_ms, hasta_ms).
+
+        :return: (inicio, fin); fin None significa hasta el final del archivo
+        """
+        # La última entrada anterior a desde_ms: entre ella y la siguiente puede haber líneas del intervalo
+        i = bisect_left(self.tiempos, desde_ms) - 1
+        inicio = self.offsets[i] if i >= 0 else 0
+        # La primera entrada posterior a hasta_ms: a partir de ahí ya no hay nada del intervalo
+        j = bisect_right(self.tiempos, hasta_ms)
+        fin = self.offsets[j] if j < len(self.offsets) else None
+        return inicio, fin
+
+
+def _leer_bloques(ruta: str, inicio: int, fin: Optional[int], tamano_bloque: int = TAMANO_BLOQUE) -> Iterator[bytes]:
+    with open(ruta, "rb") as f:
+        f.seek(inicio)
+        restante = None if fin is None else fin - inicio
+        while restante is None or restante > 0:
+            datos = f.read(tamano_bloque if restante is None else min(tamano_bloque, restante))
+            if not datos:
+                break
+            if restante is not None:
+                restante -= len(datos)
+            yield datos
+
+
+def lineas_en_intervalo(ruta_log: str, desde_ms: int, hasta_ms: int,
+                        indice: Optional[IndiceTiempos] = None) -> Iterator[List[str]]:
+    """
+    Bloques de líneas con fecha en [desde_ms, hasta_ms). Las líneas sin fecha
+    (trazas, continuaciones) acompañan a la última línea con fecha anterior.
+
+    :param indice: Índice ya actualizado (si no, se carga y se actualiza aquí)
+    """
+    if indice is None:
+        indice = IndiceTiempos(ruta_log)
+        indice.actualizar()
+    inicio, fin = indice.rango_bytes(desde_ms, hasta_ms)
+    dentro = False
+    for lineas in lineas_de_bloques(_leer_bloques(ruta_log, inicio, fin)):
+        seleccion = []
+        for linea in lineas:
+            ms = epoch_ms(linea)
+            if ms is not None:
+                dentro = desde_ms <= ms < hasta_ms
+            if dentro:
+                seleccion.append(linea)
+        if seleccion:
+            yield seleccion
+
+
+def analizar_intervalo(ruta_log: str, plugin: str, desde_ms: int, hasta_ms: int) -> Dict:
+    """
+    Analiza solo las líneas de un intervalo de tiempo de un log.
+
+    :return: El mismo reporte que analizar_archivo_paralelo; "bytes" es el
+        tramo del archivo que hubo que leer
+    """
+    monitor = obtener_monitor(plugin)
+    indice = IndiceTiempos(ruta_log)
+    indice.actualizar()
+    parcial = analizar_bloques_lineas(monitor, lineas_en_intervalo(ruta_log, desde_ms, hasta_ms, indice))
+    inicio, fin = indice.rango_bytes(desde_ms, hasta_ms)
+    parcial["bytes"] = (os.path.getsize(ruta_log) if fin is None else fin) - inicio
+    reporte = combinar_parciales([parcial], monitor.VENTANA_SALUD)
+    reporte["estado"] = monitor.evaluar_salud_servicio(reporte.pop("ultimas_lineas"))
+    return reporte
+
+
+def parsear_fecha(texto: str) -> Optional[int]:
+    """ "2024-07-14 14:00" o "2024-07-14 14:00:30" -> ms epoch (UTC)"""
+    texto = texto.strip()
+    if len(texto) == 16:
+        texto += ":00"
+    return parsear_en(texto)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Análisis de un intervalo de tiempo de un log")
+    parser.add_argument("ruta", help="Archivo de log")
+    parser.add_argument("plugin", help="Plugin a usar (avionics, asset_api, runtime)")
+    parser.add_argument("--desde", required=True, help="Inicio, p. ej. \"2024-07-14 14:00\" (UTC)")
+    parser.add_argument("--hasta", required=True, help="Fin (excluido), p. ej. \"2024-07-14 14:10\" (UTC)")
+    args = parser.parse_args()
+
+    desde, hasta = parsear_fecha(args.desde), parsear_fecha(args.hasta)
+    if desde is None or hasta is None:
+        parser.error("Las fechas deben tener el formato YYYY-MM-DD HH:MM[:SS]")
+    inicio = time.time()
+    reporte = analizar_intervalo(args.ruta, args.plugin, desde, hasta)
+    print(f"Estado: {reporte['estado']}")
+    print(f"Líneas: {reporte['lineas']} (leídos {reporte['bytes'] / 1024 / 1024:.1f} MB) en {time.time() - inicio:.1f}s")
+    print(f"Conteo: {reporte['conteo']}")
@@ -0,0 +1,396 @@
+"""
+Logs de todas las réplicas de un servicio en Kubernetes (namespace + label selector).
+
+Los pods que cumplen el selector se listan una sola vez; a partir de esa
+versión un watch avisa de los pods nuevos y de los que desaparecen, sin
+volver a listar (salvo que el API server ya no tenga esa versión: 410).
+
+Los logs de cada contenedor se piden en paralelo, con un máximo de
+peticiones a la vez, y cada línea lleva delante "[pod/contenedor]". Por cada
+contenedor se guarda un cursor con el timestamp de la última línea vista:
+las consultas siguientes, y la reconexión de un stream, piden solo lo
+escrito desde entonces con since_seconds y descartan lo repetido.
+"""
+import math
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from utils.k8s_utils import K8S_AVAILABLE, descartar_api, obtener_api
+from utils.timestamps import lineas_desde_cursor
+
+if K8S_AVAILABLE:
+    from kubernetes import client, config, watch
+
+# Peticiones de logs a la vez en una consulta
+PARALELOS = 8
+# Contenedores que se siguen a la vez en streaming (un hilo y una conexión cada uno)
+MAXIMO_STREAMS = 32
+# Segundos antes de volver a abrir el stream de un contenedor que terminó
+ESPERA_RECONEXION = 5.0
+# Segundos de más al pedir since_seconds; lo repetido se descarta con el cursor
+MARGEN_SINCE = 1
+# Líneas que se piden de cada contenedor al empezar a seguirlo (no todo su historial)
+TAIL_INICIAL = 100
+TAMANO_COLA = 10000
+
+
+def etiquetar(pod: str, contenedor: str, linea: str) -> str:
+    return f"[{pod}/{contenedor}] {linea}"
+
+
+def _since_seconds(desde: float) -> int:
+    # Es relativo al reloj del API server, así que no importa si el nuestro está desfasado
+    return max(1, math.ceil(time.time() - desde) + MARGEN_SINCE)
+
+
+def _en_ejecucion(pod) -> bool:
+    # Solo los pods en Running tienen contenedores de los que leer logs
+    return pod.status is not None and pod.status.phase == "Running"
+
+
+def _contenedores(pod) -> List[str]:
+    return [contenedor.name for contenedor in pod.spec.containers]
+
+
+class ObservadorPods:
+    """
+    Pods en ejecución de un namespace que cumplen un label selector.
+
+    :param al_agregar: Se llama con (pod, contenedores) por cada pod nuevo
+    :param al_quitar: Se llama con el nombre de cada pod que desaparece
+    """
+
+    def __init__(self, namespace: str, selector: str,
+                 al_agregar: Optional[Callable[[str, List[str]], None]] = None,
+                 al_quitar: Optional[Callable[[str], None]] = None):
+        self.namespace = namespace
+        self.selector = selector
+        self.al_agregar = al_agregar
+        self.al_quitar = al_quitar
+        # pod -> nombres de sus contenedores
+        self.pods: Dict[str, List[str]] = {}
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+        self._detener = threading.Event()
+        self._watch = None
+        self._hilo: Optional[threading.Thread] = None
+
+    def listar(self) -> None:
+        """Lista los pods (una petición) y se queda con la versión para observar desde ahí"""
+        respuesta = obtener_api().list_namespaced_pod(self.namespace, label_selector=self.selector)
+        actuales = {pod.metadata.name: _contenedores(pod) for pod in respuesta.items if _en_ejecucion(pod)}
+        self._version = respuesta.metadata.resource_version
+        for nombre in set(self.pods) - set(actuales):
+            self._quitar(nombre)
+        for nombre, contenedores in actuales.items():
+            self._agregar(nombre, contenedores)
+
+    def iniciar(self) -> None:
+        """Lista los pods y empieza a observar los cambios en un hilo aparte"""
+        self.listar()
+        self._hilo = threading.Thread(target=self._observar, name=f"watch-{self.selector}", daemon=True)
+        self._hilo.start()
+
+    def detener(self) -> None:
+        # El watch se corta al recibir el próximo evento; el hilo es daemon
+        self._detener.set()
+        if self._watch is not None:
+            self._watch.stop()
+
+    def copia(self) -> Dict[str, List[str]]:
+        with self._lock:
+            return dict(self.pods)
+
+    def _agregar(self, nombre: str, contenedores: List[str]) -> None:
+        with self._lock:
+            if nombre in self.pods:
+                return
+            self.pods[nombre] = contenedores
+        if self.al_agregar is not None:
+            self.al_agregar(nombre, contenedores)
+
+    def _quitar(self, nombre: str) -> None:
+        with self._lock:
+            if self.pods.pop(nombre, None) is None:
+                return
+        if self.al_quitar is not None:
+            self.al_quitar(nombre)
+
+    def _observar(self) -> None:
+        while not self._detener.is_set():
+            # Sin timeout_seconds, Watch vuelve a abrir el watch cuando el API
+            # server lo cierra, continuando desde la última versión recibida
+            self._watch = watch.Watch()
+            try:
+                for evento in self._watch.stream(obtener_api().list_namespaced_pod, self.namespace,
+                                                 label_selector=self.selector,
+                                                 resource_version=self._version):
+                    if self._detener.is_set():
+                        return
+                    pod = evento["object"]
+                    self._version = pod.metadata.resource_version
+                    if evento["type"] == "DELETED" or not _en_ejecucion(pod):
+                        self._quitar(pod.metadata.name)
+                    else:
+                        self._agregar(pod.metadata.name, _contenedores(pod))
+            except client.ApiException as e:
+                if e.status == 401:
+                    descartar_api()
+                if e.status != 410:
+                    print(f"[WARNING] Error observando pods '{self.selector}' en '{self.namespace}': {e}")
+                    if self._detener.wait(ESPERA_RECONEXION):
+                        return
+                # 410: esa versión ya no existe en el API server, hay que volver a listar
+                try:
+                    self.listar()
+                except Exception as e:
+                    print(f"[WARNING] Error listando pods '{self.selector}' en '{self.namespace}': {e}")
+            except Exception as e:
+                print(f"[WARNING] Error observando pods '{self.selector}' en '{self.namespace}': {e}")
+                if self._detener.wait(ESPERA_RECONEXION):
+                    return
+
+
+class LectorSelectorK8s:
+    """
+    Consultas sucesivas a los logs de todas las réplicas de un servicio.
+
+    La primera consulta pide las últimas `tail` líneas de cada contenedor; las
+    siguientes, solo lo escrito desde la consulta anterior. Los pods se
+    listan en la primera consulta; con observar=True, un watch mantiene la
+    lista al día para las siguientes.
+    """
+
+    def __init__(self, namespace: str, selector: str, tail: int = 100,
+                 paralelos: int = PARALELOS, observar: bool = True):
+        self.namespace = namespace
+        self.tail = tail
+        self.observar = observar
+        self.observador = ObservadorPods(namespace, selector, al_quitar=self._olvidar)
+        self._iniciado = False
+        self._pool = ThreadPoolExecutor(max_workers=paralelos, thread_name_prefix="logs-k8s")
+        # (pod, contenedor) -> (cursor de lineas_desde_cursor, momento en que empezó la última consulta)
+        self.cursores: Dict[Tuple[str, str], Tuple[Tuple[int, int], float]] = {}
+
+    def leer_nuevos(self) -> str:
+        """
+        :return: Las líneas nuevas de todos los contenedores, cada una con su
+            "[pod/contenedor]", o un texto que empieza con [ERROR]
+        """
+        if not K8S_AVAILABLE:
+            return "[ERROR] Cliente de Kubernetes no está instalado. Ejecuta: pip install kubernetes"
+        if not self._iniciado:
+            try:
+                if self.observar:
+                    self.observador.iniciar()
+                else:
+                    self.observador.listar()
+            except config.ConfigException as e:
+                return f"[ERROR] No se pudo cargar configuración de Kubernetes: {e}"
+            except client.ApiException as e:
+                return f"[ERROR] Error de API Kubernetes listando pods '{self.observador.selector}': {e}"
+            except Exception as e:
+                return f"[ERROR] Error inesperado listando pods '{self.observador.selector}': {e}"
+            self._iniciado = True
+
+        contenedores = [(pod, contenedor) for pod, nombres in sorted(self.observador.copia().items())
+                        for contenedor in nombres]
+        return "".join(self._pool.map(lambda clave: self._leer(*clave), contenedores))
+
+    def cerrar(self) -> None:
+        self.observador.detener()
+        self._pool.shutdown(wait=False)
+
+    def _olvidar(self, pod: str) -> None:
+        for clave in [clave for clave in list(self.cursores) if clave[0] == pod]:
+            del self.cursores[clave]
+
+    def _leer(self, pod: str, contenedor: str) -> str:
+        clave = (pod, contenedor)
+        anterior = self.cursores.get(clave)
+        inicio = time.time()
+        if anterior is None:
+            argumentos = {"tail_lines": self.tail}
+        else:
+            argumentos = {"since_seconds": _since_seconds(anterior[1])}
+        try:
+            datos = obtener_api().read_namespaced_pod_log(pod, self.namespace, container=contenedor,
+                                                          timestamps=True, **argumentos)
+        except client.ApiException as e:
+            if e.status == 401:
+                descartar_api()
+            if e.status == 404:
+                # El pod ya no existe; el watch lo quitará de la lista
+                return ""
+            return etiquetar(pod, contenedor, f"[ERROR] Error de API Kubernetes: {e}") + "\n"
+        except Exception as e:
+            return etiquetar(pod, contenedor, f"[ERROR] Error inesperado obteniendo logs: {e}") + "\n"
+
+        nuevas, cursor = lineas_desde_cursor((datos or "").splitlines(), anterior[0] if anterior else None)
+        self.cursores[clave] = (cursor, inicio)
+        return "".join(etiquetar(pod, contenedor, linea) + "\n" for linea in nuevas)
+
+
+def get_k8s_logs_por_selector(namespace: str, selector: str, tail: int = 100,
+                              paralelos: int = PARALELOS) -> str:
+    """
+    Últimas `tail` líneas de cada contenedor de cada pod que cumple el selector.
+
+    :param namespace: Namespace de los pods
+    :param selector: Label selector, p. ej. "app=asset-api"
+    :return: Las líneas, cada una con su "[pod/contenedor]"
+    """
+    lector = LectorSelectorK8s(namespace, selector, tail=tail, paralelos=paralelos, observar=False)
+    try:
+        return lector.leer_nuevos()
+    finally:
+        lector.cerrar()
+
+
+def _lineas_stream(respuesta) -> Iterator[List[str]]:
+    # El stream entrega fragmentos, no líneas: partimos por saltos de línea
+    pendiente = b""
+    for fragmento in respuesta.stream():
+        pendiente += fragmento
+        if b"\n" not in fragmento:
+            continue
+        *lineas, pendiente = pendiente.split(b"\n")
+        yield [linea.decode("utf-8", errors="replace").rstrip("\r") for linea in lineas]
+    if pendiente:
+        yield [pendiente.decode("utf-8", errors="replace")]
+
+
+def _seguir_contenedor(namespace: str, pod: str, contenedor: str, tail: int, desde: Optional[float],
+                       cola: queue.Queue, detener: threading.Event, al_terminar: Callable[[], None]) -> None:
+    """
+    Hilo lector de un contenedor: la primera vez pide las últimas `tail`
+    líneas (o, con `desde`, lo escrito desde ese momento) y reabre el stream
+    cuando termina, desde la última línea recibida. Al salir llama a
+    al_terminar, para que el contenedor se pueda volver a seguir si aparece
+    de nuevo un pod con el mismo nombre (StatefulSet).
+    """
+    try:
+        _leer_contenedor(namespace, pod, contenedor, tail, desde, cola, detener)
+    finally:
+        al_terminar()
+
+
+def _leer_contenedor(namespace: str, pod: str, contenedor: str, tail: int, desde: Optional[float],
+                     cola: queue.Queue, detener: threading.Event) -> None:
+    cursor = None
+    ultima_recepcion = desde
+    while not detener.is_set():
+        if ultima_recepcion is None:
+            argumentos = {"tail_lines": tail}
+        else:
+            argumentos = {"since_seconds": _since_seconds(ultima_recepcion)}
+        try:
+            respuesta = obtener_api().read_namespaced_pod_log(pod, namespace, container=contenedor, follow=True,
+                                                              timestamps=True, _preload_content=False,
+                                                              **argumentos)
+            try:
+                for lineas in _lineas_stream(respuesta):
+                    ultima_recepcion = time.time()
+                    nuevas, cursor = lineas_desde_cursor(lineas, cursor)
+                    for linea in nuevas:
+                        while not detener.is_set():
+                            try:
+                                cola.put(etiquetar(pod, contenedor, linea) + "\n", timeout=0.5)
+                                break
+                            except queue.Full:
+                                continue
+                    if detener.is_set():
+                        return
+            finally:
+                respuesta.release_conn()
+        except client.ApiException as e:
+            if e.status == 401:
+                descartar_api()
+            if e.status == 404:
+                return  # El pod ya no existe
+            print(f"[WARNING] Error en el stream de {pod}/{contenedor}: {e}")
+        except Exception as e:
+            print(f"[WARNING] Error en el stream de {pod}/{contenedor}: {e}")
+        if ultima_recepcion is None:
+            ultima_recepcion = time.time()
+        if detener.wait(ESPERA_RECONEXION):
+            return
+
+
+def stream_k8s_logs_por_selector(namespace: str, selector: str, maximo_streams: int = MAXIMO_STREAMS,
+                                 tail: int = TAIL_INICIAL, desde: Optional[float] = None):
+    """
+    Sigue los logs de todos los contenedores de los pods que cumplen el
+    selector, incluidos los pods que aparezcan después.
+
+    :param namespace: Namespace de los pods
+    :param selector: Label selector, p. ej. "app=asset-api"
+    :param maximo_streams: Contenedores que se siguen a la vez como máximo
+    :param tail: Líneas de cada contenedor que se piden al empezar a seguirlo
+    :param desde: Segundos epoch; si se indica, de cada contenedor se pide lo
+        escrito desde entonces en lugar de las últimas `tail` líneas
+    :yield: Líneas en tiempo real, cada una con su "[pod/contenedor]"
+    """
+    if not K8S_AVAILABLE:
+        yield "[ERROR] Cliente de Kubernetes no está disponible"
+        return
+
+    cola: queue.Queue = queue.Queue(maxsize=TAMANO_COLA)
+    # (pod, contenedor) -> evento para detener su lector. Lo modifican el
+    # hilo del watch, los lectores al terminar y este generador al cerrarse
+    lectores: Dict[Tuple[str, str], threading.Event] = {}
+    lock_lectores = threading.Lock()
+
+    def terminado(clave: Tuple[str, str], detener: threading.Event) -> Callable[[], None]:
+        def al_terminar() -> None:
+            with lock_lectores:
+                # Solo si no lo reemplazó ya otro lector del mismo contenedor
+                if lectores.get(clave) is detener:
+                    del lectores[clave]
+        return al_terminar
+
+    def agregar(pod: str, contenedores: List[str]) -> None:
+        for contenedor in contenedores:
+            clave = (pod, contenedor)
+            with lock_lectores:
+                if clave in lectores:
+                    continue
+                if len(lectores) >= maximo_streams:
+                    print(f"[WARNING] Ya se siguen {maximo_streams} contenedores de '{selector}': no se sigue {pod}/{contenedor}")
+                    continue
+                detener = threading.Event()
+                lectores[clave] = detener
+            threading.Thread(target=_seguir_contenedor,
+                             args=(namespace, pod, contenedor, tail, desde, cola, detener,
+                                   terminado(clave, detener)),
+                             name=f"lector-{pod}/{contenedor}", daemon=True).start()
+
+    def quitar(pod: str) -> None:
+        with lock_lectores:
+            for clave in [clave for clave in lectores if clave[0] == pod]:
+                lectores.pop(clave).set()
+
+    observador = ObservadorPods(namespace, selector, al_agregar=agregar, al_quitar=quitar)
+    try:
+        observador.iniciar()
+    except config.ConfigException:
+        yield "[ERROR] No se pudo cargar configuración de Kubernetes"
+        return
+    except client.ApiException as e:
+        yield f"[ERROR] Error de API Kubernetes listando pods '{selector}' en '{namespace}': {e}"
+        return
+    except Exception as e:
+        yield f"[ERROR] Error inesperado listando pods '{selector}' en '{namespace}': {e}"
+        return
+
+    try:
+        while True:
+            yield cola.get()
+    finally:
+        observador.detener()
+        with lock_lectores:
+            for detener in lectores.values():
+                detener.set()
@@ -3,6 +3,9 @@
 Utilidades para trabajar con Kubernetes de manera más robusta
 """
 
+import os
+import threading
+
 # Validación de dependencias de Kubernetes
 try:
     from kubernetes import client, config
@@ -11,7 +14,71 @@ except ImportError:
     K8S_AVAILABLE = False
     print("⚠️  Kubernetes client no está disponible. Funcionalidad K8s deshabilitada.")
 
-from kubernetes import client, config
+# Conexiones HTTP al API server que el cliente compartido mantiene abiertas
+# (una por hilo que lo use a la vez, p. ej. un stream por pod)
+POOL_CONEXIONES = 32
+# Si está definida, se usa este API server sin credenciales en lugar de la
+# configuración del cluster o de kubectl (p. ej. http://127.0.0.1:8080 para
+# un "kubectl proxy" o un API server falso en pruebas)
+VARIABLE_HOST = "K8S_API_HOST"
+
+_api = None
+_lock_api = threading.Lock()
+
+
+def _cargar_configuracion(host: str = None):
+    """
+    Lee la configuración una sola vez. La configuración que devuelve el
+    cliente de Kubernetes trae un hook que vuelve a leer el token (in-cluster)
+    o a pedir credenciales (kubeconfig con exec/oidc) solo cuando vencieron,
+    así que mientras se reutilice el mismo objeto no hay que recargar nada.
+    """
+    configuracion = client.Configuration()
+    host = host or os.environ.get(VARIABLE_HOST)
+    if host:
+        configuracion.host = host
+    else:
+        try:
+            config.load_incluster_config(client_configuration=configuracion)  # Dentro del cluster
+        except config.ConfigException:
+            config.load_kube_config(client_configuration=configuracion)  # Localmente con kubectl configurado
+    configuracion.connection_pool_maxsize = POOL_CONEXIONES
+    return configuracion
+
+
+def obtener_api(host: str = None):
+    """
+    CoreV1Api compartida por todo el proceso. La configuración se carga y las
+    conexiones (TLS incluido) se abren la primera vez; después se reutilizan.
+
+    :param host: API server a usar en lugar del configurado (solo tiene efecto
+        al crear el cliente; ver descartar_api)
+    """
+    global _api
+    if _api is None:
+        with _lock_api:
+            if _api is None:
+                _api = client.CoreV1Api(client.ApiClient(_cargar_configuracion(host)))
+    return _api
+
+
+def descartar_api() -> None:
+    """Olvida el cliente compartido (credenciales rechazadas, cambio de contexto); el próximo uso crea otro"""
+    global _api
+    with _lock_api:
+        if _api is not None:
+            try:
+                _api.api_client.close()
+            except Exception:
+                pass
+            _api = None
+
+
+def _descartar_si_no_autorizado(error) -> None:
+    # Un 401 con credenciales que el hook no sabía vencidas (revocadas, rotadas):
+    # la próxima llamada vuelve a cargar la configuración
+    if error.status == 401:
+        descartar_api()
 
 
 def get_k8s_pod_logs(pod_name: str, namespace: str = "default", tail: int = 100) -> str:
@@ -32,13 +99,7 @@ def get_k8s_pod_logs(pod_name: str, namespace: str = "default", tail: int = 100)
         return "[ERROR] Cliente de Kubernetes no está instalado. Ejecuta: pip install kubernetes"
     
     try:
-        try:
-            config.load_incluster_config()  # Dentro del cluster
-        except:
-            config.load_kube_config()  # Localmente con kubectl configurado
-
-        v1 = client.CoreV1Api()
-        logs = v1.read_namespaced_pod_log(
+        logs = obtener_api().read_namespaced_pod_log(
             name=pod_name,
             namespace=namespace,
             tail_lines=tail,
@@ -48,6 +109,7 @@ def get_k8s_pod_logs(pod_name: str, namespace: str = "default", tail: int = 100)
     except config.ConfigException:
         return "[ERROR] No se pudo cargar configuración de Kubernetes. ¿Tienes kubectl configurado?"
     except client.ApiException as e:
+        _descartar_si_no_autorizado(e)
         if e.status == 404:
             return f"[ERROR] Pod '{pod_name}' no encontrado en namespace '{namespace}'"
         else:
@@ -80,13 +142,7 @@ def stream_k8s_pod_logs(pod_name: str, namespace: str = "default"):
 
 
     try:
-        try:
-            config.load_incluster_config()
-        except:
-            config.load_kube_config()
-
-        v1 = client.CoreV1Api()
-        resp = v1.read_namespaced_pod_log(
+        resp = obtener_api().read_namespaced_pod_log(
             name=pod_name,
             namespace=namespace,
             follow=True,
@@ -98,6 +154,7 @@ def stream_k8s_pod_logs(pod_name: str, namespace: str = "default"):
     except config.ConfigException:
         yield "[ERROR] No se pudo cargar configuración de Kubernetes"
     except client.ApiException as e:
+        _descartar_si_no_autorizado(e)
         if e.status == 404:
             yield f"[ERROR] Pod '{pod_name}' no encontrado en namespace '{namespace}'"
         else:
@@ -115,15 +172,10 @@ def verificar_k8s_disponible() -> bool:
         return False
     
     try:
-        try:
-            config.load_incluster_config()
-        except:
-            config.load_kube_config()
-        
-        v1 = client.CoreV1Api()
-        v1.list_namespace(limit=1)  # Prueba básica
+        obtener_api().list_namespace(limit=1)  # Prueba básica
         return True
     except:
+        descartar_api()
         return False
 
     # Removed unreachable except clause and undefined variable usage
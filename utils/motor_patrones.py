@@ -0,0 +1,306 @@
+"""
+Motor de patrones compartido por los plugins de monitoreo.
+
+Compila una sola vez las listas errores_criticos / errores_warning de cada
+plugin en una expresión combinada por severidad, con un grupo con nombre por
+patrón. Así cada línea se clasifica con una búsqueda por severidad en vez de
+un re.search por patrón, y además sabemos qué patrón fue el que saltó.
+Los patrones que no admiten la unión (flags como (?i) o referencias \1) hacen
+que esa severidad se busque patrón por patrón.
+
+Antes de la regex hay un prefiltro de literales: casi todos los patrones
+exigen una palabra fija (GPS, HTTP, MEMORY...), así que una línea que no
+contiene ninguna de esas palabras se descarta sin evaluar las expresiones.
+
+Para escanear archivos enteros (utils/escaneo_mmap.py) el motor ofrece
+también versiones en bytes de los mismos patrones.
+"""
+import re
+from typing import Dict, List, Optional, Pattern, Tuple
+
+# Caracteres con significado especial fuera de una clase [...]
+_METACARACTERES = set(".^$*+?{}[]\\|()")
+_CUANTIFICADORES_OPCIONALES = set("*?{")
+# Escapes que representan una clase de caracteres o una aserción, no un literal
+_ESCAPES_ESPECIALES = set("dDwWsSbBAZ")
+# Construcciones que dejan de funcionar dentro de la alternancia combinada:
+# flags globales como (?i) (solo valen al principio de la expresión) y
+# referencias hacia atrás (\1, (?P=nombre)), cuyos grupos cambian de número
+_NO_COMBINABLE = re.compile(r"\(\?[aiLmsux]+\)|\\[1-9]|\(\?P=|\\g<")
+
+
+def extraer_literal_obligatorio(patron: str) -> Optional[str]:
+    """
+    Busca el literal más largo que cualquier coincidencia de patron tiene que
+    contener. Es conservador: ante alternancias de primer nivel, flags inline
+    o cualquier construcción dudosa devuelve None (sin prefiltro posible).
+
+    :param patron: Expresión regular tal como aparece en la configuración
+    :return: Literal en mayúsculas, o None si no se puede garantizar ninguno
+    """
+    # Flags inline como (?x) o (?i) cambian cómo se interpreta el resto
+    if re.search(r"\(\?[aiLmsux-]+[:)]", patron):
+        return None
+
+    literales = []
+    actual = []
+    profundidad = 0
+    i = 0
+
+    def cerrar_literal():
+        if actual:
+            literales.append("".join(actual))
+            actual.clear()
+
+    while i < len(patron):
+        c = patron[i]
+        if c == "\\":
+            siguiente = patron[i + 1] if i + 1 < len(patron) else ""
+            if siguiente.isascii() and siguiente.isalnum() and siguiente not in _ESCAPES_ESPECIALES:
+                # \x41, \u00e9, \N{...}, \t, \0101, \1...: el carácter (o grupo)
+                # que representan no está en el patrón y sus dígitos o nombre
+                # no son texto a buscar
+                return None
+            if profundidad == 0 and siguiente and siguiente.isascii() and siguiente not in _ESCAPES_ESPECIALES:
+                actual.append(siguiente)
+            else:
+                cerrar_literal()
+            i += 2
+            continue
+        if c == "[":
+            # Saltamos la clase completa: nunca aporta un literal fijo
+            cerrar_literal()
+            i += 1
+            if i < len(patron) and patron[i] == "^":
+                i += 1
+            if i < len(patron) and patron[i] == "]":
+                i += 1
+            while i < len(patron) and patron[i] != "]":
+                i += 2 if patron[i] == "\\" else 1
+            i += 1
+            continue
+        if c == "(":
+            cerrar_literal()
+            profundidad += 1
+        elif c == ")":
+            profundidad -= 1
+        elif c == "|":
+            if profundidad == 0:
+                return None
+        elif c in _CUANTIFICADORES_OPCIONALES:
+            # El carácter anterior puede no aparecer: lo sacamos del literal
+            if actual:
+                actual.pop()
+            cerrar_literal()
+            if c == "{":
+                # El contenido de {m,n} no es texto a buscar
+                cierre = patron.find("}", i)
+                i = cierre if cierre != -1 else len(patron)
+        elif c == "+":
+            cerrar_literal()
+        elif profundidad == 0 and c not in _METACARACTERES and c.isascii():
+            actual.append(c)
+        else:
+            cerrar_literal()
+        i += 1
+    cerrar_literal()
+
+    literales = [lit.strip() for lit in literales if lit.strip()]
+    if not literales:
+        return None
+    return max(literales, key=len).upper()
+
+
+def _regex_trie(literales: List[str]) -> str:
+    """
+    Construye una alternancia factorizada por prefijos comunes (un trie), de
+    modo que la búsqueda recorre la línea una sola vez al estilo Aho-Corasick
+    en lugar de probar cada palabra por separado.
+    """
+    trie: Dict[str, dict] = {}
+    for literal in literales:
+        nodo = trie
+        for c in literal:
+            if "" in nodo:
+                break  # ya hay un literal más corto que es prefijo de este
+            nodo = nodo.setdefault(c, {})
+        else:
+            nodo.clear()  # basta con el prefijo: lo más largo sobra
+            nodo[""] = {}
+
+    def a_regex(nodo: Dict[str, dict]) -> str:
+        ramas = [re.escape(c) + a_regex(hijo) for c, hijo in sorted(nodo.items()) if c]
+        if not ramas:
+            return ""
+        if len(ramas) == 1:
+            return ramas[0]
+        return "(?:" + "|".join(ramas) + ")"
+
+    return a_regex(trie)
+
+
+class PrefiltroLiterales:
+    """
+    Descarta líneas que no contienen ninguno de los literales obligatorios.
+    Trabaja sobre la copia en mayúsculas de la línea, calculada una única vez.
+    """
+    def __init__(self, literales: List[str]):
+        self.literales = sorted(set(literales))
+        self._regex = re.compile(_regex_trie(self.literales))
+
+    def es_candidata(self, linea_log: str, linea_mayus: str) -> bool:
+        """
+        :param linea_log: Línea original
+        :param linea_mayus: La misma línea pasada a mayúsculas
+        :return: False solo si es seguro que ningún patrón puede coincidir
+        """
+        # Con caracteres no ASCII, IGNORECASE y upper() pueden no coincidir
+        # (p. ej. el signo Kelvin), así que no nos arriesgamos a descartarla
+        if not linea_log.isascii():
+            return True
+        return self._regex.search(linea_mayus) is not None
+
+    @classmethod
+    def desde_patrones(cls, patrones: List[str]) -> Optional["PrefiltroLiterales"]:
+        """
+        Devuelve None si algún patrón no tiene literal obligatorio: en ese caso
+        cualquier línea podría coincidir y el prefiltro no serviría de nada.
+        """
+        literales = []
+        for patron in patrones:
+            literal = extraer_literal_obligatorio(patron)
+            if literal is None:
+                return None
+            literales.append(literal)
+        return cls(literales) if literales else None
+
+
+class MotorPatrones:
+    def __init__(self, errores_criticos: List[str], errores_warning: List[str]):
+        # Copiamos las listas: si el plugin las modifica después hay que
+        # crear un motor nuevo para que los cambios tengan efecto
+        self.errores_criticos = list(errores_criticos)
+        self.errores_warning = list(errores_warning)
+        self._criticos = self._compilar(self.errores_criticos, "c")
+        self._warnings = self._compilar(self.errores_warning, "w")
+        # False si algún patrón obligó a buscar patrón por patrón
+        self.combinable = all(combinada is not None or not sueltos
+                              for combinada, sueltos in (self._criticos, self._warnings))
+        self.prefiltro = PrefiltroLiterales.desde_patrones(self.errores_criticos + self.errores_warning)
+        self._patrones_bytes = None
+
+    @staticmethod
+    def _compilar(patrones: List[str], prefijo: str) -> Tuple[Optional[Pattern], List[Pattern]]:
+        """
+        Compila cada patrón por separado (así un patrón inválido de la
+        configuración se informa con su nombre) y, si se puede, los une en una
+        alternancia (?P<c0>...)|(?P<c1>...)|...
+
+        :return: (alternancia o None si no se pudo unir, patrones sueltos)
+        """
+        sueltos = []
+        for patron in patrones:
+            try:
+                sueltos.append(re.compile(patron, re.IGNORECASE))
+            except re.error as e:
+                raise ValueError(f"Patrón de log inválido en la configuración {patron!r}: {e}") from e
+        if not patrones or any(_NO_COMBINABLE.search(patron) for patron in patrones):
+            return None, sueltos
+        alternativas = [f"(?P<{prefijo}{i}>{patron})" for i, patron in enumerate(patrones)]
+        try:
+            return re.compile("|".join(alternativas), re.IGNORECASE), sueltos
+        except re.error:
+            # P. ej. el mismo grupo con nombre en dos patrones
+            return None, sueltos
+
+    def patrones_bytes(self) -> Tuple[Optional[List[bytes]], Optional[Pattern]]:
+        """
+        Versiones en bytes de los patrones, para buscar directamente sobre un
+        buffer (mmap) sin decodificar. Devuelve (literales, completa):
+          - literales: los literales obligatorios en mayúsculas, o None si algún
+            patrón no tiene (entonces cualquier línea puede coincidir)
+          - completa: todos los patrones críticos y de warning, o None si no hay
+        En bytes IGNORECASE solo pliega ASCII: las líneas con bytes no ASCII
+        hay que clasificarlas ya decodificadas. Se compila con MULTILINE para
+        que ^ y $ funcionen por línea dentro del buffer. Si los patrones no se
+        pueden unir o no valen en bytes (p. ej. \\u00c9), `completa` coincide
+        con cualquier línea: todas se clasifican decodificadas.
+        """
+        if self._patrones_bytes is None:
+            patrones = self.errores_criticos + self.errores_warning
+            completa = None
+            if patrones and self.combinable:
+                try:
+                    completa = re.compile(b"|".join(b"(?:" + p.encode("utf-8") + b")" for p in patrones),
+                                          re.IGNORECASE | re.MULTILINE)
+                except re.error:
+                    pass
+            if patrones and completa is None:
+                completa = re.compile(b"")
+            literales = None
+            if self.prefiltro is not None:
+                literales = [literal.encode("utf-8") for literal in self.prefiltro.literales]
+            self._patrones_bytes = (literales, completa)
+        return self._patrones_bytes
+
+    @staticmethod
+    def _buscar(compilados: Tuple[Optional[Pattern], List[Pattern]], patrones: List[str],
+                linea_log: str) -> Optional[str]:
+        combinada, sueltos = compilados
+        if combinada is not None:
+            match = combinada.search(linea_log)
+            # lastgroup es el grupo externo que envuelve al patrón (cierra el último)
+            return patrones[int(match.lastgroup[1:])] if match else None
+        # Sin alternancia: una búsqueda por patrón, en orden
+        for patron, regex in zip(patrones, sueltos):
+            if regex.search(linea_log):
+                return patron
+        return None
+
+    def buscar_critico(self, linea_log: str) -> Optional[str]:
+        """
+        :param linea_log: Línea de log a analizar
+        :return: El patrón crítico que coincide, o None si no hay ninguno
+        """
+        return self._buscar(self._criticos, self.errores_criticos, linea_log)
+
+    def buscar_warning(self, linea_log: str) -> Optional[str]:
+        """
+        :param linea_log: Línea de log a analizar
+        :return: El patrón de warning que coincide, o None si no hay ninguno
+        """
+        return self._buscar(self._warnings, self.errores_warning, linea_log)
+
+    def es_critico(self, linea_log: str, linea_mayus: Optional[str] = None) -> bool:
+        if not self.es_candidata(linea_log, linea_mayus):
+            return False
+        return self.buscar_critico(linea_log) is not None
+
+    def es_candidata(self, linea_log: str, linea_mayus: Optional[str] = None) -> bool:
+        """
+        Indica si vale la pena evaluar las expresiones sobre la línea.
+        """
+        if self.prefiltro is None:
+            return True
+        if linea_mayus is None:
+            linea_mayus = linea_log.upper()
+        return self.prefiltro.es_candidata(linea_log, linea_mayus)
+
+    def clasificar(self, linea_log: str, linea_mayus: Optional[str] = None) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Clasifica la severidad de una línea con la misma prioridad que usaban
+        los plugins: primero los críticos y, si no hay ninguno, los warnings.
+
+        :param linea_log: Línea de log a analizar
+        :param linea_mayus: linea_log.upper() si el llamador ya la calculó
+        :return: ("CRITICAL" | "WARNING" | None, patrón que coincidió o None)
+        """
+        if not self.es_candidata(linea_log, linea_mayus):
+            return None, None
+        patron = self.buscar_critico(linea_log)
+        if patron is not None:
+            return "CRITICAL", patron
+        patron = self.buscar_warning(linea_log)
+        if patron is not None:
+            return "WARNING", patron
+        return None, None
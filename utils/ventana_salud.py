@@ -0,0 +1,291 @@
+"""
+Evaluación incremental de la salud de un servicio sobre las últimas N líneas.
+
+Cada plugin describe su evaluación con:
+  - VENTANA_SALUD: cuántas líneas recientes mira (20, 30...)
+  - CAMPOS_SALUD: qué campos del análisis necesita ("nivel", "status_code"...)
+  - CONTADORES_SALUD: nombre de cada contador que mantiene
+  - _aporte_salud(linea, *campos): cuánto suma una línea a cada contador
+  - _veredicto_salud(contadores): el estado según sus umbrales
+
+Con eso evaluar_salud_servicio suma los aportes de la ventana completa y
+EvaluadorSalud mantiene los mismos contadores en un buffer circular,
+actualizándolos en tiempo constante por línea. Como ambos usan los mismos
+aportes y umbrales, el veredicto es idéntico.
+
+EvaluadorSaludTemporal usa los mismos aportes pero con ventanas de tiempo
+(1m, 5m, 15m...) en lugar de "últimas N líneas", agrupando por segundo según
+el timestamp de cada línea. Así el veredicto significa lo mismo en un servicio
+que escribe mucho y en uno que escribe poco. Como un conteo pensado para 20
+líneas no sirve para 15 minutos, cada ventana puede tener sus propios umbrales
+(los del plugin están en su atributo umbrales_salud).
+"""
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from utils.analisis_columnar import filas
+from utils.timestamps import epoch_ms
+
+# Estados ordenados de mejor a peor
+ORDEN_ESTADOS = ("OK", "WARNING", "ERROR", "CRITICAL")
+VENTANAS_SALUD_POR_DEFECTO = ("1m", "5m", "15m")
+_UNIDADES_DURACION = {"s": 1, "m": 60, "h": 3600}
+
+
+def peor_estado(*estados: str) -> str:
+    return max(estados, key=ORDEN_ESTADOS.index)
+
+
+def sumar_aportes(aporte: Callable[..., Tuple[int, ...]], cantidad: int,
+                  lineas: Iterable[str], filas_analisis: Iterable[Tuple]) -> List[int]:
+    """
+    Suma los aportes de un bloque de líneas.
+
+    :param aporte: _aporte_salud del plugin
+    :param cantidad: Número de contadores (len(CONTADORES_SALUD))
+    :param lineas: Líneas de log de la ventana
+    :param filas_analisis: Campos de análisis paralelos a lineas (ver analisis_columnar.filas)
+    """
+    contadores = [0] * cantidad
+    for linea, fila in zip(lineas, filas_analisis):
+        for i, valor in enumerate(aporte(linea, *fila)):
+            contadores[i] += valor
+    return contadores
+
+
+class EvaluadorSalud:
+    """
+    Mantiene los contadores de salud de un monitor sobre las últimas
+    VENTANA_SALUD líneas. Agregar una línea cuesta O(1): se suma su aporte
+    y se resta el de la línea que sale del buffer.
+    """
+    def __init__(self, monitor, tamano: Optional[int] = None):
+        self.monitor = monitor
+        self.tamano = tamano or monitor.VENTANA_SALUD
+        self._aportes = deque(maxlen=self.tamano)
+        self.contadores = [0] * len(monitor.CONTADORES_SALUD)
+
+    def agregar(self, linea_log: str, analisis: Optional[Dict] = None) -> str:
+        """
+        Incorpora una línea nueva a la ventana.
+
+        :param linea_log: Línea de log
+        :param analisis: Su análisis si ya se calculó (si no, se analiza aquí)
+        :return: El estado del servicio tras agregar la línea
+        """
+        if analisis is None:
+            analisis = self.monitor.analizar_patron_log(linea_log)
+        fila = next(filas([analisis], *self.monitor.CAMPOS_SALUD))
+        self._sumar(self.monitor._aporte_salud(linea_log, *fila))
+        return self.estado()
+
+    def agregar_lote(self, lineas: List[str], lote: Dict) -> str:
+        """
+        Incorpora un lote de líneas nuevas, línea por línea.
+
+        :param lineas: Líneas de log en orden de llegada
+        :param lote: Su análisis columnar (analizar_lote del mismo monitor)
+        :return: El peor estado por el que pasó el servicio durante el lote: un
+            error que ya salió de la ventana al terminar el lote no se pierde
+        """
+        peor = self.estado()
+        for i, (linea, fila) in enumerate(zip(lineas, filas(lote, *self.monitor.CAMPOS_SALUD))):
+            self._sumar(self.monitor._aporte_salud(linea, *fila))
+            peor = self.estado() if i == 0 else peor_estado(peor, self.estado())
+        return peor
+
+    def _sumar(self, aporte: Tuple[int, ...]) -> None:
+        if len(self._aportes) == self.tamano:
+            for i, valor in enumerate(self._aportes[0]):
+                self.contadores[i] -= valor
+        self._aportes.append(aporte)
+        for i, valor in enumerate(aporte):
+            self.contadores[i] += valor
+
+    def estado(self) -> str:
+        return self.monitor._veredicto_salud(self.contadores)
+
+    def resumen(self) -> Dict[str, int]:
+        """Contadores actuales por nombre, útil para mostrar o guardar el estado."""
+        return dict(zip(self.monitor.CONTADORES_SALUD, self.contadores))
+
+    def reiniciar(self) -> None:
+        self._aportes.clear()
+        self.contadores = [0] * len(self.monitor.CONTADORES_SALUD)
+
+    def __len__(self) -> int:
+        return len(self._aportes)
+
+
+def parsear_duracion(valor: Union[int, str]) -> int:
+    """
+    Convierte una duración de la configuración a segundos: 90, "90s", "5m", "1h".
+    """
+    if isinstance(valor, (int, float)):
+        segundos = int(valor)
+    else:
+        texto = str(valor).strip().lower()
+        if texto and texto[-1] in _UNIDADES_DURACION:
+            segundos = int(float(texto[:-1]) * _UNIDADES_DURACION[texto[-1]])
+        else:
+            segundos = int(texto)
+    if segundos <= 0:
+        raise ValueError(f"La duración de una ventana tiene que ser positiva: {valor!r}")
+    return segundos
+
+
+def segundo_de_timestamp(timestamp: Optional[str]) -> Optional[int]:
+    """
+    Convierte el timestamp extraído por _extraer_timestamp ("YYYY-MM-DD HH:MM:SS")
+    a segundos desde epoch. Si no trae zona horaria se lee como UTC: para las
+    ventanas solo importan las diferencias entre líneas del mismo log, así que
+    da igual en qué zona escriba el servicio. None si no se reconoce.
+    """
+    if not timestamp:
+        return None
+    ms = epoch_ms(timestamp)
+    return ms // 1000 if ms is not None else None
+
+
+def segundo_de_analisis(analisis: Dict) -> Optional[int]:
+    """
+    Segundo epoch de una línea ya analizada: usa "timestamp_ms" si el plugin lo
+    calcula y, si no, parsea el timestamp en texto.
+    """
+    ms = analisis.get("timestamp_ms")
+    if ms is not None:
+        return ms // 1000
+    return segundo_de_timestamp(analisis.get("timestamp"))
+
+
+class EvaluadorSaludTemporal:
+    """
+    Contadores de salud por ventanas de tiempo. Las líneas se agrupan en
+    cubetas de un segundo; cada ventana guarda las cubetas que caen dentro de
+    su duración y las descarta por el frente cuando envejecen, así que la
+    memoria depende de la duración y no de cuántas líneas escribe el servicio.
+
+    El "ahora" de las ventanas es el timestamp de la línea más reciente, no el
+    reloj de esta máquina: así no importa la zona horaria del log ni si se
+    está leyendo en vivo o poniéndose al día con lo escrito hace horas.
+    """
+    def __init__(self, monitor, ventanas: Iterable[Union[int, str]] = VENTANAS_SALUD_POR_DEFECTO,
+                 umbrales: Optional[Dict[str, Dict]] = None):
+        """
+        :param monitor: Plugin con los *_SALUD, _aporte_salud, _veredicto_salud y umbrales_salud
+        :param ventanas: Duraciones de las ventanas ("1m", "5m", 90...)
+        :param umbrales: Ventana -> umbrales que reemplazan a los de monitor.umbrales_salud
+        """
+        self.monitor = monitor
+        self.duraciones = {str(ventana): parsear_duracion(ventana) for ventana in ventanas}
+        if not self.duraciones:
+            raise ValueError("Hace falta al menos una ventana de tiempo")
+        umbrales = umbrales or {}
+        self.umbrales = {etiqueta: {**monitor.umbrales_salud, **umbrales.get(etiqueta, {})}
+                         for etiqueta in self.duraciones}
+        self.reiniciar()
+
+    def reiniciar(self) -> None:
+        cantidad = len(self.monitor.CONTADORES_SALUD)
+        self._cubetas = {etiqueta: deque() for etiqueta in self.duraciones}
+        self._sumas = {etiqueta: [0] * cantidad for etiqueta in self.duraciones}
+        # Cubeta del segundo más reciente: [segundo, contadores]
+        self._actual = None
+        # Aportes de las líneas sin fecha llegadas antes que cualquier línea
+        # con fecha: pasan a la primera cubeta cuando llega una
+        self._sin_fecha = [0] * cantidad
+
+    @property
+    def ultimo_segundo(self) -> Optional[int]:
+        return self._actual[0] if self._actual else None
+
+    def agregar(self, linea_log: str, analisis: Optional[Dict] = None, segundo: Optional[int] = None) -> str:
+        """
+        Incorpora una línea a todas las ventanas.
+
+        :param linea_log: Línea de log
+        :param analisis: Su análisis si ya se calculó
+        :param segundo: Momento de la línea en segundos epoch; por defecto se
+            toma de su timestamp, o del de la línea anterior si no tiene
+        :return: El peor estado entre todas las ventanas
+        """
+        if analisis is None:
+            analisis = self.monitor.analizar_patron_log(linea_log)
+        if segundo is None:
+            segundo = segundo_de_analisis(analisis)
+        fila = next(filas([analisis], *self.monitor.CAMPOS_SALUD))
+        self._sumar(self.monitor._aporte_salud(linea_log, *fila), segundo)
+        return self.estado()
+
+    def agregar_lote(self, lineas: List[str], lote: Dict) -> str:
+        """
+        Incorpora un lote de líneas nuevas, línea por línea.
+
+        :param lineas: Líneas de log en orden de llegada
+        :param lote: Su análisis columnar (analizar_lote del mismo monitor)
+        :return: El peor estado, entre todas las ventanas, por el que pasó el
+            servicio durante el lote
+        """
+        peor = self.estado()
+        for i, (linea, (timestamp_ms, *fila)) in enumerate(
+                zip(lineas, filas(lote, "timestamp_ms", *self.monitor.CAMPOS_SALUD))):
+            self._sumar(self.monitor._aporte_salud(linea, *fila),
+                        timestamp_ms // 1000 if timestamp_ms is not None else None)
+            peor = self.estado() if i == 0 else peor_estado(peor, self.estado())
+        return peor
+
+    def _sumar(self, aporte: Tuple[int, ...], segundo: Optional[int]) -> None:
+        if segundo is None:
+            segundo = self.ultimo_segundo
+        if segundo is None:
+            # Todavía no hay ninguna línea con fecha: cuenta ya en todas las ventanas
+            destino = self._sin_fecha
+        else:
+            if self._actual is None or segundo > self._actual[0]:
+                contadores = [0] * len(aporte)
+                if self._actual is None:
+                    contadores, self._sin_fecha = self._sin_fecha, contadores
+                self._actual = [segundo, contadores]
+                for cola in self._cubetas.values():
+                    cola.append(self._actual)
+                self._expirar(segundo)
+            # Una línea con timestamp anterior (desordenada) cuenta en la cubeta actual
+            destino = self._actual[1]
+
+        for i, valor in enumerate(aporte):
+            if valor:
+                destino[i] += valor
+                for etiqueta, cola in self._cubetas.items():
+                    if destino is self._sin_fecha or (cola and cola[-1] is self._actual):
+                        self._sumas[etiqueta][i] += valor
+
+    def _expirar(self, referencia: int) -> None:
+        for etiqueta, duracion in self.duraciones.items():
+            cola = self._cubetas[etiqueta]
+            sumas = self._sumas[etiqueta]
+            limite = referencia - duracion
+            while cola and cola[0][0] <= limite:
+                _, contadores = cola.popleft()
+                for i, valor in enumerate(contadores):
+                    sumas[i] -= valor
+
+    def estados(self, referencia: Optional[int] = None) -> Dict[str, str]:
+        """
+        Estado de cada ventana.
+
+        :param referencia: Segundo epoch que se toma como "ahora", en el mismo
+            reloj que los timestamps del log (leídos como UTC si no traen zona).
+            Por defecto, el de la última línea recibida.
+        """
+        if referencia is not None:
+            self._expirar(int(referencia))
+        return {etiqueta: self.monitor._veredicto_salud(sumas, self.umbrales[etiqueta])
+                for etiqueta, sumas in self._sumas.items()}
+
+    def estado(self, referencia: Optional[int] = None) -> str:
+        """El peor estado entre todas las ventanas."""
+        return peor_estado(*self.estados(referencia).values())
+
+    def resumen(self) -> Dict[str, Dict[str, int]]:
+        return {etiqueta: dict(zip(self.monitor.CONTADORES_SALUD, sumas))
+                for etiqueta, sumas in self._sumas.items()}
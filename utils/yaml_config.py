@@ -0,0 +1,51 @@
+"""
+Lectura de config.yaml para los plugins
+
+Cada plugin lee su bloque de la sección `servicios` con get_config_for_plugin.
+El archivo se vuelve a leer solo si cambió su fecha de modificación.
+"""
+import os
+from typing import Dict
+
+import yaml
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_YAML_PATH = os.path.join(BASE_DIR, "config.yaml")
+
+# ruta -> (mtime, configuración ya parseada)
+_cache_config: Dict[str, tuple] = {}
+
+
+def cargar_config_yaml(config_path: str = None) -> Dict:
+    """
+    Carga config.yaml (o la ruta indicada). Devuelve {} si no existe o no se
+    puede leer, para que los plugins sigan con sus valores por defecto.
+    """
+    if config_path is None:
+        config_path = CONFIG_YAML_PATH
+    try:
+        mtime = os.path.getmtime(config_path)
+    except OSError:
+        return {}
+
+    guardado = _cache_config.get(config_path)
+    if guardado and guardado[0] == mtime:
+        return guardado[1]
+
+    try:
+        with open(config_path, "r", encoding="utf-8") as f:
+            config = yaml.safe_load(f) or {}
+    except (OSError, yaml.YAMLError) as e:
+        print(f"Error leyendo configuración YAML {config_path}: {e}")
+        return {}
+
+    _cache_config[config_path] = (mtime, config)
+    return config
+
+
+def get_config_for_plugin(nombre_plugin: str, config_path: str = None) -> Dict:
+    """
+    :param nombre_plugin: Clave del plugin en `servicios` (avionics, asset_api, runtime)
+    :return: Su configuración, o {} si no está definida
+    """
+    return cargar_config_yaml(config_path).get("servicios", {}).get(nombre_plugin) or {}